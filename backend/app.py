@@ -1,74 +1,387 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, make_response, Response, stream_with_context, g
 from flask_cors import CORS
+import asyncio
+import click
+import hashlib
+import itertools
+import json
 import logging
 import sys
 import os
-from datetime import timedelta
+import time
+from datetime import date, datetime, timedelta, timezone
+from werkzeug.http import is_resource_modified
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from functions.storage_client import get_people_container, get_bookings_container
-from functions.utils import (
-    parse_datetime, get_day_of_week, get_time_slots_for_day,
-    slots_overlap, default_availability
+from functions.storage_client import (
+    BOOKING_SERIES_TABLE, BOOKINGS_TABLE, PEOPLE_TABLE, TABLES,
+    get_people_container, get_storage_backend, create_tables, migrate_entity_schema, ConflictError
 )
+from functions.table_versions import bump_table_version, read_table_version
+from functions.change_log import (
+    CHANGE_TAIL, CHANGES_PAGE_SIZE, append_changes, change, deleted, upserted, latest_sequence, read_changes,
+    is_truncated, prune_changes
+)
+from functions.compression import COMPRESS_MIN_BYTES, ENCODINGS, compress
+from functions.async_storage import run_async
+from functions.people_cache import get_people_cache
+from functions.slot_cache import get_slot_cache
+from functions.booking_store import (
+    booking_days, new_booking_id, create_booking, create_bookings, delete_booking, list_bookings,
+    list_bookings_page, iter_bookings, iter_bookings_for_people, list_bookings_for_people, afind_index_rows, migrate_bookings_layout,
+    backfill_booking_index, backfill_booking_claims, backfill_booking_epochs, booking_claim_keys, booking_epochs,
+    public_booking, claim_keys, read_claims, aread_claims, claimed_intervals, CLAIM_RETRIES
+)
+from functions.metrics import (
+    SERVER_TIMING_ENABLED, start_request_metrics, finish_request_metrics, observe_request, render_metrics
+)
+from functions.availability import MINUTES_PER_DAY, day_start, minutes_since, minute_to_datetime
+from functions.slot_engine import common_anchored_intervals, anchored_slots
+from functions.freebusy_store import (
+    date_range, aread_freebusy, resolve_freebusy, invalidate_freebusy, rebuild_freebusy
+)
+from functions.series_store import (
+    build_series, create_series, read_series, delete_series, update_series, is_series_id, split_occurrence_id,
+    is_occurrence, horizon_occurrences, occurrences, occurrence_item, series_busy, unique_series,
+    find_series_for_people, afind_series_for_people, iter_series
+)
+from functions.calendar_export import iter_csv, iter_ics
+from functions.analytics import DEFAULT_ANALYTICS_WEEKS, utilization, week_start
+from functions.batch_scheduler import schedule_meetings
+from functions.freebusy import DEFAULT_RESOLUTION_MINUTES, availability_matrix, free_matrix, group_slots, quorum_slots
+from functions.utils import parse_datetime, get_day_of_week, slots_overlap, to_epoch, default_availability
 
-def validate_booking_availability_wrapper(person_ids, start_time, end_time):
-    from datetime import datetime
-    
-    people_container = get_people_container()
-    bookings_container = get_bookings_container()
-    
-    people = []
-    for person_id in person_ids:
+SLOT_STEP_MINUTES = 15
+MAX_SEARCH_DAYS = 62
+MAX_BULK_ITEMS = 10000
+MAX_PAGE_SIZE = 1000
+DEFAULT_QUORUM_LIMIT = 10
+MAX_BATCH_MEETINGS = 500
+EXPORT_PAGE_SIZE = 100
+CHANGES_STREAM_SECONDS = int(os.environ.get('CHANGES_STREAM_SECONDS', 300))
+CHANGES_HEARTBEAT_SECONDS = int(os.environ.get('CHANGES_HEARTBEAT_SECONDS', 15))
+CHANGES_STREAM_ENABLED = os.environ.get('CHANGES_STREAM_ENABLED', '1').lower() in ('1', 'true', 'yes', 'on')
+CHANGES_RETRY_MS = 2000
+
+
+def upcoming_days():
+    today = date.today()
+    return date_range(today, today + timedelta(days=MAX_SEARCH_DAYS - 1))
+
+
+def positive_int(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+def build_person(data):
+    return {
+        'id': data.get('id') or str(os.urandom(16).hex()),
+        'name': data['name'],
+        'email': data.get('email', ''),
+        'availability': data.get('availability', default_availability())
+    }
+
+
+def carry_availability_versions(container, items):
+    stored = {item['id']: item for item in container.read_many([item['id'] for item in items])}
+    for item in items:
+        item['availabilityVersion'] = stored.get(item['id'], {}).get('availabilityVersion', 0) + 1
+    return [item['id'] for item in items if item['id'] in stored]
+
+
+def refresh_booking_freebusy(bookings):
+    days = set(upcoming_days())
+    keys = list(dict.fromkeys(
+        key for booking in bookings for key in booking_claim_keys(booking) if date.fromisoformat(key[0]) in days
+    ))
+    if keys:
+        invalidate_freebusy(keys)
+
+
+def build_booking(data, start_dt):
+    return {
+        'id': new_booking_id(start_dt),
+        'personIds': data['personIds'],
+        'startTime': data['startTime'],
+        'endTime': data['endTime'],
+        'title': data.get('title', ''),
+        'description': data.get('description', '')
+    }
+
+
+def parse_list_params(args):
+    limit = args.get('limit', type=int)
+    if limit is not None and not 0 < limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    select = [field.strip() for field in args.get('select', '').split(',') if field.strip()] or None
+    return {
+        'limit': limit,
+        'continuation_token': args.get('continuationToken'),
+        'select': select,
+        'stream': args.get('format') == 'ndjson' or 'application/x-ndjson' in request.headers.get('Accept', ''),
+        'paged': limit is not None or bool(args.get('continuationToken'))
+    }
+
+
+def project(item, select):
+    if not select:
+        return item
+    return {key: item[key] for key in ['id', *select] if key in item}
+
+
+def ndjson_response(items):
+    def generate():
+        try:
+            for item in items:
+                yield json.dumps(item, default=str) + '\n'
+        except Exception as e:
+            logger.error(f"Error streaming results: {str(e)}")
+            raise
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def parse_since(value):
+    if value is None or value == '':
+        return None
+    try:
+        since = int(value)
+    except ValueError:
+        raise ValueError("since must be a change sequence number")
+    if since < 0:
+        raise ValueError("since must be a change sequence number")
+    return since
+
+
+def sse_event(event, data, event_id=None):
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {event}", f"data: {json.dumps(data, default=str)}"]
+    return '\n'.join(lines) + '\n\n'
+
+
+def streaming_response(chunks, mimetype, filename, description):
+    def generate():
         try:
-            person = people_container.read_item(item=person_id, partition_key=person_id)
-            people.append(person)
+            yield from chunks
         except Exception as e:
+            logger.error(f"Error streaming {description}: {str(e)}")
+            raise
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def parse_day_range(args):
+    first_day = parse_datetime(args['from']).date() if args.get('from') else None
+    last_day = parse_datetime(args['to']).date() if args.get('to') else None
+    if first_day and last_day and last_day < first_day:
+        raise ValueError("to must not be before from")
+    return first_day, last_day
+
+
+def representation_etag(*parts):
+    return hashlib.sha1('\n'.join((request.full_path,) + parts).encode('utf-8')).hexdigest()
+
+
+def table_validators(table_name, *parts):
+    version, last_modified = read_table_version(table_name)
+    if version is None:
+        return None, None
+    return representation_etag(version, *parts), last_modified
+
+
+def conditional_response(etag, last_modified, build):
+    if etag is not None and not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = Response(status=304)
+    else:
+        response = make_response(build())
+        if response.status_code != 200:
+            return response
+    if etag is not None:
+        response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def load_availability_and_index_rows(person_ids, first_day, last_day):
+    async def load():
+        return await asyncio.gather(
+            get_people_cache().aget_availability_many(person_ids),
+            afind_index_rows(person_ids, first_day, last_day),
+            afind_series_for_people(person_ids)
+        )
+    return run_async(load())
+
+
+def load_availability_and_freebusy(person_ids, keys):
+    async def load():
+        return await asyncio.gather(
+            get_people_cache().aget_availability_many(person_ids),
+            aread_freebusy(keys),
+            afind_series_for_people(person_ids)
+        )
+    availabilities, found, series_by_person = run_async(load())
+    return availabilities, resolve_freebusy(keys, found, availabilities, series_by_person)
+
+
+def load_availability_and_claims(person_ids, keys):
+    async def load():
+        return await asyncio.gather(
+            get_people_cache().aget_availability_many(person_ids, revalidate=True),
+            aread_claims(keys),
+            afind_series_for_people(person_ids)
+        )
+    return run_async(load())
+
+
+def check_booking(person_ids, start_time, end_time, availabilities, busy_intervals):
+    for person_id in person_ids:
+        if person_id not in availabilities:
             return False, f'Person {person_id} not found'
     
-    if isinstance(start_time, str):
-        start_time = parse_datetime(start_time)
-    if isinstance(end_time, str):
-        end_time = parse_datetime(end_time)
-    
     day_of_week = get_day_of_week(start_time)
-    target_date = start_time.date() if isinstance(start_time, datetime) else start_time
+    origin = day_start(start_time)
+    start_minute = minutes_since(origin, start_time)
+    end_minute = minutes_since(origin, end_time, round_up=True)
+    start_epoch = to_epoch(start_time)
+    end_epoch = to_epoch(end_time, round_up=True)
     
-    for person in people:
-        availability = person.get('availability', [])
-        person_slots = get_time_slots_for_day(availability, day_of_week, target_date)
-        
-        fits_in_schedule = False
-        for slot in person_slots:
-            if slot['start'] <= start_time and end_time <= slot['end']:
-                fits_in_schedule = True
-                break
-        
-        if not fits_in_schedule:
+    for person_id in person_ids:
+        if not availabilities[person_id].is_available(day_of_week, start_minute, end_minute):
+            person = get_people_cache().get(person_id)
             return False, f'Person {person["name"]} is not available at this time according to their schedule'
     
-    query = 'SELECT * FROM c'
-    all_bookings = list(bookings_container.query_items(
-        query="SELECT * FROM c",
-        enable_cross_partition_query=True
-    ))
+    for booking_start, booking_end in busy_intervals:
+        if slots_overlap(start_epoch, end_epoch, booking_start, booking_end):
+            return False, 'Conflict with existing booking'
     
-    existing_bookings = [
-        b for b in all_bookings
-        if any(pid in b.get('personIds', []) for pid in person_ids)
+    return True, None
+
+
+def occurrence_conflicts(person_ids, found, keys, skip_series_id=None, exclude=None):
+    claims = read_claims(keys)
+    series_list = [
+        series for series in unique_series(find_series_for_people(person_ids)) if series['id'] != skip_series_id
+    ]
+    for _, occurrence_start, occurrence_end in found:
+        start_epoch = to_epoch(occurrence_start)
+        end_epoch = to_epoch(occurrence_end, round_up=True)
+        busy_intervals = claimed_intervals(claims, claim_keys(person_ids, booking_days(occurrence_start, occurrence_end)))
+        busy_intervals += series_busy(series_list, occurrence_start, occurrence_end, exclude)
+        if any(slots_overlap(start_epoch, end_epoch, busy_start, busy_end) for busy_start, busy_end in busy_intervals):
+            return True
+    return False
+
+
+def occurrence_window(first_day, last_day):
+    first_day = first_day or date.today()
+    last_day = last_day or first_day + timedelta(days=MAX_SEARCH_DAYS - 1)
+    return day_start(first_day), day_start(last_day) + timedelta(days=1)
+
+
+def list_occurrences(person_ids, first_day, last_day):
+    window_start, window_end = occurrence_window(first_day, last_day)
+    return [
+        occurrence_item(series, key, occurrence_start, occurrence_end)
+        for series in unique_series(find_series_for_people(person_ids))
+        for key, occurrence_start, occurrence_end in occurrences(series, window_start, window_end)
     ]
+
+
+def iter_all_occurrences(first_day, last_day):
+    window_start, window_end = occurrence_window(first_day, last_day)
+    for series in iter_series(page_size=EXPORT_PAGE_SIZE):
+        for key, occurrence_start, occurrence_end in occurrences(series, window_start, window_end):
+            yield occurrence_item(series, key, occurrence_start, occurrence_end)
+
+
+def create_recurring_booking(data, start_dt, end_dt):
+    series = build_series(data, start_dt, end_dt)
+    person_ids = series['personIds']
+    found = horizon_occurrences(series)
+    if not found:
+        return jsonify({"error": "recurrence produces no occurrences"}), 400
+    for (_, _, previous_end), (_, next_start, _) in zip(found, found[1:]):
+        if next_start < previous_end:
+            return jsonify({"error": "Occurrences of a recurring booking must not overlap"}), 400
     
-    for booking in existing_bookings:
-        booking_start = parse_datetime(booking['startTime'])
-        booking_end = parse_datetime(booking['endTime'])
-        booking_person_ids = booking.get('personIds', [])
-        
-        if any(pid in person_ids for pid in booking_person_ids):
-            if slots_overlap(start_time, end_time, booking_start, booking_end):
-                return False, f'Conflict with existing booking'
+    keys = list(dict.fromkeys(
+        key for _, occurrence_start, occurrence_end in found
+        for key in claim_keys(person_ids, booking_days(occurrence_start, occurrence_end))
+    ))
+    availabilities, claims, series_by_person = load_availability_and_claims(person_ids, keys)
+    other_series = unique_series(series_by_person)
+    for _, occurrence_start, occurrence_end in found:
+        busy_intervals = claimed_intervals(claims, claim_keys(person_ids, booking_days(occurrence_start, occurrence_end)))
+        busy_intervals += series_busy(other_series, occurrence_start, occurrence_end)
+        is_valid, error = check_booking(person_ids, occurrence_start, occurrence_end, availabilities, busy_intervals)
+        if not is_valid:
+            return jsonify({"error": f"{occurrence_start.isoformat()}: {error}"}), 400
     
-    return True, None
+    create_series(series)
+    if occurrence_conflicts(person_ids, found, keys, skip_series_id=series['id']):
+        delete_series(series['id'])
+        raise ConflictError(f"Recurring booking {series['id']} overlaps a concurrent booking")
+    append_changes(upserted(BOOKING_SERIES_TABLE, [series]))
+    return jsonify(series), 201
+
+
+def reschedule_occurrence(series_id, key, data):
+    if not data or not data.get('startTime') or not data.get('endTime'):
+        return jsonify({"error": "startTime and endTime are required"}), 400
+    series = read_series(series_id)
+    if not is_occurrence(series, key):
+        return jsonify({"error": "Booking not found"}), 404
+    
+    start_dt = parse_datetime(data['startTime'])
+    end_dt = parse_datetime(data['endTime'])
+    person_ids = series['personIds']
+    keys = claim_keys(person_ids, booking_days(start_dt, end_dt))
+    availabilities, claims, series_by_person = load_availability_and_claims(person_ids, keys)
+    busy_intervals = claimed_intervals(claims) + series_busy(
+        unique_series(series_by_person), start_dt, end_dt, exclude=(series_id, key)
+    )
+    is_valid, error = check_booking(person_ids, start_dt, end_dt, availabilities, busy_intervals)
+    if not is_valid:
+        return jsonify({"error": error}), 400
+    
+    previous = series.get('overrides', {}).get(key)
+    series = update_series(series_id, lambda item: item.setdefault('overrides', {}).update(
+        {key: [start_dt.isoformat(), end_dt.isoformat()]}
+    ))
+    if occurrence_conflicts(person_ids, [(key, start_dt, end_dt)], keys, exclude=(series_id, key)):
+        update_series(series_id, lambda item: item['overrides'].update({key: previous}) if previous
+                      else item['overrides'].pop(key, None))
+        raise ConflictError(f"Occurrence {key} of {series_id} overlaps a concurrent booking")
+    append_changes(upserted(BOOKING_SERIES_TABLE, [series]))
+    return jsonify(occurrence_item(series, key, start_dt, end_dt)), 200
+
+
+def series_collisions(placed):
+    series_by_person = find_series_for_people([pid for _, booking, _, _ in placed for pid in booking['personIds']])
+    return [
+        (index, booking) for index, booking, start_dt, end_dt in placed
+        if series_busy(unique_series(series_by_person, booking['personIds']), start_dt, end_dt)
+    ]
+
+
+def reject_collisions(placed, collisions):
+    for _, booking in collisions:
+        delete_booking(booking['id'])
+    rejected = {booking['id'] for _, booking in collisions}
+    return [item for item in placed if item[1]['id'] not in rejected]
+
+
+def cancel_occurrence(series_id, key):
+    def cancel(series):
+        if not is_occurrence(series, key):
+            raise Exception("Item not found")
+        series['exdates'] = sorted(set(series.get('exdates', [])) | {key})
+        series.get('overrides', {}).pop(key, None)
+    return update_series(series_id, cancel)
 
 app = Flask(__name__)
 CORS(app)
@@ -77,14 +390,65 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+@app.before_request
+def start_request_timing():
+    g.request_metrics, g.request_metrics_token = start_request_metrics()
+
+
+@app.after_request
+def record_request_timing(response):
+    metrics = g.get('request_metrics')
+    if metrics is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        observe_request(metrics, request.method, route, response.status_code)
+        if SERVER_TIMING_ENABLED:
+            response.headers['Server-Timing'] = metrics.server_timing()
+    return response
+
+
+@app.after_request
+def compress_response(response):
+    if (response.status_code != 200 or response.is_streamed or response.direct_passthrough
+            or response.mimetype != 'application/json' or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    encoding = request.accept_encodings.best_match(ENCODINGS)
+    if len(body) < COMPRESS_MIN_BYTES or encoding is None:
+        return response
+    response.set_data(compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+@app.teardown_request
+def finish_request_timing(error=None):
+    finish_request_metrics(g.pop('request_metrics_token', None))
+
+
 @app.route('/api/people', methods=['GET', 'POST'])
 def people():
     container = get_people_container()
     
     if request.method == 'GET':
         try:
-            items = list(container.query_items(query="SELECT * FROM c", enable_cross_partition_query=True))
-            return jsonify(items), 200
+            params = parse_list_params(request.args)
+            etag, last_modified = table_validators(PEOPLE_TABLE)
+            
+            def build():
+                if params['stream']:
+                    return ndjson_response(container.iter_items(select=params['select'], page_size=params['limit']))
+                if params['paged']:
+                    items, token = container.query_page(
+                        limit=params['limit'], continuation_token=params['continuation_token'], select=params['select']
+                    )
+                    return jsonify({"items": items, "continuationToken": token}), 200
+                items = list(container.query_items(query="SELECT * FROM c", enable_cross_partition_query=True))
+                return jsonify([project(item, params['select']) for item in items]), 200
+            
+            return conditional_response(etag, last_modified, build)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception as e:
             logger.error(f"Error getting people: {str(e)}")
             return jsonify({"error": str(e)}), 500
@@ -95,26 +459,61 @@ def people():
             if not data or 'name' not in data:
                 return jsonify({"error": "Name is required"}), 400
             
-            item = {
-                'id': data.get('id') or str(os.urandom(16).hex()),
-                'name': data['name'],
-                'email': data.get('email', ''),
-                'availability': data.get('availability', default_availability())
-            }
+            item = build_person(data)
+            replaced = carry_availability_versions(container, [item])
             container.create_item(body=item)
+            get_people_cache().invalidate(item['id'])
+            bump_table_version(PEOPLE_TABLE)
+            append_changes(upserted(PEOPLE_TABLE, [item]))
+            if replaced:
+                invalidate_freebusy(claim_keys(replaced, upcoming_days()))
             return jsonify(item), 201
         except Exception as e:
             logger.error(f"Error creating person: {str(e)}")
             return jsonify({"error": str(e)}), 500
 
 
+@app.route('/api/people/bulk', methods=['POST'])
+def people_bulk():
+    container = get_people_container()
+    people_cache = get_people_cache()
+    
+    try:
+        data = request.get_json()
+        entries = data.get('people') if isinstance(data, dict) else data
+        if not isinstance(entries, list) or not entries:
+            return jsonify({"error": "A non-empty list of people is required"}), 400
+        if len(entries) > MAX_BULK_ITEMS:
+            return jsonify({"error": f"At most {MAX_BULK_ITEMS} people per request"}), 400
+        
+        items = []
+        for index, entry in enumerate(entries):
+            if not isinstance(entry, dict) or 'name' not in entry:
+                return jsonify({"error": f"Name is required (item {index})"}), 400
+            items.append(build_person(entry))
+        
+        replaced = carry_availability_versions(container, items)
+        container.upsert_many(items)
+        for item in items:
+            people_cache.invalidate(item['id'])
+        bump_table_version(PEOPLE_TABLE)
+        append_changes(upserted(PEOPLE_TABLE, items))
+        if replaced:
+            invalidate_freebusy(claim_keys(replaced, upcoming_days()))
+        return jsonify(items), 201
+    except Exception as e:
+        logger.error(f"Error importing people: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route('/api/people/<person_id>', methods=['GET', 'PUT', 'DELETE'])
 def person(person_id):
     container = get_people_container()
+    people_cache = get_people_cache()
     
     try:
         if request.method == 'GET':
-            item = container.read_item(item=person_id, partition_key=person_id)
+            item = people_cache.get(person_id)
             return jsonify(item), 200
         
         elif request.method == 'PUT':
@@ -122,14 +521,21 @@ def person(person_id):
             if not data:
                 return jsonify({"error": "Request body required"}), 400
             
-            item = container.read_item(item=person_id, partition_key=person_id)
+            item = people_cache.get(person_id, revalidate=True)
             item['name'] = data.get('name', item.get('name'))
             item['email'] = data.get('email', item.get('email', ''))
             container.replace_item(item=person_id, body=item)
+            people_cache.invalidate(person_id)
+            bump_table_version(PEOPLE_TABLE)
+            append_changes(upserted(PEOPLE_TABLE, [item]))
             return jsonify(item), 200
         
         elif request.method == 'DELETE':
             container.delete_item(item=person_id, partition_key=person_id)
+            people_cache.invalidate(person_id)
+            bump_table_version(PEOPLE_TABLE)
+            append_changes(deleted(PEOPLE_TABLE, [person_id]))
+            invalidate_freebusy(claim_keys([person_id], upcoming_days()))
             return jsonify({"message": "Person deleted"}), 200
     
     except Exception as e:
@@ -142,13 +548,15 @@ def person(person_id):
 @app.route('/api/people/<person_id>/availability', methods=['GET', 'PUT'])
 def availability(person_id):
     container = get_people_container()
+    people_cache = get_people_cache()
     
     try:
         if request.method == 'GET':
             try:
-                person = container.read_item(item=person_id, partition_key=person_id)
-                availability = person.get('availability', [])
-                return jsonify({"personId": person_id, "availability": availability}), 200
+                etag = representation_etag(people_cache.etag(person_id, revalidate=True))
+                return conditional_response(etag, None, lambda: (
+                    jsonify({"personId": person_id, "availability": people_cache.get(person_id).get('availability', [])}), 200
+                ))
             except Exception as e:
                 if 'not found' in str(e).lower():
                     return jsonify({"error": "Person not found"}), 404
@@ -158,9 +566,14 @@ def availability(person_id):
             data = request.get_json()
             availability = data.get('availability', [])
             
-            person = container.read_item(item=person_id, partition_key=person_id)
+            person = people_cache.get(person_id, revalidate=True)
             person['availability'] = availability
+            person['availabilityVersion'] = person.get('availabilityVersion', 0) + 1
             container.replace_item(item=person_id, body=person)
+            people_cache.invalidate(person_id)
+            bump_table_version(PEOPLE_TABLE)
+            append_changes(upserted(PEOPLE_TABLE, [person]))
+            invalidate_freebusy(claim_keys([person_id], upcoming_days()))
             return jsonify({"personId": person_id, "availability": availability}), 200
     
     except Exception as e:
@@ -168,6 +581,33 @@ def availability(person_id):
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/api/people/<person_id>/calendar.ics', methods=['GET'])
+def person_calendar(person_id):
+    people_cache = get_people_cache()
+    
+    try:
+        first_day, last_day = parse_day_range(request.args)
+        etag, last_modified = table_validators(BOOKINGS_TABLE, people_cache.etag(person_id, revalidate=True))
+        
+        def build():
+            person = people_cache.get(person_id)
+            series_list = unique_series(find_series_for_people([person_id]))
+            bookings = iter_bookings_for_people([person_id], first_day, last_day, EXPORT_PAGE_SIZE)
+            return streaming_response(
+                iter_ics(bookings, series_list, person.get('name'), last_modified or datetime.now(timezone.utc)),
+                'text/calendar', f'{person_id}.ics', f"calendar of {person_id}"
+            )
+        
+        return conditional_response(etag, last_modified, build)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error exporting calendar of {person_id}: {str(e)}")
+        if 'not found' in str(e).lower():
+            return jsonify({"error": "Person not found"}), 404
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route('/api/slots/find', methods=['POST', 'OPTIONS'])
 def slots():
     if request.method == 'OPTIONS':
@@ -186,108 +626,198 @@ def slots():
             return jsonify({"error": "personIds and date are required"}), 400
         
         target_date = parse_datetime(date_str)
-        day_of_week = get_day_of_week(target_date)
+        day = target_date.date()
         
-        people_container = get_people_container()
-        bookings_container = get_bookings_container()
-        
-        all_people = list(people_container.query_items(query="SELECT * FROM c", enable_cross_partition_query=True))
-        selected_people = [p for p in all_people if p['id'] in person_ids]
+        def compute():
+            availabilities, rows = load_availability_and_freebusy(person_ids, claim_keys(person_ids, [day]))
+            if not availabilities:
+                return None
+            origin = day_start(target_date)
+            free_per_person = [row['free'] for row in rows.values()]
+            return [
+                {
+                    'startTime': minute_to_datetime(origin, slot_start).isoformat(),
+                    'endTime': minute_to_datetime(origin, slot_end).isoformat()
+                }
+                for slot_start, slot_end in anchored_slots(
+                    common_anchored_intervals(free_per_person), duration_minutes, SLOT_STEP_MINUTES
+                )
+            ]
         
-        if not selected_people:
+        common_slots = get_slot_cache().get_or_compute('find', (day.isoformat(), duration_minutes), person_ids, compute)
+        if common_slots is None:
             return jsonify({"error": "No valid people found"}), 400
+        return jsonify(common_slots), 200
+    
+    except Exception as e:
+        logger.error(f"Error finding slots: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/slots/search', methods=['POST', 'OPTIONS'])
+def slots_search():
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({"error": "Request body required"}), 400
         
-        all_person_slots = []
-        for person in selected_people:
-            person_avail = person.get('availability', [])
-            person_slots = get_time_slots_for_day(person_avail, day_of_week, target_date)
-            if person_slots:
-                all_person_slots.append(person_slots)
-            else:
-                return jsonify([]), 200
+        person_ids = data.get('personIds', [])
+        from_str = data.get('from')
+        to_str = data.get('to')
+        duration_minutes = data.get('durationMinutes', 60)
+        step_minutes = data.get('step', SLOT_STEP_MINUTES)
+        limit = data.get('limit')
         
-        if not all_person_slots or len(all_person_slots) != len(selected_people):
-            return jsonify([]), 200
+        if not person_ids or not from_str or not to_str:
+            return jsonify({"error": "personIds, from and to are required"}), 400
+        if not positive_int(duration_minutes) or not positive_int(step_minutes) or (limit is not None and not positive_int(limit)):
+            return jsonify({"error": "durationMinutes, step and limit must be positive integers"}), 400
         
-        first_person_slots = all_person_slots[0]
-        common_time_ranges = []
+        first_day = parse_datetime(from_str).date()
+        last_day = parse_datetime(to_str).date()
+        if last_day < first_day:
+            return jsonify({"error": "to must not be before from"}), 400
+        if (last_day - first_day).days >= MAX_SEARCH_DAYS:
+            return jsonify({"error": f"Search range is limited to {MAX_SEARCH_DAYS} days"}), 400
         
-        for slot in first_person_slots:
-            slot_start = slot['start']
-            slot_end = slot['end']
-            
-            current_ranges = [(slot_start, slot_end)]
+        def compute():
+            days = date_range(first_day, last_day)
+            availabilities, rows = load_availability_and_freebusy(person_ids, claim_keys(person_ids, days))
+            if not availabilities:
+                return None
             
-            for other_person_slots in all_person_slots[1:]:
-                new_ranges = []
-                for range_start, range_end in current_ranges:
-                    for other_slot in other_person_slots:
-                        other_start = other_slot['start']
-                        other_end = other_slot['end']
-                        
-                        if slots_overlap(range_start, range_end, other_start, other_end):
-                            intersection_start = max(range_start, other_start)
-                            intersection_end = min(range_end, other_end)
-                            if intersection_start < intersection_end:
-                                new_ranges.append((intersection_start, intersection_end))
-                
-                if not new_ranges:
-                    current_ranges = []
-                    break
-                current_ranges = new_ranges
+            origin = day_start(first_day)
+            free_intervals = []
+            for day_index, day in enumerate(days):
+                free_per_person = [
+                    rows[(day.isoformat(), person_id)]['free'] for person_id in availabilities
+                    if (day.isoformat(), person_id) in rows
+                ]
+                offset = day_index * MINUTES_PER_DAY
+                free_intervals.extend(
+                    (offset + free_start, offset + free_end, offset + anchor)
+                    for free_start, free_end, anchor in common_anchored_intervals(free_per_person)
+                )
             
-            for range_start, range_end in current_ranges:
-                common_time_ranges.append({
-                    'start': range_start,
-                    'end': range_end
-                })
-        
-        common_slots = []
-        all_existing_bookings = []
-        try:
-            all_existing_bookings = list(bookings_container.query_items(
-                query="SELECT * FROM c",
-                enable_cross_partition_query=True
-            ))
-            all_existing_bookings = [
-                b for b in all_existing_bookings
-                if any(pid in b.get('personIds', []) for pid in person_ids)
+            return [
+                (minute_to_datetime(origin, slot_start), minute_to_datetime(origin, slot_end))
+                for slot_start, slot_end in anchored_slots(free_intervals, duration_minutes, step_minutes, limit)
             ]
-        except Exception as e:
-            logger.warning(f"Error loading bookings for conflict check: {str(e)}")
         
-        for time_range in common_time_ranges:
-            current = time_range['start']
-            while current + timedelta(minutes=duration_minutes) <= time_range['end']:
-                slot_end_time = current + timedelta(minutes=duration_minutes)
-                
-                conflicts = False
-                for booking in all_existing_bookings:
-                    booking_start = parse_datetime(booking['startTime'])
-                    booking_end = parse_datetime(booking['endTime'])
-                    if slots_overlap(current, slot_end_time, booking_start, booking_end):
-                        conflicts = True
-                        break
-                
-                if not conflicts:
-                    common_slots.append({
-                        'startTime': current.isoformat(),
-                        'endTime': slot_end_time.isoformat()
-                    })
-                
-                current += timedelta(minutes=15)
+        found = get_slot_cache().get_or_compute(
+            'search', (first_day.isoformat(), last_day.isoformat(), duration_minutes, step_minutes, limit), person_ids, compute
+        )
+        if found is None:
+            return jsonify({"error": "No valid people found"}), 400
         
-        return jsonify(common_slots), 200
+        if limit is not None:
+            return jsonify([
+                {'startTime': slot_start.isoformat(), 'endTime': slot_end.isoformat()}
+                for slot_start, slot_end in found
+            ]), 200
+        
+        days = {}
+        for slot_start, slot_end in found:
+            days.setdefault(slot_start.date().isoformat(), []).append({
+                'startTime': slot_start.isoformat(),
+                'endTime': slot_end.isoformat()
+            })
+        return jsonify([{'date': date, 'slots': day_slots} for date, day_slots in days.items()]), 200
     
     except Exception as e:
-        logger.error(f"Error finding slots: {str(e)}")
+        logger.error(f"Error searching slots: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/slots/quorum', methods=['POST', 'OPTIONS'])
+def slots_quorum():
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({"error": "Request body required"}), 400
+        
+        person_ids = list(dict.fromkeys(data.get('personIds', [])))
+        from_str = data.get('from')
+        to_str = data.get('to')
+        duration_minutes = data.get('durationMinutes', 60)
+        step_minutes = data.get('step', SLOT_STEP_MINUTES)
+        resolution = data.get('resolutionMinutes', DEFAULT_RESOLUTION_MINUTES)
+        min_attendees = data.get('minAttendees', len(person_ids))
+        limit = data.get('limit', DEFAULT_QUORUM_LIMIT)
+        
+        if not person_ids or not from_str or not to_str:
+            return jsonify({"error": "personIds, from and to are required"}), 400
+        if not positive_int(duration_minutes) or not positive_int(step_minutes) or not positive_int(limit):
+            return jsonify({"error": "durationMinutes, step and limit must be positive integers"}), 400
+        if not positive_int(resolution) or MINUTES_PER_DAY % resolution or step_minutes % resolution:
+            return jsonify({"error": "resolutionMinutes must divide both a day and step"}), 400
+        if not positive_int(min_attendees) or min_attendees > len(person_ids):
+            return jsonify({"error": f"minAttendees must be between 1 and {len(person_ids)}"}), 400
+        
+        first_day = parse_datetime(from_str).date()
+        last_day = parse_datetime(to_str).date()
+        if last_day < first_day:
+            return jsonify({"error": "to must not be before from"}), 400
+        if (last_day - first_day).days >= MAX_SEARCH_DAYS:
+            return jsonify({"error": f"Search range is limited to {MAX_SEARCH_DAYS} days"}), 400
+        
+        availabilities, index_rows, series_by_person = load_availability_and_index_rows(
+            person_ids, first_day, last_day
+        )
+        if not availabilities:
+            return jsonify({"error": "No valid people found"}), 400
+        
+        origin = day_start(first_day)
+        origin_epoch = to_epoch(origin)
+        window_end = origin + timedelta(days=(last_day - first_day).days + 1)
+        busy_epochs = [(row['personId'], booking_epochs(row)) for row in index_rows]
+        for person_id, series_list in series_by_person.items():
+            busy_epochs.extend((person_id, busy) for busy in series_busy(series_list, origin, window_end))
+        busy_by_person = {}
+        for person_id, (start_epoch, end_epoch) in busy_epochs:
+            busy_by_person.setdefault(person_id, []).append((
+                (start_epoch - origin_epoch) // 60, -((origin_epoch - end_epoch) // 60)
+            ))
+        
+        available = availability_matrix(
+            person_ids, availabilities, first_day, (last_day - first_day).days + 1, resolution
+        )
+        free = free_matrix(available, person_ids, busy_by_person, resolution)
+        duration_ticks = -(-duration_minutes // resolution)
+        step_ticks = step_minutes // resolution
+        if min_attendees == len(person_ids):
+            found = [
+                (day_index, start_tick, end_tick, range(len(person_ids)))
+                for day_index, start_tick, end_tick in group_slots(available, free, duration_ticks, step_ticks, limit)
+            ]
+        else:
+            found = quorum_slots(available, free, min_attendees, duration_ticks, step_ticks, limit)
+        
+        results = []
+        for day_index, start_tick, _, free_rows in found:
+            offset = day_index * MINUTES_PER_DAY
+            available = [person_ids[row] for row in free_rows]
+            results.append({
+                'startTime': minute_to_datetime(origin, offset + start_tick * resolution).isoformat(),
+                'endTime': minute_to_datetime(origin, offset + start_tick * resolution + duration_minutes).isoformat(),
+                'availablePersonIds': available,
+                'missingPersonIds': [person_id for person_id in person_ids if person_id not in available]
+            })
+        return jsonify(results), 200
+    
+    except Exception as e:
+        logger.error(f"Error searching quorum slots: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 
 @app.route('/api/bookings', methods=['GET', 'POST'])
 def bookings():
-    container = get_bookings_container()
-    
     if request.method == 'GET':
         try:
             person_ids_param = request.args.get('personIds')
@@ -298,18 +828,36 @@ def bookings():
                 else:
                     person_ids = person_ids_param if isinstance(person_ids_param, list) else [person_ids_param]
             
-            query = "SELECT * FROM c"
+            first_day = parse_datetime(request.args['from']).date() if request.args.get('from') else None
+            last_day = parse_datetime(request.args['to']).date() if request.args.get('to') else None
+            params = parse_list_params(request.args)
+            etag, last_modified = table_validators(BOOKINGS_TABLE, date.today().isoformat())
             
-            if person_ids:
-                items = list(container.query_items(query=query, enable_cross_partition_query=True))
-                filtered = [
-                    item for item in items
-                    if any(pid in item.get('personIds', []) for pid in person_ids)
-                ]
-                return jsonify(filtered), 200
-            else:
-                items = list(container.query_items(query=query, enable_cross_partition_query=True))
-                return jsonify(items), 200
+            def build():
+                if person_ids:
+                    found = list_bookings_for_people(person_ids, first_day, last_day)
+                    found += list_occurrences(person_ids, first_day, last_day)
+                    found.sort(key=lambda b: (b.get('startTime', ''), b['id']))
+                    items = [project(public_booking(item), params['select']) for item in found]
+                    if params['stream']:
+                        return ndjson_response(items)
+                    return jsonify(items), 200
+                
+                if params['stream']:
+                    return ndjson_response(
+                        public_booking(item) for item in iter_bookings(first_day, last_day, params['select'], params['limit'])
+                    )
+                if params['paged']:
+                    items, token = list_bookings_page(
+                        first_day, last_day, params['limit'], params['continuation_token'], params['select']
+                    )
+                    return jsonify({"items": [public_booking(item) for item in items], "continuationToken": token}), 200
+                items = list_bookings(first_day, last_day)
+                return jsonify([project(public_booking(item), params['select']) for item in items]), 200
+            
+            return conditional_response(etag, last_modified, build)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception as e:
             logger.error(f"Error getting bookings: {str(e)}")
             return jsonify({"error": str(e)}), 500
@@ -323,42 +871,286 @@ def bookings():
             person_ids = data.get('personIds', [])
             start_time = data.get('startTime')
             end_time = data.get('endTime')
-            title = data.get('title', '')
-            description = data.get('description', '')
             
             if not person_ids or not start_time or not end_time:
                 return jsonify({"error": "personIds, startTime, and endTime are required"}), 400
             
             start_dt = parse_datetime(start_time)
             end_dt = parse_datetime(end_time)
-            is_valid, error = validate_booking_availability_wrapper(person_ids, start_dt, end_dt)
-            if not is_valid:
-                return jsonify({"error": error}), 400
+            if end_dt <= start_dt:
+                return jsonify({"error": "endTime must be after startTime"}), 400
+            if data.get('recurrence'):
+                return create_recurring_booking(data, start_dt, end_dt)
             
-            booking = {
-                'id': str(os.urandom(16).hex()),
-                'personIds': person_ids,
-                'startTime': start_time,
-                'endTime': end_time,
-                'title': title,
-                'description': description
-            }
+            keys = claim_keys(person_ids, booking_days(start_dt, end_dt))
+            booking = build_booking(data, start_dt)
             
-            container.create_item(body=booking)
-            return jsonify(booking), 201
+            for attempt in range(CLAIM_RETRIES):
+                availabilities, claims, series_by_person = load_availability_and_claims(person_ids, keys)
+                busy_intervals = claimed_intervals(claims) + series_busy(unique_series(series_by_person), start_dt, end_dt)
+                is_valid, error = check_booking(person_ids, start_dt, end_dt, availabilities, busy_intervals)
+                if not is_valid:
+                    return jsonify({"error": error}), 400
+                try:
+                    create_booking(booking, claims)
+                    if series_busy(unique_series(find_series_for_people(person_ids)), start_dt, end_dt):
+                        delete_booking(booking['id'])
+                        invalidate_freebusy(keys)
+                        raise ConflictError(f"Booking {booking['id']} overlaps a concurrent recurring booking")
+                    invalidate_freebusy(keys)
+                    append_changes(upserted(BOOKINGS_TABLE, [public_booking(booking)]))
+                    return jsonify(public_booking(booking)), 201
+                except ConflictError:
+                    if attempt == CLAIM_RETRIES - 1:
+                        raise
         
+        except ConflictError as e:
+            logger.warning(f"Booking conflict: {str(e)}")
+            return jsonify({"error": "Conflict with existing booking"}), 409
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception as e:
             logger.error(f"Error creating booking: {str(e)}")
             return jsonify({"error": str(e)}), 500
 
 
-@app.route('/api/bookings/<booking_id>', methods=['DELETE'])
-def booking(booking_id):
-    container = get_bookings_container()
+@app.route('/api/bookings/export.csv', methods=['GET'])
+def bookings_export():
+    try:
+        person_ids = [pid.strip() for pid in request.args.get('personIds', '').split(',') if pid.strip()]
+        first_day, last_day = parse_day_range(request.args)
+        etag, last_modified = table_validators(BOOKINGS_TABLE, date.today().isoformat())
+        
+        def build():
+            if person_ids:
+                bookings = iter_bookings_for_people(person_ids, first_day, last_day, EXPORT_PAGE_SIZE)
+                found = itertools.chain(bookings, list_occurrences(person_ids, first_day, last_day))
+            else:
+                bookings = iter_bookings(first_day, last_day, page_size=EXPORT_PAGE_SIZE)
+                found = itertools.chain(bookings, iter_all_occurrences(first_day, last_day))
+            return streaming_response(iter_csv(found), 'text/csv', 'bookings.csv', "bookings export")
+        
+        return conditional_response(etag, last_modified, build)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error exporting bookings: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/bookings/bulk', methods=['POST'])
+def bookings_bulk():
+    try:
+        data = request.get_json()
+        entries = data.get('bookings') if isinstance(data, dict) else data
+        if not isinstance(entries, list) or not entries:
+            return jsonify({"error": "A non-empty list of bookings is required"}), 400
+        if len(entries) > MAX_BULK_ITEMS:
+            return jsonify({"error": f"At most {MAX_BULK_ITEMS} bookings per request"}), 400
+        
+        parsed = []
+        for index, entry in enumerate(entries):
+            if not isinstance(entry, dict) or not entry.get('personIds') or not entry.get('startTime') or not entry.get('endTime'):
+                return jsonify({"error": f"personIds, startTime, and endTime are required (item {index})"}), 400
+            start_dt = parse_datetime(entry['startTime'])
+            end_dt = parse_datetime(entry['endTime'])
+            if end_dt <= start_dt:
+                return jsonify({"error": f"endTime must be after startTime (item {index})"}), 400
+            parsed.append((entry, start_dt, end_dt, booking_days(start_dt, end_dt)))
+        
+        person_ids = list(dict.fromkeys(pid for entry, _, _, _ in parsed for pid in entry['personIds']))
+        keys = [key for entry, _, _, days in parsed for key in claim_keys(entry['personIds'], days)]
+        availabilities, claims, series_by_person = load_availability_and_claims(person_ids, keys)
+        
+        busy_by_key = {}
+        created = []
+        errors = []
+        for index, (entry, start_dt, end_dt, days) in enumerate(parsed):
+            keys = claim_keys(entry['personIds'], days)
+            busy_intervals = claimed_intervals(claims, keys) + [
+                interval for key in keys for interval in busy_by_key.get(key, [])
+            ]
+            busy_intervals += series_busy(unique_series(series_by_person, entry['personIds']), start_dt, end_dt)
+            is_valid, error = check_booking(entry['personIds'], start_dt, end_dt, availabilities, busy_intervals)
+            if not is_valid:
+                errors.append({"index": index, "error": error})
+                continue
+            created.append((index, build_booking(entry, start_dt), start_dt, end_dt))
+            for key in keys:
+                busy_by_key.setdefault(key, []).append((to_epoch(start_dt), to_epoch(end_dt, round_up=True)))
+        
+        if created:
+            keys = [key for _, booking, _, _ in created for key in booking_claim_keys(booking)]
+            create_bookings([booking for _, booking, _, _ in created], claims)
+            collisions = series_collisions(created)
+            if collisions:
+                created = reject_collisions(created, collisions)
+                errors.extend({"index": index, "error": "Conflict with existing booking"} for index, _ in collisions)
+                errors.sort(key=lambda item: item['index'])
+            invalidate_freebusy(keys)
+            append_changes(upserted(BOOKINGS_TABLE, [public_booking(booking) for _, booking, _, _ in created]))
+        created = [public_booking(booking) for _, booking, _, _ in created]
+        return jsonify({"created": created, "errors": errors}), 201 if created else 400
+    except ConflictError as e:
+        logger.warning(f"Bulk booking conflict: {str(e)}")
+        return jsonify({"error": "Bookings conflict with concurrent changes, please retry"}), 409
+    except Exception as e:
+        logger.error(f"Error importing bookings: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/schedule/batch', methods=['POST', 'OPTIONS'])
+def schedule_batch():
+    if request.method == 'OPTIONS':
+        return '', 200
     
     try:
-        container.delete_item(item=booking_id, partition_key=booking_id)
+        data = request.get_json()
+        entries = data.get('meetings') if isinstance(data, dict) else None
+        if not isinstance(entries, list) or not entries:
+            return jsonify({"error": "A non-empty list of meetings is required"}), 400
+        if len(entries) > MAX_BATCH_MEETINGS:
+            return jsonify({"error": f"At most {MAX_BATCH_MEETINGS} meetings per request"}), 400
+        commit = data.get('commit', True)
+        
+        parsed = []
+        for index, entry in enumerate(entries):
+            if not isinstance(entry, dict) or not entry.get('personIds') or not entry.get('from') or not entry.get('to'):
+                return jsonify({"error": f"personIds, from and to are required (meeting {index})"}), 400
+            duration_minutes = entry.get('durationMinutes', 60)
+            step_minutes = entry.get('step', data.get('step', SLOT_STEP_MINUTES))
+            if not positive_int(duration_minutes) or not positive_int(step_minutes):
+                return jsonify({"error": f"durationMinutes and step must be positive integers (meeting {index})"}), 400
+            priority = entry.get('priority', 0)
+            if not isinstance(priority, int) or isinstance(priority, bool):
+                return jsonify({"error": f"priority must be an integer (meeting {index})"}), 400
+            first_day = parse_datetime(entry['from']).date()
+            last_day = parse_datetime(entry['to']).date()
+            if last_day < first_day:
+                return jsonify({"error": f"to must not be before from (meeting {index})"}), 400
+            if (last_day - first_day).days >= MAX_SEARCH_DAYS:
+                return jsonify({"error": f"Search range is limited to {MAX_SEARCH_DAYS} days (meeting {index})"}), 400
+            parsed.append((index, entry, list(dict.fromkeys(entry['personIds'])), first_day, last_day, duration_minutes, step_minutes))
+        
+        origin_day = min(first_day for _, _, _, first_day, _, _, _ in parsed)
+        person_ids = list(dict.fromkeys(pid for _, _, meeting_person_ids, _, _, _, _ in parsed for pid in meeting_person_ids))
+        keys = list(dict.fromkeys(
+            key for _, _, meeting_person_ids, first_day, last_day, _, _ in parsed
+            for key in claim_keys(meeting_person_ids, date_range(first_day, last_day))
+        ))
+        availabilities, rows = load_availability_and_freebusy(person_ids, keys)
+        
+        free_by_person = {}
+        for day, person_id in sorted(rows):
+            offset = (date.fromisoformat(day) - origin_day).days * MINUTES_PER_DAY
+            free_by_person.setdefault(person_id, []).extend(
+                (offset + free_start, offset + free_end, offset + anchor)
+                for free_start, free_end, anchor in rows[(day, person_id)]['free']
+            )
+        
+        meetings = []
+        unscheduled = []
+        for index, entry, meeting_person_ids, first_day, last_day, duration_minutes, step_minutes in parsed:
+            missing = [pid for pid in meeting_person_ids if pid not in availabilities]
+            if missing:
+                unscheduled.append({"index": index, "error": f"Person {missing[0]} not found"})
+                continue
+            meetings.append({
+                'index': index,
+                'personIds': meeting_person_ids,
+                'duration': duration_minutes,
+                'step': step_minutes,
+                'priority': entry.get('priority', 0),
+                'window': (
+                    (first_day - origin_day).days * MINUTES_PER_DAY,
+                    ((last_day - origin_day).days + 1) * MINUTES_PER_DAY
+                )
+            })
+        assignment = schedule_meetings(meetings, free_by_person) if meetings else {}
+        
+        origin = day_start(origin_day)
+        placed = []
+        for meeting in meetings:
+            if meeting['index'] not in assignment:
+                unscheduled.append({"index": meeting['index'], "error": "No common free slot left in the window"})
+                continue
+            slot_start, slot_end = assignment[meeting['index']]
+            start_dt = minute_to_datetime(origin, slot_start)
+            end_dt = minute_to_datetime(origin, slot_end)
+            entry = entries[meeting['index']]
+            booking = build_booking({
+                **entry, 'personIds': meeting['personIds'], 'startTime': start_dt.isoformat(), 'endTime': end_dt.isoformat()
+            }, start_dt)
+            placed.append((meeting['index'], booking, start_dt, end_dt))
+        
+        if commit and placed:
+            keys = [key for _, booking, _, _ in placed for key in booking_claim_keys(booking)]
+            availabilities, claims, series_by_person = load_availability_and_claims(person_ids, keys)
+            verified = []
+            for index, booking, start_dt, end_dt in placed:
+                busy_intervals = claimed_intervals(claims, booking_claim_keys(booking))
+                busy_intervals += series_busy(unique_series(series_by_person, booking['personIds']), start_dt, end_dt)
+                is_valid, error = check_booking(booking['personIds'], start_dt, end_dt, availabilities, busy_intervals)
+                if is_valid:
+                    verified.append((index, booking, start_dt, end_dt))
+                else:
+                    unscheduled.append({"index": index, "error": error})
+            placed = verified
+            if placed:
+                create_bookings([booking for _, booking, _, _ in placed], claims)
+                collisions = series_collisions(placed)
+                if collisions:
+                    placed = reject_collisions(placed, collisions)
+                    unscheduled.extend({"index": index, "error": "Conflict with existing booking"} for index, _ in collisions)
+                invalidate_freebusy(keys)
+                append_changes(upserted(BOOKINGS_TABLE, [public_booking(booking) for _, booking, _, _ in placed]))
+        
+        unscheduled.sort(key=lambda item: item['index'])
+        scheduled = [
+            {"index": index, "booking": public_booking(booking)} for index, booking, _, _ in sorted(placed, key=lambda item: item[0])
+        ]
+        result = {"scheduled": scheduled, "unscheduled": unscheduled, "committed": bool(commit and placed)}
+        if not commit:
+            return jsonify(result), 200
+        return jsonify(result), 201 if placed else 400
+    except ConflictError as e:
+        logger.warning(f"Batch scheduling conflict: {str(e)}")
+        return jsonify({"error": "Bookings conflict with concurrent changes, please retry"}), 409
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error scheduling meetings: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/bookings/<booking_id>', methods=['PUT', 'DELETE'])
+def booking(booking_id):
+    try:
+        series_id, occurrence = split_occurrence_id(booking_id) if is_series_id(booking_id) else (None, None)
+        
+        if request.method == 'PUT':
+            if occurrence is None:
+                return jsonify({"error": "Only occurrences of recurring bookings can be rescheduled"}), 400
+            return reschedule_occurrence(series_id, occurrence, request.get_json())
+        
+        if occurrence is not None:
+            series = cancel_occurrence(series_id, occurrence)
+            append_changes(upserted(BOOKING_SERIES_TABLE, [series]))
+            return jsonify({"message": "Occurrence cancelled"}), 200
+        if series_id is not None:
+            series = delete_series(series_id)
+            append_changes([change(BOOKING_SERIES_TABLE, 'delete', series_id, series)])
+            return jsonify({"message": "Recurring booking deleted"}), 200
+        
+        booking = delete_booking(booking_id)
+        invalidate_freebusy(booking_claim_keys(booking))
+        append_changes([change(BOOKINGS_TABLE, 'delete', booking_id, public_booking(booking))])
         return jsonify({"message": "Booking deleted"}), 200
+    except ConflictError as e:
+        logger.warning(f"Booking conflict: {str(e)}")
+        return jsonify({"error": "Conflict with existing booking"}), 409
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Error deleting booking {booking_id}: {str(e)}")
         if 'not found' in str(e).lower():
@@ -366,11 +1158,181 @@ def booking(booking_id):
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/api/changes', methods=['GET'])
+def changes():
+    try:
+        since = parse_since(request.args.get('since'))
+        limit = min(int(request.args.get('limit', CHANGES_PAGE_SIZE)), CHANGES_PAGE_SIZE)
+        if limit < 1:
+            return jsonify({"error": "limit must be positive"}), 400
+        if since is None:
+            return jsonify({"changes": [], "lastSeq": latest_sequence(), "hasMore": False}), 200
+        
+        found = read_changes(since, limit)
+        if is_truncated(since, found):
+            return jsonify({"error": "Changes since this sequence were pruned, reload the lists", "resync": True}), 410
+        last_seq = found[-1]['seq'] if found else since
+        return jsonify({"changes": found, "lastSeq": last_seq, "hasMore": len(found) == limit}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error reading changes: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/changes/stream', methods=['GET'])
+def changes_stream():
+    if not CHANGES_STREAM_ENABLED:
+        return jsonify({"error": "Change stream is disabled on this server, poll /api/changes instead"}), 503
+    try:
+        since = parse_since(request.headers.get('Last-Event-ID') or request.args.get('since'))
+        if since is None:
+            since = latest_sequence()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error opening change stream: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+    
+    def generate():
+        cursor = since
+        deadline = time.monotonic() + CHANGES_STREAM_SECONDS
+        heartbeat_at = time.monotonic() + CHANGES_HEARTBEAT_SECONDS
+        yield f"retry: {CHANGES_RETRY_MS}\n" + sse_event('ready', {"lastSeq": cursor}, cursor)
+        try:
+            while time.monotonic() < deadline:
+                found = read_changes(cursor)
+                if is_truncated(cursor, found):
+                    yield sse_event('resync', {"lastSeq": cursor})
+                    return
+                for entry in found:
+                    cursor = entry['seq']
+                    yield sse_event('change', entry, cursor)
+                if len(found) == CHANGES_PAGE_SIZE:
+                    continue
+                if found:
+                    heartbeat_at = time.monotonic() + CHANGES_HEARTBEAT_SECONDS
+                CHANGE_TAIL.wait(cursor, min(heartbeat_at, deadline) - time.monotonic())
+                if time.monotonic() >= heartbeat_at:
+                    yield ': heartbeat\n\n'
+                    heartbeat_at = time.monotonic() + CHANGES_HEARTBEAT_SECONDS
+        except Exception as e:
+            logger.error(f"Error streaming changes after {cursor}: {str(e)}")
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@app.route('/api/analytics/utilization', methods=['GET'])
+def analytics_utilization():
+    people_cache = get_people_cache()
+    
+    try:
+        first_day, last_day = parse_day_range(request.args)
+        last_day = last_day or week_start(date.today()) + timedelta(days=6)
+        first_day = first_day or week_start(last_day) - timedelta(weeks=DEFAULT_ANALYTICS_WEEKS - 1)
+        if last_day < first_day:
+            return jsonify({"error": "to must not be before from"}), 400
+        
+        person_ids = [pid.strip() for pid in request.args.get('personIds', '').split(',') if pid.strip()]
+        if not person_ids:
+            person_ids = [item['id'] for item in get_people_container().iter_items(select=['name'])]
+        person_ids = list(dict.fromkeys(person_ids))
+        
+        availabilities = people_cache.get_availability_many(person_ids, revalidate=True)
+        person_ids = [person_id for person_id in person_ids if person_id in availabilities]
+        if not person_ids:
+            return jsonify({"error": "No valid people found"}), 400
+        
+        result = utilization(person_ids, first_day, last_day, availabilities)
+        return jsonify({"from": first_day.isoformat(), "to": last_day.isoformat(), **result}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error computing utilization: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route('/api/health', methods=['GET'])
 def health():
-    return jsonify({"status": "ok"}), 200
+    return jsonify({"status": "ok", "storage": get_storage_backend()}), 200
+
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify({"people": get_people_cache().stats(), "slots": get_slot_cache().stats()}), 200
+
+
+@app.cli.command('create-tables')
+def create_tables_command():
+    count = create_tables()
+    click.echo(f"Created {count} tables")
+
+
+@app.cli.command('prune-changes')
+@click.option('--days', 'retention_days', type=int, default=None, help='keep changes newer than this many days')
+def prune_changes_command(retention_days):
+    count = prune_changes() if retention_days is None else prune_changes(retention_days)
+    click.echo(f"Pruned {count} changes")
+
+
+@app.cli.command('migrate-entity-schema')
+@click.option('--table', 'tables', multiple=True, type=click.Choice(TABLES), help='table to migrate (default: all)')
+def migrate_entity_schema_command(tables):
+    for table_name, (migrated, skipped) in migrate_entity_schema(tables or TABLES).items():
+        click.echo(f"{table_name}: migrated {migrated} rows" + (f", skipped {skipped} changed concurrently" if skipped else ''))
+
+
+@app.cli.command('backfill-booking-index')
+def backfill_booking_index_command():
+    count = backfill_booking_index()
+    click.echo(f"Indexed {count} bookings")
+
+
+@app.cli.command('backfill-booking-claims')
+def backfill_booking_claims_command():
+    claimed = backfill_booking_claims()
+    refresh_booking_freebusy(claimed)
+    click.echo(f"Claimed {len(claimed)} bookings")
+
+
+@app.cli.command('rebuild-freebusy')
+@click.option('--from', 'from_str', help='first day to rebuild (default: today)')
+@click.option('--to', 'to_str', help=f'last day to rebuild (default: {MAX_SEARCH_DAYS} days from today)')
+@click.option('--stale-only', is_flag=True, help='only rewrite rows whose version counters are out of date')
+def rebuild_freebusy_command(from_str, to_str, stale_only):
+    days = upcoming_days()
+    first_day = parse_datetime(from_str).date() if from_str else days[0]
+    last_day = parse_datetime(to_str).date() if to_str else days[-1]
+    person_ids = [
+        item['id'] for item in get_people_container().query_items(query="SELECT * FROM c", enable_cross_partition_query=True)
+    ]
+    count = rebuild_freebusy(person_ids, first_day, last_day, force=not stale_only)
+    click.echo(f"Rebuilt {count} free/busy rows for {len(person_ids)} people")
+
+
+@app.cli.command('backfill-booking-epochs')
+def backfill_booking_epochs_command():
+    normalized = backfill_booking_epochs()
+    refresh_booking_freebusy(normalized)
+    click.echo(f"Normalized {len(normalized)} bookings to UTC with epoch times")
+
+
+@app.cli.command('migrate-bookings-layout')
+def migrate_bookings_layout_command():
+    migrated = migrate_bookings_layout()
+    refresh_booking_freebusy(migrated)
+    click.echo(f"Migrated {len(migrated)} bookings to the date-partitioned layout")
 
 
 if __name__ == '__main__':
+    create_tables()
     app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 8000)), debug=False)
 
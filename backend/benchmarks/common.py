@@ -0,0 +1,60 @@
+import json
+import math
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    rank = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(durations, unit='ms'):
+    scale = 1000.0 if unit == 'ms' else 1000000.0
+    values = sorted(duration * scale for duration in durations)
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'unit': unit,
+        'mean': sum(values) / len(values),
+        'min': values[0],
+        'p50': percentile(values, 0.50),
+        'p95': percentile(values, 0.95),
+        'p99': percentile(values, 0.99),
+        'max': values[-1]
+    }
+
+
+def measure(function, number, repeat):
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        durations.append((time.perf_counter() - started) / number)
+    return durations
+
+
+def run_metadata():
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpuCount': os.cpu_count(),
+        'storageBackend': os.environ.get('STORAGE_BACKEND', 'azure')
+    }
+
+
+def emit(report, output=None):
+    text = json.dumps(report, indent=2, default=str)
+    if output:
+        with open(output, 'w', encoding='utf-8') as handle:
+            handle.write(text + '\n')
+    else:
+        print(text)
@@ -0,0 +1,124 @@
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import date, datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from functions.booking_store import booking_claim_keys, create_bookings, new_booking_id, read_claims
+from functions.storage_client import get_people_container
+
+DAY_TEMPLATES = [
+    [('08:00', '16:00')],
+    [('09:00', '17:00')],
+    [('07:30', '15:30')],
+    [('10:00', '18:00')],
+    [('08:00', '12:00'), ('13:00', '16:00')],
+    [('09:00', '12:30'), ('13:30', '17:30')]
+]
+BOOKING_DURATIONS = [30, 45, 60, 60, 90]
+BOOKING_HOURS = (8, 18)
+LOAD_CHUNK_SIZE = 500
+
+
+def generate_availability(rng):
+    availability = []
+    for day in range(7):
+        if day >= 5 and rng.random() > 0.1:
+            continue
+        if day < 5 and rng.random() < 0.1:
+            continue
+        template = rng.choice(DAY_TEMPLATES)
+        availability.append({
+            'day': day,
+            'timeSlots': [{'start': start, 'end': end} for start, end in template]
+        })
+    return availability
+
+
+def generate_people(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            'id': f'bench-person-{index:06d}',
+            'name': f'Bench Person {index}',
+            'email': f'person{index}@bench.example',
+            'availability': generate_availability(rng)
+        }
+        for index in range(count)
+    ]
+
+
+def first_monday(day):
+    return day + timedelta(days=(7 - day.weekday()) % 7)
+
+
+def generate_bookings(people, count, first_day, weeks, seed=0, max_group_size=4):
+    rng = random.Random(seed + 1)
+    first_day = first_monday(first_day)
+    busy = {}
+    bookings = []
+    attempts = 0
+    while len(bookings) < count and attempts < count * 20:
+        attempts += 1
+        group = rng.sample(people, min(len(people), rng.randint(1, max_group_size)))
+        day = first_day + timedelta(days=rng.randrange(weeks * 7))
+        start = datetime.combine(day, datetime.min.time()) + timedelta(
+            minutes=rng.randrange(BOOKING_HOURS[0] * 60, BOOKING_HOURS[1] * 60, 15)
+        )
+        end = start + timedelta(minutes=rng.choice(BOOKING_DURATIONS))
+        if any(s < end and start < e for person in group for s, e in busy.get((person['id'], day), [])):
+            continue
+        for person in group:
+            busy.setdefault((person['id'], day), []).append((start, end))
+        bookings.append({
+            'id': new_booking_id(start, suffix=f'{len(bookings):032x}'),
+            'personIds': [person['id'] for person in group],
+            'startTime': start.isoformat(),
+            'endTime': end.isoformat(),
+            'title': 'Benchmark booking',
+            'description': ''
+        })
+    return bookings
+
+
+def load_dataset(people, bookings):
+    get_people_container().upsert_many(people)
+    for start in range(0, len(bookings), LOAD_CHUNK_SIZE):
+        chunk = bookings[start:start + LOAD_CHUNK_SIZE]
+        create_bookings(chunk, read_claims([key for booking in chunk for key in booking_claim_keys(booking)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic people/bookings dataset')
+    parser.add_argument('--people', type=int, default=200)
+    parser.add_argument('--bookings', type=int, default=2000)
+    parser.add_argument('--weeks', type=int, default=4)
+    parser.add_argument('--start', default=date.today().isoformat())
+    parser.add_argument('--group-size', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the dataset as JSON instead of printing it')
+    parser.add_argument('--load', action='store_true', help='write the dataset into the configured storage backend')
+    args = parser.parse_args()
+
+    people = generate_people(args.people, args.seed)
+    bookings = generate_bookings(
+        people, args.bookings, date.fromisoformat(args.start), args.weeks, args.seed, args.group_size
+    )
+    if args.load:
+        load_dataset(people, bookings)
+        print(f"Loaded {len(people)} people and {len(bookings)} bookings")
+        return
+
+    dataset = {'people': people, 'bookings': bookings}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(dataset, handle)
+    else:
+        json.dump(dataset, sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import emit, run_metadata, summarize
+from benchmarks.datagen import BOOKING_DURATIONS, first_monday, generate_bookings, generate_people
+
+SCENARIOS = ('slots_find', 'slots_search', 'bookings_create', 'bookings_by_person')
+SEED_CHUNK_SIZE = 1000
+
+
+class InProcessClient:
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method, path, json=None, params=None):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(path, method=method, json=json, query_string=params)
+        response.close()
+        return response.status_code
+
+
+class HttpClient:
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=64, pool_maxsize=64)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def request(self, method, path, json=None, params=None):
+        response = self.session.request(method, self.base_url + path, json=json, params=params, timeout=self.timeout)
+        response.close()
+        return response.status_code
+
+
+def make_client(args):
+    if args.url:
+        return HttpClient(args.url, args.timeout)
+    os.environ['STORAGE_BACKEND'] = args.backend
+    if args.backend == 'sqlite':
+        os.environ.setdefault('SQLITE_PATH', 'benchmark.db')
+    from app import app
+    return InProcessClient(app)
+
+
+def seed(client, people, bookings):
+    for start in range(0, len(people), SEED_CHUNK_SIZE):
+        status = client.request('POST', '/api/people/bulk', json=people[start:start + SEED_CHUNK_SIZE])
+        if status != 201:
+            raise RuntimeError(f"Seeding people failed with HTTP {status}")
+    for start in range(0, len(bookings), SEED_CHUNK_SIZE):
+        chunk = [
+            {key: booking[key] for key in ('personIds', 'startTime', 'endTime', 'title')}
+            for booking in bookings[start:start + SEED_CHUNK_SIZE]
+        ]
+        status = client.request('POST', '/api/bookings/bulk', json=chunk)
+        if status not in (201, 400):
+            raise RuntimeError(f"Seeding bookings failed with HTTP {status}")
+
+
+def build_request(scenario, rng, person_ids, first_day, weeks, group_size):
+    group = rng.sample(person_ids, min(group_size, len(person_ids)))
+    day = first_day + timedelta(days=rng.randrange(weeks * 7))
+    if scenario == 'slots_find':
+        return 'POST', '/api/slots/find', {'personIds': group, 'date': day.isoformat(), 'durationMinutes': 30}, None
+    if scenario == 'slots_search':
+        body = {
+            'personIds': group,
+            'from': day.isoformat(),
+            'to': (day + timedelta(days=6)).isoformat(),
+            'durationMinutes': 30
+        }
+        return 'POST', '/api/slots/search', body, None
+    if scenario == 'bookings_create':
+        start = datetime.combine(day, datetime.min.time()) + timedelta(minutes=rng.randrange(8 * 60, 18 * 60, 15))
+        end = start + timedelta(minutes=rng.choice(BOOKING_DURATIONS))
+        body = {'personIds': group, 'startTime': start.isoformat(), 'endTime': end.isoformat(), 'title': 'Load test'}
+        return 'POST', '/api/bookings', body, None
+    params = {'personIds': ','.join(group), 'from': day.isoformat(), 'to': (day + timedelta(days=6)).isoformat()}
+    return 'GET', '/api/bookings', None, params
+
+
+def run_scenario(client, scenario, requests_count, concurrency, rng, person_ids, first_day, weeks, group_size):
+    planned = [
+        build_request(scenario, rng, person_ids, first_day, weeks, group_size)
+        for _ in range(requests_count)
+    ]
+
+    def execute(request_args):
+        method, path, body, params = request_args
+        started = time.perf_counter()
+        try:
+            status = client.request(method, path, json=body, params=params)
+        except Exception as e:
+            status = type(e).__name__
+        return time.perf_counter() - started, status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(execute, planned))
+    elapsed = time.perf_counter() - started
+
+    statuses = {}
+    for _, status in outcomes:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    errors = sum(count for status, count in statuses.items() if not status.isdigit() or int(status) >= 500)
+    return {
+        'scenario': scenario,
+        'requests': requests_count,
+        'concurrency': concurrency,
+        'groupSize': group_size,
+        'elapsedSeconds': elapsed,
+        'throughput': requests_count / elapsed if elapsed else None,
+        'errors': errors,
+        'statuses': statuses,
+        'latency': summarize([duration for duration, _ in outcomes])
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTTP load driver for slot search and booking endpoints')
+    parser.add_argument('--url', help='base URL of a running server; defaults to the app in-process')
+    parser.add_argument('--backend', default='memory', choices=['memory', 'sqlite', 'azure'],
+                        help='storage backend for the in-process app')
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                        help='scenario to run (repeatable); defaults to all')
+    parser.add_argument('--people', type=int, default=200)
+    parser.add_argument('--bookings', type=int, default=2000)
+    parser.add_argument('--weeks', type=int, default=4)
+    parser.add_argument('--group-size', type=int, default=3)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--skip-seed', action='store_true', help='reuse data already present in the backend')
+    parser.add_argument('--output', help='write the JSON report to a file instead of stdout')
+    args = parser.parse_args()
+
+    client = make_client(args)
+    first_day = first_monday(date.today())
+    people = generate_people(args.people, args.seed)
+    person_ids = [person['id'] for person in people]
+    if not args.skip_seed:
+        seed_started = time.perf_counter()
+        seed(client, people, generate_bookings(people, args.bookings, first_day, args.weeks, args.seed))
+        seed_seconds = time.perf_counter() - seed_started
+    else:
+        seed_seconds = None
+
+    rng = random.Random(args.seed)
+    results = []
+    for scenario in args.scenario or SCENARIOS:
+        if args.warmup:
+            run_scenario(client, scenario, args.warmup, args.concurrency, rng, person_ids, first_day, args.weeks, args.group_size)
+        results.append(run_scenario(
+            client, scenario, args.requests, args.concurrency, rng, person_ids, first_day, args.weeks, args.group_size
+        ))
+
+    emit({
+        'suite': 'load',
+        'metadata': {
+            **run_metadata(),
+            'target': args.url or f'in-process:{args.backend}',
+            'people': args.people,
+            'bookings': args.bookings,
+            'weeks': args.weeks,
+            'seed': args.seed,
+            'seedSeconds': seed_seconds
+        },
+        'results': results
+    }, args.output)
+
+
+if __name__ == '__main__':
+    main()
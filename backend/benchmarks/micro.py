@@ -0,0 +1,153 @@
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import date, datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('STORAGE_BACKEND', 'memory')
+
+from app import check_booking
+from benchmarks.common import emit, measure, run_metadata, summarize
+from benchmarks.datagen import first_monday, generate_availability
+from functions.availability import compile_availability
+from functions.entity_codec import encode_entity
+from functions.freebusy import availability_matrix, free_matrix, group_slots, quorum_slots
+from functions.slot_engine import common_free_intervals, find_common_slots
+from functions.storage_client import BOOKINGS_TABLE, PEOPLE_TABLE, TABLE_SCHEMAS, entity_to_item
+from functions.utils import get_time_slots_for_day, parse_datetime, to_epoch
+
+GROUP_SIZES = [2, 5, 10, 25]
+BUSY_COUNTS = [0, 10, 100, 1000]
+
+
+def _schedules(rng, count):
+    schedules = []
+    while len(schedules) < count:
+        schedule = generate_availability(rng)
+        if any(day['day'] == 0 for day in schedule):
+            schedules.append(schedule)
+    return schedules
+
+
+def _busy_intervals(rng, day, count):
+    origin = datetime.combine(day, datetime.min.time())
+    intervals = []
+    for _ in range(count):
+        start = origin + timedelta(minutes=rng.randrange(0, 24 * 60, 5))
+        intervals.append((start, start + timedelta(minutes=rng.choice([15, 30, 60]))))
+    return intervals
+
+
+def _busy_minutes(rng, count):
+    intervals = []
+    for _ in range(count):
+        start = rng.randrange(0, 24 * 60, 5)
+        intervals.append((start, start + rng.choice([15, 30, 60])))
+    return intervals
+
+
+def _legacy_entity(item):
+    return {key: json.dumps(value) if isinstance(value, (list, dict)) else value for key, value in item.items()}
+
+
+def _entity_rows(schedules):
+    person = {
+        'PartitionKey': 'p0', 'RowKey': 'p0', 'id': 'p0', 'name': 'Anna Kowalska',
+        'email': 'anna.kowalska@example.com', 'availability': schedules[0]
+    }
+    booking = {
+        'PartitionKey': '2024-03-04', 'RowKey': 'b0', 'id': 'b0', 'personIds': [f'p{index}' for index in range(5)],
+        'startTime': '2024-03-04T09:00:00', 'endTime': '2024-03-04T09:30:00',
+        'startEpoch': 1709542800, 'endEpoch': 1709544600, 'title': 'Planning', 'description': 'Weekly planning meeting'
+    }
+    return [(PEOPLE_TABLE, person), (BOOKINGS_TABLE, booking)]
+
+
+def run_benchmarks(number, repeat, seed=0):
+    rng = random.Random(seed)
+    day = first_monday(date.today())
+    schedules = _schedules(rng, max(GROUP_SIZES))
+    compiled = [compile_availability(schedule) for schedule in schedules]
+    results = []
+
+    def record(name, params, function):
+        results.append({'name': name, 'params': params, **summarize(measure(function, number, repeat), unit='us')})
+
+    record('compile_availability', {}, lambda: compile_availability(schedules[0]))
+    record('get_time_slots_for_day', {'compiled': False}, lambda: get_time_slots_for_day(schedules[0], 0, day))
+    record('get_time_slots_for_day', {'compiled': True}, lambda: get_time_slots_for_day(compiled[0], 0, day))
+    record('parse_datetime', {'format': 'iso'}, lambda: parse_datetime('2024-03-04T09:30:00'))
+    record('parse_datetime', {'format': 'iso-utc'}, lambda: parse_datetime('2024-03-04T09:30:00.000Z'))
+    record('parse_datetime', {'format': 'fallback'}, lambda: parse_datetime('4 March 2024 09:30'))
+
+    for table_name, row in _entity_rows(schedules):
+        legacy = _legacy_entity(row)
+        typed = encode_entity(row, TABLE_SCHEMAS[table_name], table_name)
+        record('entity_to_item', {'table': table_name, 'format': 'legacy-json'}, lambda: entity_to_item(legacy))
+        record('entity_to_item', {'table': table_name, 'format': 'schema'}, lambda: entity_to_item(typed, table_name))
+
+    for group_size in GROUP_SIZES:
+        intervals = [availability.intervals(0) for availability in compiled[:group_size]]
+        record('common_free_intervals', {'groupSize': group_size}, lambda: common_free_intervals(intervals))
+        for busy_count in BUSY_COUNTS:
+            busy = _busy_minutes(rng, busy_count)
+            record(
+                'find_common_slots', {'groupSize': group_size, 'busy': busy_count},
+                lambda: find_common_slots(intervals, busy, 30, 15)
+            )
+
+    person_ids = [f'p{index}' for index in range(max(GROUP_SIZES))]
+    availabilities = dict(zip(person_ids, compiled))
+    for group_size in GROUP_SIZES:
+        group = person_ids[:group_size]
+        busy_by_person = {person_id: _busy_minutes(rng, 20) for person_id in group}
+        available = availability_matrix(group, availabilities, day, 14)
+        free = free_matrix(available, group, busy_by_person)
+        record('free_matrix', {'groupSize': group_size, 'days': 14}, lambda: free_matrix(
+            availability_matrix(group, availabilities, day, 14), group, busy_by_person
+        ))
+        record('group_slots', {'groupSize': group_size, 'days': 14}, lambda: group_slots(available, free, 6, 3))
+        record(
+            'quorum_slots', {'groupSize': group_size, 'days': 14},
+            lambda: quorum_slots(available, free, max(1, group_size * 2 // 3), 6, 3, 10)
+        )
+
+    for group_size in GROUP_SIZES:
+        group = person_ids[:group_size]
+        free = common_free_intervals([availabilities[person_id].intervals(0) for person_id in group])
+        if not free:
+            continue
+        origin = datetime.combine(day, datetime.min.time())
+        start = origin + timedelta(minutes=free[0][0])
+        end = start + timedelta(minutes=min(30, free[0][1] - free[0][0]))
+        for busy_count in BUSY_COUNTS:
+            busy = [
+                (to_epoch(busy_start), to_epoch(busy_end)) for busy_start, busy_end in _busy_intervals(rng, day, busy_count * 2)
+                if not (busy_start < end and start < busy_end)
+            ][:busy_count]
+            record(
+                'check_booking', {'groupSize': group_size, 'busy': busy_count},
+                lambda: check_booking(group, start, end, availabilities, busy)
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks for slot computation and conflict checks')
+    parser.add_argument('--number', type=int, default=200, help='calls per timing sample')
+    parser.add_argument('--repeat', type=int, default=20, help='timing samples per benchmark')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the JSON report to a file instead of stdout')
+    args = parser.parse_args()
+
+    emit({
+        'suite': 'micro',
+        'metadata': {**run_metadata(), 'number': args.number, 'repeat': args.repeat, 'seed': args.seed},
+        'results': run_benchmarks(args.number, args.repeat, args.seed)
+    }, args.output)
+
+
+if __name__ == '__main__':
+    main()
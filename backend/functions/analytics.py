@@ -0,0 +1,225 @@
+import os
+from datetime import date, timedelta
+
+import numpy as np
+
+from functions.availability import MINUTES_PER_DAY, day_start
+from functions.booking_store import booking_epochs, claim_keys, iter_index_rows, read_claims
+from functions.freebusy import week_masks
+from functions.metrics import timed
+from functions.series_store import find_series_for_people, occurrences, series_tag, unique_series
+from functions.storage_client import get_analytics_container
+from functions.utils import to_epoch
+
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+HOURS_PER_WEEK = 7 * 24
+MAX_ANALYTICS_WEEKS = int(os.environ.get('ANALYTICS_MAX_WEEKS', 106))
+MAX_ANALYTICS_PEOPLE = int(os.environ.get('ANALYTICS_MAX_PEOPLE', 500))
+DEFAULT_ANALYTICS_WEEKS = 12
+PEAK_HOURS = 5
+INDEX_PAGE_SIZE = 1000
+
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def week_range(first_day, last_day):
+    weeks = []
+    start = week_start(first_day)
+    while start <= last_day:
+        weeks.append(start)
+        start += timedelta(days=7)
+    return weeks
+
+
+def availability_masks(person_ids, availabilities):
+    masks = np.zeros((len(person_ids), MINUTES_PER_WEEK), dtype=bool)
+    for row, person_id in enumerate(person_ids):
+        compiled = availabilities.get(person_id)
+        if compiled is not None:
+            masks[row] = week_masks(compiled, 1).reshape(-1)
+    return masks
+
+
+def load_booking_columns(person_ids, first_day, last_day):
+    starts = []
+    ends = []
+    rows = []
+    for row, person_id in enumerate(person_ids):
+        for entry in iter_index_rows(person_id, first_day, last_day, page_size=INDEX_PAGE_SIZE,
+                                     select=['startTime', 'endTime', 'startEpoch', 'endEpoch']):
+            start_epoch, end_epoch = booking_epochs(entry)
+            starts.append(start_epoch)
+            ends.append(end_epoch)
+            rows.append(row)
+
+    positions = {person_id: row for row, person_id in enumerate(person_ids)}
+    window_start = day_start(first_day)
+    window_end = day_start(last_day) + timedelta(days=1)
+    for series in unique_series(find_series_for_people(person_ids)):
+        members = [positions[person_id] for person_id in series['personIds'] if person_id in positions]
+        for _, occurrence_start, occurrence_end in occurrences(series, window_start, window_end):
+            start_epoch, end_epoch = to_epoch(occurrence_start), to_epoch(occurrence_end, round_up=True)
+            starts.extend([start_epoch] * len(members))
+            ends.extend([end_epoch] * len(members))
+            rows.extend(members)
+    return np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64), np.array(rows, dtype=np.intp)
+
+
+@timed('analytics')
+def week_stats(available, starts, ends, rows, week_epoch):
+    person_count = available.shape[0]
+    start_minutes = np.clip((starts - week_epoch) // 60, 0, MINUTES_PER_WEEK)
+    end_minutes = np.clip(-((week_epoch - ends) // 60), 0, MINUTES_PER_WEEK)
+    inside = start_minutes < end_minutes
+    edges = np.zeros((person_count, MINUTES_PER_WEEK + 1), dtype=np.int32)
+    np.add.at(edges, (rows[inside], start_minutes[inside]), 1)
+    np.add.at(edges, (rows[inside], end_minutes[inside]), -1)
+    booked = np.cumsum(edges[:, :-1], axis=1) > 0
+    return {
+        'availableMinutes': available.sum(axis=1),
+        'bookedMinutes': booked.sum(axis=1),
+        'bookedAvailableMinutes': (booked & available).sum(axis=1),
+        'hourly': booked.reshape(person_count, HOURS_PER_WEEK, 60).sum(axis=2),
+        'free': np.packbits(available & ~booked, axis=1)
+    }
+
+
+def read_cached_weeks(person_ids, weeks):
+    container = get_analytics_container()
+    cached = {}
+    for person_id in person_ids:
+        where = [
+            ('PartitionKey', 'eq', person_id),
+            ('RowKey', 'ge', weeks[0].isoformat()),
+            ('RowKey', 'le', weeks[-1].isoformat())
+        ]
+        for row in container.query_items(where=where):
+            cached[(person_id, row['id'])] = row
+    return cached
+
+
+def week_days(week):
+    return [week + timedelta(days=offset) for offset in range(7)]
+
+
+def week_tags(person_ids, weeks, availabilities):
+    claims = read_claims(claim_keys(person_ids, [day for week in weeks for day in week_days(week)]))
+    series_by_person = find_series_for_people(person_ids)
+    tags = {}
+    for person_id in person_ids:
+        prefix = f"{availabilities[person_id].version or 0}|{series_tag(series_by_person.get(person_id, []))}"
+        for week in weeks:
+            versions = '.'.join(
+                str((claims[(day.isoformat(), person_id)][0] or {}).get('version', 0)) for day in week_days(week)
+            )
+            tags[(person_id, week.isoformat())] = f"{prefix}|{versions}"
+    return tags
+
+
+def is_usable(row, tag, final):
+    return row is not None and (row.get('final', False) or (not final and row.get('tag') == tag))
+
+
+def compute_weeks(person_ids, weeks, availabilities, tags, cached, today):
+    container = get_analytics_container()
+    available = availability_masks(person_ids, availabilities)
+    starts, ends, rows = load_booking_columns(person_ids, weeks[0], weeks[-1] + timedelta(days=6))
+    for week in weeks:
+        final = week + timedelta(days=7) <= today
+        stats = week_stats(available, starts, ends, rows, to_epoch(day_start(week)))
+        bodies = []
+        keys = []
+        for row, person_id in enumerate(person_ids):
+            key = (person_id, week.isoformat())
+            if cached.get(key, {}).get('final', False):
+                continue
+            cached[key] = {
+                'id': week.isoformat(),
+                'availableMinutes': int(stats['availableMinutes'][row]),
+                'bookedMinutes': int(stats['bookedMinutes'][row]),
+                'bookedAvailableMinutes': int(stats['bookedAvailableMinutes'][row]),
+                'hourly': stats['hourly'][row].tolist(),
+                'free': stats['free'][row].tobytes(),
+                'final': final,
+                'tag': tags.get(key)
+            }
+            bodies.append(cached[key])
+            keys.append(key)
+        if bodies:
+            container.upsert_many(bodies, keys=keys)
+
+
+def hours(minutes):
+    return round(minutes / 60, 2)
+
+
+@timed('analytics')
+def summarize(person_ids, weeks, cached):
+    hourly = np.zeros(HOURS_PER_WEEK, dtype=np.int64)
+    unlocked = np.zeros(len(person_ids), dtype=np.int64)
+    common_minutes = 0
+    people = [{'personId': person_id, 'weeks': []} for person_id in person_ids]
+    for week in weeks:
+        rows = [cached[(person_id, week.isoformat())] for person_id in person_ids]
+        for person, row in zip(people, rows):
+            person['weeks'].append({
+                'week': week.isoformat(),
+                'availableHours': hours(row['availableMinutes']),
+                'bookedHours': hours(row['bookedMinutes']),
+                'utilization': round(row['bookedAvailableMinutes'] / row['availableMinutes'], 4) if row['availableMinutes'] else 0.0
+            })
+        hourly += np.array([row['hourly'] for row in rows], dtype=np.int64).sum(axis=0)
+        free = np.frombuffer(b''.join(bytes(row['free']) for row in rows), dtype=np.uint8).reshape(len(rows), -1)
+        blocked = ~np.unpackbits(free, axis=1)[:, :MINUTES_PER_WEEK].astype(bool)
+        blocked_count = blocked.sum(axis=0)
+        common_minutes += int((blocked_count == 0).sum())
+        unlocked += (blocked & (blocked_count == 1)).sum(axis=1)
+
+    for row, person in enumerate(people):
+        week_rows = [cached[(person['personId'], week.isoformat())] for week in weeks]
+        available_minutes = sum(week_row['availableMinutes'] for week_row in week_rows)
+        booked_available = sum(week_row['bookedAvailableMinutes'] for week_row in week_rows)
+        person['availableHours'] = hours(available_minutes)
+        person['bookedHours'] = hours(sum(week_row['bookedMinutes'] for week_row in week_rows))
+        person['utilization'] = round(booked_available / available_minutes, 4) if available_minutes else 0.0
+        person['blockingHours'] = hours(int(unlocked[row]))
+
+    peak = [index for index in np.argsort(-hourly, kind='stable')[:PEAK_HOURS].tolist() if hourly[index] > 0]
+    return {
+        'weeks': [week.isoformat() for week in weeks],
+        'people': people,
+        'peakHours': [
+            {'dayOfWeek': index // 24, 'hour': index % 24, 'bookedHours': hours(int(hourly[index]))} for index in peak
+        ],
+        'bottlenecks': [
+            {'personId': person['personId'], 'blockingHours': person['blockingHours']}
+            for person in sorted(people, key=lambda person: -person['blockingHours']) if person['blockingHours'] > 0
+        ],
+        'commonFreeHours': hours(common_minutes)
+    }
+
+
+def utilization(person_ids, first_day, last_day, availabilities, today=None):
+    today = today or date.today()
+    weeks = week_range(first_day, last_day)
+    if len(weeks) > MAX_ANALYTICS_WEEKS:
+        raise ValueError(f"Analytics range is limited to {MAX_ANALYTICS_WEEKS} weeks")
+    if len(person_ids) > MAX_ANALYTICS_PEOPLE:
+        raise ValueError(f"Analytics are limited to {MAX_ANALYTICS_PEOPLE} people per request")
+    cached = read_cached_weeks(person_ids, weeks)
+    open_weeks = [week for week in weeks if week + timedelta(days=7) > today]
+    tags = week_tags(person_ids, open_weeks, availabilities) if open_weeks else {}
+    stale = [
+        week for week in weeks
+        if not all(
+            is_usable(cached.get(key), tags.get(key), week + timedelta(days=7) <= today)
+            for key in ((person_id, week.isoformat()) for person_id in person_ids)
+        )
+    ]
+    if stale:
+        compute_weeks(person_ids, stale, availabilities, tags, cached, today)
+    result = summarize(person_ids, weeks, cached)
+    result['computedWeeks'] = [week.isoformat() for week in stale]
+    return result
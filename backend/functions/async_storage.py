@@ -0,0 +1,193 @@
+import asyncio
+import atexit
+import logging
+import os
+import threading
+
+import aiohttp
+from azure.core.exceptions import ResourceNotFoundError
+from azure.core.pipeline.transport import AioHttpTransport
+from azure.data.tables.aio import TableServiceClient as AsyncTableServiceClient
+
+from functions.storage_client import (
+    PEOPLE_TABLE, BOOKING_INDEX_TABLE, BOOKING_CLAIMS_TABLE, FREEBUSY_TABLE, SERIES_INDEX_TABLE,
+    STORAGE_POOL_SIZE, TABLES,
+    get_storage_backend, get_table_service,
+    get_people_table, get_booking_index_table, get_booking_claims_table,
+    get_freebusy_table, get_series_index_table,
+    build_filter, read_many_filters, key_pair, entity_key, entity_to_item, entity_etag
+)
+from functions.metrics import bind_request_metrics, current_request_metrics, storage_span
+from functions.table_engine import AsyncTableServiceAdapter
+
+_loop = None
+_loop_pid = None
+_loop_lock = threading.Lock()
+_async_table_service = None
+_async_session = None
+_async_tables = {}
+
+
+def get_event_loop():
+    global _loop, _loop_pid, _async_table_service, _async_session
+    with _loop_lock:
+        if _loop is None or _loop_pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _loop_pid = os.getpid()
+            _async_table_service = None
+            _async_session = None
+            _async_tables.clear()
+            threading.Thread(target=_loop.run_forever, name='storage-io', daemon=True).start()
+    return _loop
+
+
+@atexit.register
+def close_async_storage():
+    if _loop is None or _loop_pid != os.getpid() or not _loop.is_running():
+        return
+    try:
+        run_async(_close_async_clients())
+    except Exception as e:
+        logging.warning(f"Error closing async storage clients: {str(e)}")
+
+
+async def _close_async_clients():
+    global _async_table_service, _async_session
+    if _async_table_service is not None:
+        await _async_table_service.close()
+        _async_table_service = None
+    if _async_session is not None:
+        await _async_session.close()
+        _async_session = None
+    _async_tables.clear()
+
+
+def run_async(coroutine):
+    coroutine = bind_request_metrics(coroutine, current_request_metrics())
+    return asyncio.run_coroutine_threadsafe(coroutine, get_event_loop()).result()
+
+
+async def get_async_table_service():
+    global _async_table_service, _async_session
+    if _async_table_service is None and get_storage_backend() != 'azure':
+        _async_table_service = AsyncTableServiceAdapter(get_table_service())
+    if _async_table_service is None:
+        connection_string = os.environ.get('AzureWebJobsStorage')
+        if not connection_string:
+            raise ValueError("AzureWebJobsStorage environment variable is not set")
+
+        logging.info("Connecting to Azure Table Storage (async)...")
+        connector = aiohttp.TCPConnector(limit=STORAGE_POOL_SIZE, limit_per_host=STORAGE_POOL_SIZE, ttl_dns_cache=300)
+        _async_session = aiohttp.ClientSession(connector=connector)
+        transport = AioHttpTransport(session=_async_session, session_owner=False)
+        _async_table_service = AsyncTableServiceClient.from_connection_string(
+            conn_str=connection_string,
+            transport=transport
+        )
+    return _async_table_service
+
+
+async def _get_async_table(table_name):
+    table_client = _async_tables.get(table_name)
+    if table_client is None:
+        table_service = await get_async_table_service()
+        table_client = table_service.get_table_client(table_name=table_name)
+        _async_tables[table_name] = table_client
+    return table_client
+
+
+async def warm_async_tables():
+    for table_name in TABLES:
+        await _get_async_table(table_name)
+    return len(TABLES)
+
+
+class AsyncTableContainerWrapper:
+    def __init__(self, table_name):
+        self.table_name = table_name
+
+    async def query_items(self, where=None, any_of=None):
+        with storage_span(self.table_name, 'query'):
+            entities = await self._query_entities(where, any_of)
+        return [entity_to_item(entity, self.table_name) for entity in entities]
+
+    async def _query_entities(self, where=None, any_of=None):
+        table_client = await _get_async_table(self.table_name)
+        if where or any_of:
+            query_filter, parameters = build_filter(where, any_of)
+            entities = table_client.query_entities(query_filter=query_filter, parameters=parameters)
+        else:
+            entities = table_client.list_entities()
+        return [entity async for entity in entities]
+
+    async def read_many(self, keys):
+        keys = list(dict.fromkeys(key_pair(key) for key in keys))
+        found = await self.read_many_with_etags(keys)
+        return [found[key][0] for key in keys if key in found]
+
+    async def read_many_with_etags(self, keys):
+        keys = list(dict.fromkeys(key_pair(key) for key in keys))
+        try:
+            chunks = await asyncio.gather(*(
+                self._read_many_chunk(any_of) for any_of in read_many_filters(keys)
+            ))
+        except Exception as e:
+            logging.error(f"Error reading items: {str(e)}")
+            raise
+        return {
+            entity_key(entity): (entity_to_item(entity, self.table_name), entity_etag(entity))
+            for chunk in chunks for entity in chunk
+        }
+
+    async def _read_many_chunk(self, any_of):
+        with storage_span(self.table_name, 'read_many'):
+            return await self._query_entities(any_of=any_of)
+
+    async def read_item(self, item, partition_key):
+        result, _ = await self.read_item_with_etag(item, partition_key)
+        return result
+
+    async def read_item_with_etag(self, item, partition_key):
+        table_client = await _get_async_table(self.table_name)
+        try:
+            with storage_span(self.table_name, 'read'):
+                entity = await table_client.get_entity(partition_key=partition_key, row_key=item)
+            return entity_to_item(entity, self.table_name), entity_etag(entity)
+        except ResourceNotFoundError:
+            raise Exception("Item not found")
+        except Exception as e:
+            logging.error(f"Error reading item: {str(e)}")
+            raise
+
+    async def read_etag(self, item, partition_key):
+        table_client = await _get_async_table(self.table_name)
+        try:
+            with storage_span(self.table_name, 'read_etag'):
+                entity = await table_client.get_entity(partition_key=partition_key, row_key=item, select=['RowKey'])
+            return entity_etag(entity)
+        except ResourceNotFoundError:
+            raise Exception("Item not found")
+        except Exception as e:
+            logging.error(f"Error reading item etag: {str(e)}")
+            raise
+
+
+def get_async_people_container():
+    get_people_table()
+    return AsyncTableContainerWrapper(PEOPLE_TABLE)
+
+def get_async_booking_index_container():
+    get_booking_index_table()
+    return AsyncTableContainerWrapper(BOOKING_INDEX_TABLE)
+
+def get_async_booking_claims_container():
+    get_booking_claims_table()
+    return AsyncTableContainerWrapper(BOOKING_CLAIMS_TABLE)
+
+def get_async_freebusy_container():
+    get_freebusy_table()
+    return AsyncTableContainerWrapper(FREEBUSY_TABLE)
+
+def get_async_series_index_container():
+    get_series_index_table()
+    return AsyncTableContainerWrapper(SERIES_INDEX_TABLE)
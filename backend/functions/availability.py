@@ -0,0 +1,69 @@
+import math
+from datetime import datetime, time, timedelta
+from dateutil import parser
+
+MINUTES_PER_DAY = 24 * 60
+
+
+class CompiledAvailability:
+    __slots__ = ('days', 'version')
+
+    def __init__(self, days, version=None):
+        self.days = days
+        self.version = version
+
+    def intervals(self, day_of_week):
+        return self.days[day_of_week]
+
+    def is_available(self, day_of_week, start_minute, end_minute):
+        for slot_start, slot_end in self.days[day_of_week]:
+            if slot_start <= start_minute and end_minute <= slot_end:
+                return True
+        return False
+
+
+def _parse_minute(value):
+    if isinstance(value, str):
+        if ':' in value and len(value) <= 5:
+            hours, minutes = value.split(':')
+            value = time(int(hours), int(minutes))
+        else:
+            value = parser.parse(value).time()
+    return value.hour * 60 + value.minute
+
+
+def compile_availability(schedule, version=None):
+    days = [None] * 7
+    for day_availability in schedule or []:
+        day_of_week = day_availability.get('day')
+        if day_of_week not in range(7) or days[int(day_of_week)] is not None:
+            continue
+        day_of_week = int(day_of_week)
+
+        intervals = []
+        for time_range in day_availability.get('timeSlots', []):
+            if not time_range.get('start') or not time_range.get('end'):
+                continue
+            try:
+                start_minute = _parse_minute(time_range['start'])
+                end_minute = _parse_minute(time_range['end'])
+            except (ValueError, TypeError, OverflowError, AttributeError):
+                continue
+            if start_minute < end_minute:
+                intervals.append((start_minute, end_minute))
+        days[day_of_week] = tuple(sorted(intervals))
+
+    return CompiledAvailability(tuple(day or () for day in days), version)
+
+
+def day_start(date):
+    return datetime.combine(date.date() if isinstance(date, datetime) else date, time())
+
+
+def minutes_since(origin, dt, round_up=False):
+    minutes = (dt - origin).total_seconds() / 60
+    return math.ceil(minutes) if round_up else math.floor(minutes)
+
+
+def minute_to_datetime(origin, minute):
+    return origin + timedelta(minutes=minute)
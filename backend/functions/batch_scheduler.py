@@ -0,0 +1,162 @@
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from functions.slot_engine import anchored_slots, common_anchored_intervals
+
+MAX_CANDIDATES = int(os.environ.get('SCHEDULER_MAX_CANDIDATES', 200))
+MAX_BACKTRACK_STEPS = int(os.environ.get('SCHEDULER_MAX_STEPS', 20000))
+MAX_BACKTRACK_MEETINGS = 200
+PARALLEL_MIN_MEETINGS = int(os.environ.get('SCHEDULER_PARALLEL_MIN', 16))
+SCHEDULER_WORKERS = int(os.environ.get('SCHEDULER_WORKERS', os.cpu_count() or 1))
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _pool = ProcessPoolExecutor(max_workers=SCHEDULER_WORKERS, mp_context=multiprocessing.get_context(start_method))
+            _pool_pid = os.getpid()
+    return _pool
+
+
+@atexit.register
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def independent_groups(meetings):
+    parent = {}
+
+    def find(person_id):
+        while parent[person_id] != person_id:
+            parent[person_id] = parent[parent[person_id]]
+            person_id = parent[person_id]
+        return person_id
+
+    for meeting in meetings:
+        person_ids = meeting['personIds']
+        for person_id in person_ids:
+            parent.setdefault(person_id, person_id)
+        for person_id in person_ids[1:]:
+            parent[find(person_id)] = find(person_ids[0])
+
+    groups = {}
+    for meeting in meetings:
+        groups.setdefault(find(meeting['personIds'][0]), []).append(meeting)
+    return list(groups.values())
+
+
+def meeting_candidates(meeting, free_by_person):
+    window_start, window_end = meeting['window']
+    free_per_person = [
+        [
+            (max(free_start, window_start), min(free_end, window_end), anchor)
+            for free_start, free_end, anchor in free_by_person.get(person_id, ())
+            if free_start < window_end and window_start < free_end
+        ]
+        for person_id in meeting['personIds']
+    ]
+    common = common_anchored_intervals(free_per_person)
+    return anchored_slots(common, meeting['duration'], meeting['step'], MAX_CANDIDATES)
+
+
+def _overlaps(busy, person_ids, start, end):
+    return any(busy_start < end and start < busy_end for person_id in person_ids for busy_start, busy_end in busy.get(person_id, ()))
+
+
+def _reserve(busy, person_ids, start, end):
+    for person_id in person_ids:
+        busy.setdefault(person_id, []).append((start, end))
+
+
+def _release(busy, person_ids):
+    for person_id in person_ids:
+        busy[person_id].pop()
+
+
+def _backtrack(order, candidates, max_steps):
+    busy = {}
+    assignment = {}
+    steps = 0
+
+    def place(position):
+        nonlocal steps
+        if position == len(order):
+            return True
+        meeting = order[position]
+        for start, end in candidates[meeting['index']]:
+            steps += 1
+            if steps > max_steps:
+                return False
+            if _overlaps(busy, meeting['personIds'], start, end):
+                continue
+            _reserve(busy, meeting['personIds'], start, end)
+            assignment[meeting['index']] = (start, end)
+            if place(position + 1):
+                return True
+            del assignment[meeting['index']]
+            _release(busy, meeting['personIds'])
+        return False
+
+    return assignment if place(0) else None
+
+
+def _greedy(order, candidates):
+    busy = {}
+    assignment = {}
+    for meeting in order:
+        for start, end in candidates[meeting['index']]:
+            if not _overlaps(busy, meeting['personIds'], start, end):
+                _reserve(busy, meeting['personIds'], start, end)
+                assignment[meeting['index']] = (start, end)
+                break
+    return assignment
+
+
+def solve_group(meetings, free_by_person, max_steps=MAX_BACKTRACK_STEPS):
+    candidates = {meeting['index']: meeting_candidates(meeting, free_by_person) for meeting in meetings}
+    order = sorted(
+        (meeting for meeting in meetings if candidates[meeting['index']]),
+        key=lambda meeting: (-meeting['priority'], len(candidates[meeting['index']]), meeting['index'])
+    )
+    assignment = None
+    if len(order) <= MAX_BACKTRACK_MEETINGS:
+        assignment = _backtrack(order, candidates, max_steps)
+    return assignment if assignment is not None else _greedy(order, candidates)
+
+
+def schedule_meetings(meetings, free_by_person):
+    groups = independent_groups(meetings)
+    group_free = [
+        {person_id: free_by_person.get(person_id, []) for meeting in group for person_id in meeting['personIds']}
+        for group in groups
+    ]
+    if len(groups) > 1 and len(meetings) >= PARALLEL_MIN_MEETINGS and SCHEDULER_WORKERS > 1:
+        chunk_size = max(1, len(groups) // (SCHEDULER_WORKERS * 4))
+        try:
+            results = list(get_pool().map(solve_group, groups, group_free, chunksize=chunk_size))
+        except BrokenProcessPool as e:
+            logging.warning(f"Scheduler process pool failed, solving in-process: {str(e)}")
+            shutdown_pool()
+            results = map(solve_group, groups, group_free)
+    else:
+        results = map(solve_group, groups, group_free)
+
+    assignment = {}
+    for group_assignment in results:
+        assignment.update(group_assignment)
+    return assignment
@@ -0,0 +1,453 @@
+import asyncio
+import logging
+import os
+import re
+from datetime import timedelta, time
+
+from functions.async_storage import get_async_booking_index_container, get_async_booking_claims_container
+from functions.storage_client import (
+    BOOKINGS_TABLE, MAX_BATCH_SIZE, ConflictError,
+    get_bookings_container, get_booking_index_container, get_booking_claims_container
+)
+from functions.table_versions import bump_table_version
+from functions.utils import parse_datetime, slots_overlap, to_epoch
+
+INDEX_KEY_SEPARATOR = '|'
+INDEX_KEY_END = '~'
+
+BOOKING_ID_PATTERN = re.compile(r'^(\d{4})(\d{2})(\d{2})T\d{6}-')
+
+CLAIM_RETRIES = 5
+INTERNAL_FIELDS = ('startEpoch', 'endEpoch')
+
+
+def new_booking_id(start_time, suffix=None):
+    start_time = parse_datetime(start_time)
+    suffix = suffix or os.urandom(16).hex()
+    return f"{start_time.strftime('%Y%m%dT%H%M%S')}-{suffix}"
+
+
+def is_partitioned_booking_id(booking_id):
+    return BOOKING_ID_PATTERN.match(booking_id) is not None
+
+
+def booking_keys(booking_id):
+    match = BOOKING_ID_PATTERN.match(booking_id)
+    if not match:
+        return booking_id, booking_id
+    year, month, day = match.groups()
+    return f"{year}-{month}-{day}", booking_id
+
+
+def normalize_booking(booking):
+    start_time = parse_datetime(booking['startTime'])
+    end_time = parse_datetime(booking['endTime'])
+    booking['startTime'] = start_time.isoformat()
+    booking['endTime'] = end_time.isoformat()
+    booking['startEpoch'] = to_epoch(start_time)
+    booking['endEpoch'] = to_epoch(end_time, round_up=True)
+    return booking
+
+
+def public_booking(booking):
+    return {key: value for key, value in booking.items() if key not in INTERNAL_FIELDS}
+
+
+def booking_epochs(booking):
+    if booking.get('startEpoch') is not None and booking.get('endEpoch') is not None:
+        return booking['startEpoch'], booking['endEpoch']
+    return to_epoch(booking['startTime']), to_epoch(booking['endTime'], round_up=True)
+
+
+def claim_entry_epochs(entry):
+    if len(entry) >= 5:
+        return entry[3], entry[4]
+    return to_epoch(entry[1]), to_epoch(entry[2], round_up=True)
+
+
+def create_booking(booking, claims=None):
+    normalize_booking(booking)
+    if claims is None:
+        claims = read_claims(booking_claim_keys(booking))
+    reserve_bookings([booking], claims)
+    container = get_bookings_container()
+    partition_key, row_key = booking_keys(booking['id'])
+    try:
+        container.create_item(body=booking, partition_key=partition_key, row_key=row_key, overwrite=False)
+    except Exception:
+        release_bookings([booking])
+        raise
+    try:
+        index_booking(booking)
+    except Exception:
+        container.delete_item(item=row_key, partition_key=partition_key)
+        release_bookings([booking])
+        raise
+    finally:
+        bump_table_version(BOOKINGS_TABLE)
+    return booking
+
+
+def delete_booking(booking_id):
+    container = get_bookings_container()
+    partition_key, row_key = booking_keys(booking_id)
+    booking = container.read_item(item=row_key, partition_key=partition_key)
+    try:
+        container.delete_item(item=row_key, partition_key=partition_key)
+    finally:
+        bump_table_version(BOOKINGS_TABLE)
+    unindex_booking(booking)
+    release_bookings([booking])
+    return booking
+
+
+def _date_range(first_day=None, last_day=None):
+    where = []
+    if first_day is not None:
+        where.append(('PartitionKey', 'ge', first_day.isoformat()))
+    if last_day is not None:
+        where.append(('PartitionKey', 'le', last_day.isoformat()))
+    return where or None
+
+
+def list_bookings(first_day=None, last_day=None):
+    container = get_bookings_container()
+    where = _date_range(first_day, last_day)
+    if where is None:
+        return container.query_items(query="SELECT * FROM c", enable_cross_partition_query=True)
+    return container.query_items(where=where)
+
+
+def list_bookings_page(first_day=None, last_day=None, limit=None, continuation_token=None, select=None):
+    return get_bookings_container().query_page(
+        where=_date_range(first_day, last_day), limit=limit,
+        continuation_token=continuation_token, select=select
+    )
+
+
+def iter_bookings(first_day=None, last_day=None, select=None, page_size=None):
+    return get_bookings_container().iter_items(
+        where=_date_range(first_day, last_day), select=select, page_size=page_size
+    )
+
+
+def create_bookings(bookings, claims):
+    for booking in bookings:
+        normalize_booking(booking)
+    reserve_bookings(bookings, claims)
+    try:
+        index_rows = [entry for booking in bookings for entry in booking_index_rows(booking)]
+        get_booking_index_container().upsert_many(
+            [row for _, row in index_rows],
+            keys=[(partition_key, row['id']) for partition_key, row in index_rows]
+        )
+        get_bookings_container().upsert_many(bookings, keys=[booking_keys(booking['id']) for booking in bookings])
+    except Exception:
+        release_bookings(bookings)
+        raise
+    finally:
+        bump_table_version(BOOKINGS_TABLE)
+    return bookings
+
+
+def _read_indexed(rows):
+    bookings = get_bookings_container().read_many([booking_keys(row['id']) for row in rows])
+    if len(bookings) < len(rows):
+        logging.warning(f"{len(rows) - len(bookings)} indexed bookings could not be read")
+    return bookings
+
+
+def list_bookings_for_people(person_ids, first_day=None, last_day=None):
+    bookings = _read_indexed(find_indexed_bookings(person_ids, first_day, last_day))
+    bookings.sort(key=lambda b: (b.get('startTime', ''), b['id']))
+    return bookings
+
+
+def iter_bookings_for_person(person_id, first_day=None, last_day=None, page_size=100):
+    spanning = set()
+    rows = []
+    for row in get_booking_index_container().iter_items(where=_index_range(person_id, first_day, last_day), page_size=page_size):
+        if len(booking_days(row['startTime'], row['endTime'])) > 1:
+            if row['id'] in spanning:
+                continue
+            spanning.add(row['id'])
+        rows.append(row)
+        if len(rows) == page_size:
+            yield from _read_indexed(rows)
+            rows = []
+    if rows:
+        yield from _read_indexed(rows)
+
+
+def iter_index_rows(person_id, first_day=None, last_day=None, select=None, page_size=None):
+    return get_booking_index_container().iter_items(
+        where=_index_range(person_id, first_day, last_day), select=select, page_size=page_size
+    )
+
+
+def iter_bookings_for_people(person_ids, first_day=None, last_day=None, page_size=100):
+    person_ids = list(dict.fromkeys(person_ids))
+    for position, person_id in enumerate(person_ids):
+        earlier = set(person_ids[:position])
+        for booking in iter_bookings_for_person(person_id, first_day, last_day, page_size):
+            if earlier.isdisjoint(booking.get('personIds', [])):
+                yield booking
+
+
+def index_partition_key(person_id, day):
+    return f"{person_id}{INDEX_KEY_SEPARATOR}{day.isoformat()}"
+
+
+def booking_days(start_time, end_time):
+    start_time = parse_datetime(start_time)
+    end_time = parse_datetime(end_time)
+
+    first_day = start_time.date()
+    last_day = end_time.date()
+    if last_day > first_day and end_time.time() == time(0, 0):
+        last_day -= timedelta(days=1)
+
+    days = []
+    day = first_day
+    while day <= last_day:
+        days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def booking_index_rows(booking):
+    start_epoch, end_epoch = booking_epochs(booking)
+    rows = []
+    for day in booking_days(booking['startTime'], booking['endTime']):
+        for person_id in booking.get('personIds', []):
+            row = {
+                'id': booking['id'],
+                'personId': person_id,
+                'startTime': booking['startTime'],
+                'endTime': booking['endTime'],
+                'startEpoch': start_epoch,
+                'endEpoch': end_epoch
+            }
+            rows.append((index_partition_key(person_id, day), row))
+    return rows
+
+
+def index_booking(booking):
+    container = get_booking_index_container()
+    for partition_key, row in booking_index_rows(booking):
+        container.create_item(body=row, partition_key=partition_key, row_key=row['id'])
+
+
+def unindex_booking(booking):
+    container = get_booking_index_container()
+    for partition_key, row in booking_index_rows(booking):
+        try:
+            container.delete_item(item=row['id'], partition_key=partition_key)
+        except Exception as e:
+            logging.warning(f"Index row {partition_key}/{row['id']} already gone: {str(e)}")
+
+
+def _index_range(person_id, first_day=None, last_day=None):
+    prefix = f"{person_id}{INDEX_KEY_SEPARATOR}"
+    return [
+        ('PartitionKey', 'ge', index_partition_key(person_id, first_day) if first_day else prefix),
+        ('PartitionKey', 'le', index_partition_key(person_id, last_day) if last_day else prefix + INDEX_KEY_END)
+    ]
+
+
+def _dedupe_index_rows(row_lists):
+    found = {}
+    for rows in row_lists:
+        for row in rows:
+            found.setdefault(row['id'], row)
+    return list(found.values())
+
+
+def find_indexed_bookings(person_ids, first_day=None, last_day=None):
+    container = get_booking_index_container()
+    return _dedupe_index_rows(
+        container.query_items(where=_index_range(person_id, first_day, last_day))
+        for person_id in dict.fromkeys(person_ids)
+    )
+
+
+async def afind_index_rows(person_ids, first_day=None, last_day=None):
+    container = get_async_booking_index_container()
+    row_lists = await asyncio.gather(*(
+        container.query_items(where=_index_range(person_id, first_day, last_day))
+        for person_id in dict.fromkeys(person_ids)
+    ))
+    return [row for rows in row_lists for row in rows]
+
+
+def claim_keys(person_ids, days):
+    return [(day.isoformat(), person_id) for day in days for person_id in dict.fromkeys(person_ids)]
+
+
+def booking_claim_keys(booking):
+    return claim_keys(booking.get('personIds', []), booking_days(booking['startTime'], booking['endTime']))
+
+
+def _claim_snapshot(keys, found):
+    return {key: found.get(key, (None, None)) for key in dict.fromkeys(keys)}
+
+
+def read_claims(keys):
+    return _claim_snapshot(keys, get_booking_claims_container().read_many_with_etags(keys))
+
+
+async def aread_claims(keys):
+    return _claim_snapshot(keys, await get_async_booking_claims_container().read_many_with_etags(keys))
+
+
+def claimed_intervals(claims, keys=None):
+    intervals = []
+    for key in claims if keys is None else keys:
+        item, _ = claims.get(key, (None, None))
+        intervals.extend(claim_entry_epochs(entry) for entry in (item or {}).get('bookings', []))
+    return intervals
+
+
+def _claim_body(day, person_id, entries, item=None):
+    version = (item or {}).get('version', 0) + 1
+    return {'id': person_id, 'personId': person_id, 'day': day, 'bookings': entries, 'version': version}
+
+
+def _by_partition(keys):
+    partitions = {}
+    for key in keys:
+        partitions.setdefault(key[0], []).append(key)
+    return partitions
+
+
+def reserve_bookings(bookings, claims):
+    entries_by_key = {}
+    changed = []
+    for booking in bookings:
+        start_epoch, end_epoch = booking_epochs(booking)
+        for key in booking_claim_keys(booking):
+            if key not in claims:
+                raise ValueError(f"Claim {key[0]}/{key[1]} missing from snapshot")
+            if key not in entries_by_key:
+                item, _ = claims[key]
+                entries_by_key[key] = list((item or {}).get('bookings', []))
+            entries = entries_by_key[key]
+            if any(entry[0] == booking['id'] for entry in entries):
+                continue
+            for entry in entries:
+                if slots_overlap(start_epoch, end_epoch, *claim_entry_epochs(entry)):
+                    raise ConflictError(f"Person {key[1]} already has a booking at this time")
+            entries.append([booking['id'], booking['startTime'], booking['endTime'], start_epoch, end_epoch])
+            changed.append(key)
+
+    container = get_booking_claims_container()
+    committed = []
+    try:
+        for day, keys in _by_partition(dict.fromkeys(changed)).items():
+            for offset in range(0, len(keys), MAX_BATCH_SIZE):
+                chunk = keys[offset:offset + MAX_BATCH_SIZE]
+                operations = []
+                for key in chunk:
+                    item, etag = claims[key]
+                    body = _claim_body(day, key[1], entries_by_key[key], item)
+                    operations.append(('update' if etag else 'create', day, key[1], body, etag))
+                container.transact(operations)
+                committed.extend(chunk)
+    except Exception:
+        if committed:
+            release_bookings(bookings, committed)
+        raise
+    return changed
+
+
+def release_bookings(bookings, keys=None):
+    booking_ids = {booking['id'] for booking in bookings}
+    if keys is None:
+        keys = list(dict.fromkeys(key for booking in bookings for key in booking_claim_keys(booking)))
+    container = get_booking_claims_container()
+    for day, day_keys in _by_partition(keys).items():
+        for _ in range(CLAIM_RETRIES):
+            operations = []
+            for (_, person_id), (item, etag) in container.read_many_with_etags(day_keys).items():
+                entries = [entry for entry in item.get('bookings', []) if entry[0] not in booking_ids]
+                if len(entries) == len(item.get('bookings', [])):
+                    continue
+                operations.append(('update', day, person_id, _claim_body(day, person_id, entries, item), etag))
+            try:
+                for offset in range(0, len(operations), MAX_BATCH_SIZE):
+                    container.transact(operations[offset:offset + MAX_BATCH_SIZE])
+                break
+            except ConflictError:
+                continue
+        else:
+            logging.warning(f"Could not release claims on {day} for bookings {sorted(booking_ids)}")
+
+
+def migrate_bookings_layout():
+    container = get_bookings_container()
+    migrated = []
+    for booking in container.query_items(query="SELECT * FROM c", enable_cross_partition_query=True):
+        if is_partitioned_booking_id(booking['id']):
+            continue
+        if not booking.get('startTime') or not booking.get('endTime'):
+            logging.warning(f"Skipping booking {booking['id']} without start/end time")
+            continue
+
+        legacy_booking = dict(booking)
+        booking['id'] = new_booking_id(booking['startTime'], suffix=legacy_booking['id'])
+        release_bookings([legacy_booking])
+        create_booking(booking)
+        unindex_booking(legacy_booking)
+        container.delete_item(item=legacy_booking['id'], partition_key=legacy_booking['id'])
+        migrated.append(booking)
+    return migrated
+
+
+def backfill_booking_index():
+    bookings_container = get_bookings_container()
+    count = 0
+    for booking in bookings_container.query_items(query="SELECT * FROM c", enable_cross_partition_query=True):
+        if not booking.get('startTime') or not booking.get('endTime'):
+            logging.warning(f"Skipping booking {booking.get('id')} without start/end time")
+            continue
+        index_booking(booking)
+        count += 1
+    bump_table_version(BOOKINGS_TABLE)
+    return count
+
+
+def backfill_booking_epochs():
+    container = get_bookings_container()
+    normalized = []
+    for booking in container.query_items(query="SELECT * FROM c", enable_cross_partition_query=True):
+        if booking.get('startEpoch') is not None or not booking.get('startTime') or not booking.get('endTime'):
+            continue
+        unindex_booking(booking)
+        normalize_booking(booking)
+        partition_key, row_key = booking_keys(booking['id'])
+        container.create_item(body=booking, partition_key=partition_key, row_key=row_key)
+        index_booking(booking)
+        normalized.append(booking)
+    bump_table_version(BOOKINGS_TABLE)
+    return normalized
+
+
+def backfill_booking_claims():
+    bookings_container = get_bookings_container()
+    claimed = []
+    for booking in bookings_container.query_items(query="SELECT * FROM c", enable_cross_partition_query=True):
+        if not booking.get('startTime') or not booking.get('endTime'):
+            logging.warning(f"Skipping booking {booking.get('id')} without start/end time")
+            continue
+        for _ in range(CLAIM_RETRIES):
+            try:
+                if reserve_bookings([booking], read_claims(booking_claim_keys(booking))):
+                    claimed.append(booking)
+                break
+            except ConflictError as e:
+                if 'already has a booking' in str(e):
+                    logging.warning(f"Booking {booking['id']} overlaps an existing claim: {str(e)}")
+                    break
+        else:
+            logging.warning(f"Could not claim booking {booking['id']} after {CLAIM_RETRIES} attempts")
+    return claimed
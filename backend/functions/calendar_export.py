@@ -0,0 +1,110 @@
+import csv
+import io
+
+from functions.utils import parse_datetime
+
+ICS_PRODUCT_ID = '-//appointment-app//bookings//PL'
+ICS_LINE_OCTETS = 75
+ICS_UID_DOMAIN = 'appointment-app'
+CSV_COLUMNS = ('id', 'seriesId', 'title', 'description', 'startTime', 'endTime', 'personIds')
+CSV_FLUSH_BYTES = 16 * 1024
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def ics_escape(value):
+    return (value or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n')
+
+
+def ics_time(value):
+    # Booking times are wall-clock times without a zone, so they are exported as floating
+    # local times (no trailing Z); only DTSTAMP is a real UTC instant.
+    return parse_datetime(value).strftime('%Y%m%dT%H%M%S')
+
+
+def fold(line):
+    if len(line.encode('utf-8')) <= ICS_LINE_OCTETS:
+        return line + '\r\n'
+    parts = []
+    current = []
+    size = 0
+    limit = ICS_LINE_OCTETS
+    for char in line:
+        width = len(char.encode('utf-8'))
+        if size + width > limit:
+            parts.append(''.join(current))
+            current, size, limit = [], 0, ICS_LINE_OCTETS - 1
+        current.append(char)
+        size += width
+    parts.append(''.join(current))
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def recurrence_lines(recurrence):
+    lines = [line.strip() for line in recurrence.strip().splitlines() if line.strip()]
+    return [line if ':' in line else f'RRULE:{line}' for line in lines]
+
+
+def _vevent(uid, stamp, start_time, end_time, title, description, extra=()):
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:{uid}@{ICS_UID_DOMAIN}',
+        f'DTSTAMP:{stamp}',
+        f'DTSTART:{ics_time(start_time)}',
+        f'DTEND:{ics_time(end_time)}',
+        *extra,
+        f'SUMMARY:{ics_escape(title)}'
+    ]
+    if description:
+        lines.append(f'DESCRIPTION:{ics_escape(description)}')
+    lines.append('END:VEVENT')
+    return ''.join(fold(line) for line in lines)
+
+
+def booking_vevent(booking, stamp):
+    return _vevent(booking['id'], stamp, booking['startTime'], booking['endTime'], booking.get('title'), booking.get('description'))
+
+
+def series_vevents(series, stamp):
+    extra = recurrence_lines(series['recurrence'])
+    extra += [f'EXDATE:{ics_time(key)}' for key in series.get('exdates', [])]
+    yield _vevent(series['id'], stamp, series['startTime'], series['endTime'], series.get('title'), series.get('description'), extra)
+    for key, (override_start, override_end) in sorted(series.get('overrides', {}).items()):
+        yield _vevent(
+            series['id'], stamp, override_start, override_end, series.get('title'), series.get('description'),
+            [f'RECURRENCE-ID:{ics_time(key)}']
+        )
+
+
+def iter_ics(bookings, series_list, calendar_name, stamp):
+    stamp = stamp.strftime('%Y%m%dT%H%M%SZ')
+    header = ['BEGIN:VCALENDAR', 'VERSION:2.0', f'PRODID:{ICS_PRODUCT_ID}', 'CALSCALE:GREGORIAN', 'METHOD:PUBLISH']
+    if calendar_name:
+        header.append(f'X-WR-CALNAME:{ics_escape(calendar_name)}')
+    yield ''.join(fold(line) for line in header)
+    for series in series_list:
+        yield from series_vevents(series, stamp)
+    for booking in bookings:
+        yield booking_vevent(booking, stamp)
+    yield fold('END:VCALENDAR')
+
+
+def csv_cell(value):
+    value = '' if value is None else str(value)
+    return "'" + value if value.startswith(CSV_FORMULA_PREFIXES) else value
+
+
+def iter_csv(bookings):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for booking in bookings:
+        writer.writerow([
+            csv_cell(booking.get('id')), csv_cell(booking.get('seriesId')), csv_cell(booking.get('title')),
+            csv_cell(booking.get('description')), booking.get('startTime'), booking.get('endTime'),
+            csv_cell(';'.join(booking.get('personIds', [])))
+        ])
+        if buffer.tell() >= CSV_FLUSH_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
@@ -0,0 +1,182 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from functions.storage_client import MAX_BATCH_SIZE, ConflictError, get_changes_container
+
+CHANGES_PARTITION = 'changes'
+HEAD_PARTITION = 'head'
+SEQUENCE_DIGITS = 20
+APPEND_RETRIES = 20
+
+CHANGES_PAGE_SIZE = int(os.environ.get('CHANGES_PAGE_SIZE', 500))
+CHANGES_POLL_SECONDS = float(os.environ.get('CHANGES_POLL_SECONDS', 1))
+CHANGES_RETENTION_DAYS = int(os.environ.get('CHANGES_RETENTION_DAYS', 7))
+
+_last_sequence = 0
+_sequence_lock = threading.Lock()
+_listeners = []
+
+
+def sequence_key(sequence):
+    return f'{sequence:0{SEQUENCE_DIGITS}d}'
+
+
+def change(table_name, op, item_id, item=None):
+    entry = {'table': table_name, 'op': op, 'id': item_id}
+    if item is not None:
+        entry['item'] = item
+    return entry
+
+
+def upserted(table_name, items):
+    return [change(table_name, 'upsert', item['id'], item) for item in items]
+
+
+def deleted(table_name, item_ids):
+    return [change(table_name, 'delete', item_id) for item_id in item_ids]
+
+
+def add_change_listener(listener):
+    _listeners.append(listener)
+
+
+def _notify(changes):
+    for listener in _listeners:
+        try:
+            listener(changes)
+        except Exception as e:
+            logging.error(f"Change listener failed: {str(e)}")
+
+
+def _read_head(container):
+    try:
+        return container.read_item(item=HEAD_PARTITION, partition_key=HEAD_PARTITION).get('seq', 0)
+    except Exception as e:
+        if 'not found' not in str(e).lower():
+            raise
+        return 0
+
+
+def latest_sequence(after=0):
+    container = get_changes_container()
+    latest = after or _read_head(container)
+    where = [('PartitionKey', 'eq', CHANGES_PARTITION), ('RowKey', 'gt', sequence_key(latest))]
+    for item in container.iter_items(where=where, select=['seq'], page_size=1000):
+        latest = item['seq']
+    return latest
+
+
+def _allocate_after(container, last):
+    # Pruning deletes rows below the head, so a create conflict alone cannot stop a worker
+    # with a stale sequence from reusing a pruned number; never allocate at or below the head.
+    return latest_sequence(max(last, _read_head(container)))
+
+
+def _append(changes):
+    global _last_sequence
+    container = get_changes_container()
+    _last_sequence = _allocate_after(container, _last_sequence)
+    at = datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+    for start in range(0, len(changes), MAX_BATCH_SIZE):
+        chunk = changes[start:start + MAX_BATCH_SIZE]
+        for _ in range(APPEND_RETRIES):
+            first = _last_sequence + 1
+            operations = [
+                ('create', CHANGES_PARTITION, sequence_key(first + offset), {**entry, 'seq': first + offset, 'at': at}, None)
+                for offset, entry in enumerate(chunk)
+            ]
+            try:
+                container.transact(operations)
+                break
+            except ConflictError:
+                _last_sequence = _allocate_after(container, _last_sequence)
+        else:
+            raise ConflictError(f"Could not allocate {len(chunk)} change sequence numbers")
+        _last_sequence = first + len(chunk) - 1
+    try:
+        container.upsert_many([{'id': HEAD_PARTITION, 'seq': _last_sequence}])
+    except Exception as e:
+        logging.warning(f"Could not move the change log head to {_last_sequence}: {str(e)}")
+    return _last_sequence
+
+
+def append_changes(changes):
+    if not changes:
+        return None
+    _notify(changes)
+    try:
+        with _sequence_lock:
+            sequence = _append(changes)
+    except Exception as e:
+        logging.error(f"Could not append {len(changes)} changes to the change log, clients may miss updates: {str(e)}")
+        return None
+    CHANGE_TAIL.advance(sequence)
+    return sequence
+
+
+def read_changes(since, limit=CHANGES_PAGE_SIZE):
+    where = [('PartitionKey', 'eq', CHANGES_PARTITION), ('RowKey', 'gt', sequence_key(since))]
+    items, _ = get_changes_container().query_page(where=where, limit=limit)
+    return items
+
+
+def is_truncated(since, changes):
+    return since > 0 and bool(changes) and changes[0]['seq'] != since + 1
+
+
+def prune_changes(retention_days=CHANGES_RETENTION_DAYS):
+    container = get_changes_container()
+    cutoff = (datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=retention_days)).isoformat()
+    latest = latest_sequence()
+    expired = [
+        (CHANGES_PARTITION, sequence_key(item['seq']))
+        for item in container.iter_items(
+            where=[('PartitionKey', 'eq', CHANGES_PARTITION), ('at', 'lt', cutoff)], select=['seq', 'at'], page_size=1000
+        )
+        if item['seq'] < latest
+    ]
+    container.delete_many(expired)
+    return len(expired)
+
+
+class ChangeTail:
+    def __init__(self, poll_seconds):
+        self.poll_seconds = poll_seconds
+        self._condition = threading.Condition()
+        self._latest = 0
+        self._polled_at = None
+        self._polling = False
+
+    def advance(self, sequence):
+        with self._condition:
+            if sequence > self._latest:
+                self._latest = sequence
+                self._condition.notify_all()
+
+    def wait(self, cursor, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._condition:
+                if self._latest > cursor:
+                    return self._latest
+                now = time.monotonic()
+                if now >= deadline:
+                    return self._latest
+                stale = self._polled_at is None or now - self._polled_at >= self.poll_seconds
+                if self._polling or not stale:
+                    self._condition.wait(min(deadline - now, self.poll_seconds))
+                    continue
+                self._polling = True
+            try:
+                latest = latest_sequence(max(self._latest, cursor))
+            finally:
+                with self._condition:
+                    self._polling = False
+                    self._polled_at = time.monotonic()
+            self.advance(latest)
+
+
+CHANGE_TAIL = ChangeTail(CHANGES_POLL_SECONDS)
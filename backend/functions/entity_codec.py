@@ -0,0 +1,166 @@
+import json
+import re
+import struct
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SCHEMA_VERSION_FIELD = 'SchemaVersion'
+SCHEMA_VERSION = 2
+
+MAX_FLAT_IDS = 32
+AVAILABILITY_FORMAT = 1
+CLOCK_PATTERN = re.compile(r'^\d\d:\d\d$')
+
+_HEADER = struct.Struct('<B')
+_DAY = struct.Struct('<BB')
+_SLOT = struct.Struct('<HH')
+
+
+if orjson is not None:
+    def dumps(value):
+        return orjson.dumps(value).decode('utf-8')
+
+    loads = orjson.loads
+else:
+    def dumps(value):
+        return json.dumps(value, separators=(',', ':'))
+
+    loads = json.loads
+
+
+class JsonField:
+    def columns(self, name):
+        return (name,)
+
+    def encode(self, name, value, entity):
+        entity[name] = value if value is None else dumps(value)
+
+    def decode(self, name, item):
+        value = item.get(name)
+        if isinstance(value, str):
+            item[name] = loads(value)
+
+
+class IdListField(JsonField):
+    def columns(self, name):
+        return (name, *(f'{name}_{index}' for index in range(MAX_FLAT_IDS)))
+
+    def encode(self, name, value, entity):
+        if not isinstance(value, list) or len(value) > MAX_FLAT_IDS or not all(isinstance(v, str) for v in value):
+            super().encode(name, value, entity)
+            return
+        entity[name] = len(value)
+        for index, person_id in enumerate(value):
+            entity[f'{name}_{index}'] = person_id
+
+    def decode(self, name, item):
+        value = item.get(name)
+        if isinstance(value, int) and not isinstance(value, bool):
+            item[name] = [item.pop(f'{name}_{index}', None) for index in range(value)]
+            while item.pop(f'{name}_{value}', None) is not None:
+                value += 1
+        else:
+            super().decode(name, item)
+
+
+def _clock_minute(value):
+    if not isinstance(value, str) or not CLOCK_PATTERN.match(value):
+        return None
+    hours, minutes = int(value[:2]), int(value[3:])
+    if minutes >= 60 or hours * 60 + minutes > 24 * 60:
+        return None
+    return hours * 60 + minutes
+
+
+def pack_availability(schedule):
+    if not isinstance(schedule, list):
+        return None
+    parts = [_HEADER.pack(AVAILABILITY_FORMAT)]
+    for day in schedule:
+        if not isinstance(day, dict) or day.keys() != {'day', 'timeSlots'}:
+            return None
+        day_of_week, time_slots = day['day'], day['timeSlots']
+        if type(day_of_week) is not int or not 0 <= day_of_week < 256:
+            return None
+        if not isinstance(time_slots, list) or len(time_slots) > 255:
+            return None
+        parts.append(_DAY.pack(day_of_week, len(time_slots)))
+        for time_slot in time_slots:
+            if not isinstance(time_slot, dict) or time_slot.keys() != {'start', 'end'}:
+                return None
+            start, end = _clock_minute(time_slot['start']), _clock_minute(time_slot['end'])
+            if start is None or end is None:
+                return None
+            parts.append(_SLOT.pack(start, end))
+    return b''.join(parts)
+
+
+_CLOCKS = tuple(f'{minute // 60:02d}:{minute % 60:02d}' for minute in range(24 * 60 + 1))
+
+
+def unpack_availability(blob):
+    blob = bytes(blob)
+    offset = _HEADER.size
+    schedule = []
+    while offset < len(blob):
+        day_of_week, count = _DAY.unpack_from(blob, offset)
+        offset += _DAY.size
+        time_slots = []
+        for start, end in _SLOT.iter_unpack(blob[offset:offset + count * _SLOT.size]):
+            time_slots.append({'start': _CLOCKS[start], 'end': _CLOCKS[end]})
+        offset += count * _SLOT.size
+        schedule.append({'day': day_of_week, 'timeSlots': time_slots})
+    return schedule
+
+
+class AvailabilityField(JsonField):
+    def encode(self, name, value, entity):
+        blob = pack_availability(value)
+        if blob is None:
+            super().encode(name, value, entity)
+        else:
+            entity[name] = blob
+
+    def decode(self, name, item):
+        value = item.get(name)
+        if isinstance(value, (bytes, bytearray)):
+            item[name] = unpack_availability(value)
+        else:
+            super().decode(name, item)
+
+
+JSON = JsonField()
+ID_LIST = IdListField()
+AVAILABILITY = AvailabilityField()
+
+
+def encode_entity(entity, schema, table_name):
+    encoded = {SCHEMA_VERSION_FIELD: SCHEMA_VERSION}
+    for key, value in entity.items():
+        field = schema.get(key)
+        if field is not None:
+            field.encode(key, value, encoded)
+        elif isinstance(value, (list, dict)):
+            raise ValueError(f"Field '{key}' of table '{table_name}' is not declared in its schema")
+        else:
+            encoded[key] = value
+    return encoded
+
+
+def decode_item(item, schema):
+    item.pop(SCHEMA_VERSION_FIELD, None)
+    for name, field in schema.items():
+        if name in item:
+            field.decode(name, item)
+    return item
+
+
+def schema_columns(schema, fields):
+    columns = []
+    for name in fields:
+        field = schema.get(name)
+        columns.extend(field.columns(name) if field is not None else (name,))
+    return columns
@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+import numpy as np
+
+from functions.availability import MINUTES_PER_DAY
+from functions.metrics import timed
+
+DEFAULT_RESOLUTION_MINUTES = 5
+
+
+def ticks_per_day(resolution):
+    return MINUTES_PER_DAY // resolution
+
+
+def week_masks(compiled, resolution):
+    week = np.zeros((7, ticks_per_day(resolution)), dtype=bool)
+    for day_of_week in range(7):
+        for start_minute, end_minute in compiled.intervals(day_of_week):
+            week[day_of_week, -(-start_minute // resolution):end_minute // resolution] = True
+    return week
+
+
+def apply_busy(mask, busy_intervals, resolution):
+    flat = mask.reshape(-1)
+    for start_minute, end_minute in busy_intervals:
+        start_tick = max(0, start_minute // resolution)
+        end_tick = min(flat.size, -(-end_minute // resolution))
+        if start_tick < end_tick:
+            flat[start_tick:end_tick] = False
+
+
+@timed('slots')
+def availability_matrix(person_ids, availabilities, first_day, day_count, resolution=DEFAULT_RESOLUTION_MINUTES):
+    weekdays = [(first_day + timedelta(days=day_index)).weekday() for day_index in range(day_count)]
+    matrix = np.zeros((len(person_ids), day_count, ticks_per_day(resolution)), dtype=bool)
+    for row, person_id in enumerate(person_ids):
+        compiled = availabilities.get(person_id)
+        if compiled is not None:
+            matrix[row] = week_masks(compiled, resolution)[weekdays]
+    return matrix
+
+
+@timed('slots')
+def free_matrix(available, person_ids, busy_by_person, resolution=DEFAULT_RESOLUTION_MINUTES):
+    matrix = available.copy()
+    for row, person_id in enumerate(person_ids):
+        apply_busy(matrix[row], busy_by_person.get(person_id, ()), resolution)
+    return matrix
+
+
+def window_free(matrix, duration_ticks):
+    blocked = np.cumsum(~matrix, axis=-1, dtype=np.int32)
+    blocked = np.concatenate([np.zeros(blocked.shape[:-1] + (1,), dtype=np.int32), blocked], axis=-1)
+    return blocked[..., duration_ticks:] - blocked[..., :-duration_ticks] == 0
+
+
+def free_runs(row):
+    edges = np.diff(np.concatenate(([0], row.view(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+@timed('slots')
+def group_slots(available, free, duration_ticks, step_ticks, limit=None):
+    windows = window_free(free.all(axis=0), duration_ticks)
+    slots = []
+    for day_index, row in enumerate(available.all(axis=0)):
+        for run_start, run_end in zip(*free_runs(row)):
+            starts = np.arange(run_start, run_end - duration_ticks + 1, step_ticks)
+            for start_tick in starts[windows[day_index, starts]].tolist():
+                slots.append((day_index, start_tick, start_tick + duration_ticks))
+                if limit is not None and len(slots) >= limit:
+                    return slots
+    return slots
+
+
+def anchored_starts(runs, day_count, tick_count, duration_ticks, step_ticks):
+    starts = np.zeros((day_count, max(tick_count - duration_ticks + 1, 0)), dtype=bool)
+    for day_index, row in enumerate(runs):
+        for run_start, run_end in zip(*free_runs(row)):
+            starts[day_index, run_start:run_end - duration_ticks + 1:step_ticks] = True
+    return starts
+
+
+@timed('slots')
+def quorum_slots(available, free, min_free, duration_ticks, step_ticks, limit):
+    windows = window_free(free, duration_ticks)
+    starts = anchored_starts(
+        available.sum(axis=0) >= min_free, free.shape[1], free.shape[2], duration_ticks, step_ticks
+    )
+    counts = windows.sum(axis=0)
+    day_indexes, start_ticks = np.nonzero(starts & (counts >= min_free))
+    if not len(day_indexes):
+        return []
+    order = np.lexsort((start_ticks, day_indexes, -counts[day_indexes, start_ticks]))[:limit]
+    return [
+        (
+            int(day_indexes[index]),
+            int(start_ticks[index]),
+            int(start_ticks[index]) + duration_ticks,
+            np.flatnonzero(windows[:, day_indexes[index], start_ticks[index]]).tolist()
+        )
+        for index in order
+    ]
@@ -0,0 +1,141 @@
+import logging
+from datetime import date, timedelta
+
+from functions.async_storage import get_async_freebusy_container
+from functions.availability import MINUTES_PER_DAY, day_start
+from functions.booking_store import CLAIM_RETRIES, claim_entry_epochs, claim_keys, read_claims
+from functions.people_cache import get_people_cache
+from functions.series_store import find_series_for_people, series_busy, series_tag
+from functions.slot_engine import merge_busy_intervals, normalize_intervals
+from functions.storage_client import MAX_BATCH_SIZE, ConflictError, get_freebusy_container
+from functions.utils import to_epoch
+
+
+def date_range(first_day, last_day):
+    return [first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 1)]
+
+
+def free_intervals(compiled, day, claim, series_list=()):
+    origin_time = day_start(day)
+    origin = to_epoch(origin_time)
+    busy = []
+    entries = [claim_entry_epochs(entry) for entry in (claim or {}).get('bookings', [])]
+    entries += series_busy(series_list, origin_time, origin_time + timedelta(days=1))
+    for start_epoch, end_epoch in entries:
+        busy.append((max(0, (start_epoch - origin) // 60), min(MINUTES_PER_DAY, -((origin - end_epoch) // 60))))
+    busy = merge_busy_intervals(busy)
+    free = []
+    for range_start, range_end in normalize_intervals(compiled.intervals(day.weekday())):
+        current = range_start
+        for busy_start, busy_end in busy:
+            if busy_end <= current:
+                continue
+            if busy_start >= range_end:
+                break
+            if busy_start > current:
+                free.append([current, busy_start, range_start])
+            current = busy_end
+        if current < range_end:
+            free.append([current, range_end, range_start])
+    return free
+
+
+def freebusy_row(day, person_id, compiled, claim, series_list=()):
+    return {
+        'id': person_id,
+        'personId': person_id,
+        'day': day,
+        'free': free_intervals(compiled, date.fromisoformat(day), claim, series_list),
+        'availabilityVersion': compiled.version or 0,
+        'claimVersion': (claim or {}).get('version', 0),
+        'seriesTag': series_tag(series_list)
+    }
+
+
+def is_stale(row, compiled, series_list, claim=None, check_claim=True):
+    if row is None or row.get('availabilityVersion', 0) != (compiled.version or 0):
+        return True
+    if row.get('seriesTag', '') != series_tag(series_list):
+        return True
+    return check_claim and row.get('claimVersion', 0) != (claim or {}).get('version', 0)
+
+
+def refresh_freebusy(keys, force=False):
+    keys = list(dict.fromkeys(keys))
+    container = get_freebusy_container()
+    for _ in range(CLAIM_RETRIES):
+        current = container.read_many_with_etags(keys)
+        claims = read_claims(keys)
+        series_by_person = find_series_for_people([key[1] for key in keys])
+        availabilities = get_people_cache().get_availability_many([key[1] for key in keys], revalidate=True)
+
+        rows = {}
+        partitions = {}
+        for key in keys:
+            day, person_id = key
+            row, etag = current.get(key, (None, None))
+            compiled = availabilities.get(person_id)
+            if compiled is None:
+                if row is not None:
+                    partitions.setdefault(day, []).append(('delete', day, person_id, None, etag))
+                continue
+            claim, _ = claims[key]
+            series_list = series_by_person.get(person_id, [])
+            if not force and not is_stale(row, compiled, series_list, claim):
+                rows[key] = row
+                continue
+            rows[key] = freebusy_row(day, person_id, compiled, claim, series_list)
+            operations = partitions.setdefault(day, [])
+            operations.append(('update' if etag else 'create', day, person_id, rows[key], etag))
+
+        try:
+            for operations in partitions.values():
+                for offset in range(0, len(operations), MAX_BATCH_SIZE):
+                    container.transact(operations[offset:offset + MAX_BATCH_SIZE])
+            return rows, sum(len(operations) for operations in partitions.values())
+        except ConflictError:
+            continue
+    raise ConflictError(f"Could not refresh free/busy rows after {CLAIM_RETRIES} attempts")
+
+
+def invalidate_freebusy(keys):
+    try:
+        refresh_freebusy(keys)
+    except Exception as e:
+        logging.warning(f"Could not refresh free/busy rows, dropping them instead: {str(e)}")
+        try:
+            get_freebusy_container().delete_many(keys)
+        except Exception as e:
+            logging.error(f"Could not drop free/busy rows {sorted(keys)}: {str(e)}")
+
+
+async def aread_freebusy(keys):
+    found = await get_async_freebusy_container().read_many_with_etags(keys)
+    return {key: item for key, (item, _) in found.items()}
+
+
+def resolve_freebusy(keys, found, availabilities, series_by_person):
+    rows = {}
+    stale = []
+    for key in keys:
+        compiled = availabilities.get(key[1])
+        if compiled is None:
+            continue
+        if is_stale(found.get(key), compiled, series_by_person.get(key[1], []), check_claim=False):
+            stale.append(key)
+        else:
+            rows[key] = found[key]
+    if stale:
+        refreshed, _ = refresh_freebusy(stale)
+        rows.update(refreshed)
+    return rows
+
+
+def rebuild_freebusy(person_ids, first_day, last_day, force=True):
+    refreshed = 0
+    for day in date_range(first_day, last_day):
+        keys = claim_keys(person_ids, [day])
+        for offset in range(0, len(keys), MAX_BATCH_SIZE):
+            _, count = refresh_freebusy(keys[offset:offset + MAX_BATCH_SIZE], force=force)
+            refreshed += count
+    return refreshed
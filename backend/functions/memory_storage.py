@@ -0,0 +1,54 @@
+import bisect
+import threading
+
+from functions.table_engine import EngineTableClient, EngineTableService, matches, new_etag, partition_ranges
+
+
+class MemoryTableClient(EngineTableClient):
+    def __init__(self, table_name):
+        super().__init__(table_name)
+        self._rows = {}
+        self._keys = []
+        self._lock = threading.RLock()
+
+    def _transaction(self):
+        return self._lock
+
+    def _lookup(self, key):
+        with self._lock:
+            row = self._rows.get(key)
+            return None if row is None else (dict(row[0]), row[1])
+
+    def _write(self, key, properties):
+        if properties is None:
+            if self._rows.pop(key, None) is not None:
+                del self._keys[bisect.bisect_left(self._keys, key)]
+            return None
+        if key not in self._rows:
+            bisect.insort(self._keys, key)
+        etag = new_etag()
+        self._rows[key] = (dict(properties), etag)
+        return etag
+
+    def _scan(self, any_of, start_key, limit):
+        rows = []
+        with self._lock:
+            for low, high in partition_ranges(any_of):
+                start = 0 if low is None else bisect.bisect_left(self._keys, (low,))
+                if start_key is not None:
+                    start = max(start, bisect.bisect_left(self._keys, start_key))
+                for index in range(start, len(self._keys)):
+                    key = self._keys[index]
+                    if high is not None and key[0] > high:
+                        break
+                    properties, etag = self._rows[key]
+                    if matches({'PartitionKey': key[0], 'RowKey': key[1], **properties}, any_of):
+                        rows.append((key, dict(properties), etag))
+                        if len(rows) >= limit:
+                            return rows
+        return rows
+
+
+class MemoryTableService(EngineTableService):
+    def _create_table(self, table_name):
+        return MemoryTableClient(table_name)
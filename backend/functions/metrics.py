@@ -0,0 +1,319 @@
+import bisect
+import contextvars
+import functools
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+_current_request = contextvars.ContextVar('request_metrics', default=None)
+
+
+def _env_flag(name, default):
+    return os.environ.get(name, default).lower() in ('1', 'true', 'yes', 'on')
+
+
+METRICS_ENABLED = _env_flag('METRICS_ENABLED', '1')
+SERVER_TIMING_ENABLED = _env_flag('METRICS_SERVER_TIMING', '0')
+METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR')
+METRICS_FLUSH_SECONDS = float(os.environ.get('METRICS_FLUSH_SECONDS', 5))
+
+_flusher_pid = None
+_flusher_lock = threading.Lock()
+
+
+class RequestMetrics:
+    __slots__ = ('started', 'storage_calls', 'rows_scanned', 'bytes_deserialized', 'phases')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.storage_calls = 0
+        self.rows_scanned = 0
+        self.bytes_deserialized = 0
+        self.phases = {}
+
+    def add_phase(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        entries = [
+            f'{phase};dur={seconds * 1000:.2f}'
+            for phase, seconds in sorted(self.phases.items())
+        ]
+        entries.append(f'total;dur={self.elapsed() * 1000:.2f};desc="{self.storage_calls} storage calls, {self.rows_scanned} rows"')
+        return ', '.join(entries)
+
+
+def start_request_metrics():
+    if not METRICS_ENABLED:
+        return None, None
+    metrics = RequestMetrics()
+    return metrics, _current_request.set(metrics)
+
+
+def finish_request_metrics(token):
+    if token is not None:
+        _current_request.reset(token)
+
+
+def current_request_metrics():
+    return _current_request.get()
+
+
+async def bind_request_metrics(coroutine, metrics):
+    if metrics is not None:
+        _current_request.set(metrics)
+    return await coroutine
+
+
+@contextmanager
+def storage_span(table, operation):
+    metrics = _current_request.get()
+    started = time.perf_counter()
+    try:
+        yield metrics
+    finally:
+        if metrics is not None:
+            elapsed = time.perf_counter() - started
+            metrics.storage_calls += 1
+            metrics.add_phase('storage', elapsed)
+            STORAGE_CALL_SECONDS.observe(elapsed, table=table, operation=operation)
+
+
+def record_rows(metrics, rows, size, seconds):
+    metrics.rows_scanned += rows
+    metrics.bytes_deserialized += size
+    metrics.add_phase('deserialize', seconds)
+
+
+def timed(phase):
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            metrics = _current_request.get()
+            if metrics is None:
+                return function(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                metrics.add_phase(phase, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+class Histogram:
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+        _ensure_flusher()
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), list(counts), total, count] for key, (counts, total, count) in self._series.items()]
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self, snapshots=None):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        merged = {}
+        for snapshot in snapshots if snapshots is not None else [self.snapshot()]:
+            for key, counts, total, count in snapshot:
+                key = tuple(tuple(label) for label in key)
+                current = merged.setdefault(key, [[0] * len(counts), 0.0, 0])
+                current[0] = [previous + added for previous, added in zip(current[0], counts)]
+                current[1] += total
+                current[2] += count
+        for key, (counts, total, count) in sorted(merged.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(key + (('le', _format_value(bound)),))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(key)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(key)} {count}')
+        return '\n'.join(lines)
+
+
+class Gauge:
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._series[tuple(sorted(labels.items()))] = value
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), value] for key, value in self._series.items()]
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self, snapshots=None):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} gauge']
+        series = []
+        for worker, snapshot in snapshots if snapshots is not None else [(None, self.snapshot())]:
+            for key, value in snapshot:
+                key = tuple(tuple(label) for label in key)
+                series.append((key if worker is None else tuple(sorted(key + (('worker', worker),))), value))
+        for key, value in sorted(series):
+            lines.append(f'{self.name}{_format_labels(key)} {_format_value(value)}')
+        return '\n'.join(lines)
+
+
+REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', 'Time spent handling HTTP requests.', LATENCY_BUCKETS
+)
+REQUEST_PHASE_SECONDS = Histogram(
+    'http_request_phase_seconds', 'Cumulative time per request spent in each phase.', LATENCY_BUCKETS
+)
+REQUEST_STORAGE_CALLS = Histogram(
+    'http_request_storage_calls', 'Storage calls made per HTTP request.', COUNT_BUCKETS
+)
+REQUEST_ROWS_SCANNED = Histogram(
+    'http_request_storage_rows', 'Storage rows read and deserialized per HTTP request.', COUNT_BUCKETS
+)
+REQUEST_BYTES_DESERIALIZED = Histogram(
+    'http_request_deserialized_bytes', 'Bytes of string properties deserialized per HTTP request.', BYTES_BUCKETS
+)
+STORAGE_CALL_SECONDS = Histogram(
+    'storage_call_duration_seconds', 'Duration of individual storage calls.', LATENCY_BUCKETS
+)
+
+STARTUP_SECONDS = Gauge(
+    'process_startup_seconds', 'Time spent in each startup phase of this process.'
+)
+
+HISTOGRAMS = (
+    REQUEST_SECONDS, REQUEST_PHASE_SECONDS, REQUEST_STORAGE_CALLS,
+    REQUEST_ROWS_SCANNED, REQUEST_BYTES_DESERIALIZED, STORAGE_CALL_SECONDS
+)
+GAUGES = (STARTUP_SECONDS,)
+
+
+def observe_request(metrics, method, route, status):
+    REQUEST_SECONDS.observe(metrics.elapsed(), method=method, route=route, status=status)
+    for phase, seconds in metrics.phases.items():
+        REQUEST_PHASE_SECONDS.observe(seconds, route=route, phase=phase)
+    REQUEST_STORAGE_CALLS.observe(metrics.storage_calls, route=route)
+    REQUEST_ROWS_SCANNED.observe(metrics.rows_scanned, route=route)
+    REQUEST_BYTES_DESERIALIZED.observe(metrics.bytes_deserialized, route=route)
+
+
+def reset_metrics():
+    for metric in HISTOGRAMS + GAUGES:
+        metric.clear()
+
+
+def metrics_snapshot(include_gauges=True):
+    return {
+        'histograms': {histogram.name: histogram.snapshot() for histogram in HISTOGRAMS},
+        'gauges': {gauge.name: gauge.snapshot() for gauge in GAUGES} if include_gauges else {}
+    }
+
+
+def write_metrics_snapshot(include_gauges=True):
+    if not METRICS_MULTIPROC_DIR:
+        return
+    path = os.path.join(METRICS_MULTIPROC_DIR, f'{os.getpid()}.json')
+    try:
+        with open(f'{path}.tmp', 'w') as snapshot_file:
+            json.dump(metrics_snapshot(include_gauges), snapshot_file)
+        os.replace(f'{path}.tmp', path)
+    except OSError as e:
+        logging.warning(f"Could not write metrics snapshot to {path}: {str(e)}")
+
+
+def clear_metrics_snapshots():
+    for path in glob.glob(os.path.join(METRICS_MULTIPROC_DIR, '*.json')):
+        os.remove(path)
+
+
+def read_metrics_snapshots():
+    snapshots = {}
+    for path in glob.glob(os.path.join(METRICS_MULTIPROC_DIR, '*.json')):
+        try:
+            with open(path) as snapshot_file:
+                snapshots[os.path.basename(path)[:-len('.json')]] = json.load(snapshot_file)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Skipping unreadable metrics snapshot {path}: {str(e)}")
+    return snapshots
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(METRICS_FLUSH_SECONDS)
+        write_metrics_snapshot()
+
+
+def _ensure_flusher():
+    global _flusher_pid
+    if not METRICS_MULTIPROC_DIR or _flusher_pid == os.getpid():
+        return
+    with _flusher_lock:
+        if _flusher_pid != os.getpid():
+            _flusher_pid = os.getpid()
+            threading.Thread(target=_flush_periodically, name='metrics-flush', daemon=True).start()
+
+
+def render_metrics():
+    if not METRICS_MULTIPROC_DIR:
+        return '\n'.join(metric.render() for metric in HISTOGRAMS + GAUGES) + '\n'
+    write_metrics_snapshot()
+    snapshots = read_metrics_snapshots()
+    rendered = [
+        histogram.render([snapshot['histograms'].get(histogram.name, []) for snapshot in snapshots.values()])
+        for histogram in HISTOGRAMS
+    ]
+    rendered += [
+        gauge.render([(worker, snapshot['gauges'].get(gauge.name, [])) for worker, snapshot in snapshots.items()])
+        for gauge in GAUGES
+    ]
+    return '\n'.join(rendered) + '\n'
@@ -0,0 +1,205 @@
+import asyncio
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from functions.availability import compile_availability
+from functions.async_storage import get_async_people_container
+from functions.storage_client import get_people_container
+
+DEFAULT_TTL_SECONDS = 30
+DEFAULT_MAX_ENTRIES = 2048
+
+_people_cache = None
+_people_cache_lock = threading.Lock()
+
+
+class _CacheEntry:
+    __slots__ = ('item', 'etag', 'fetched_at', 'compiled')
+
+    def __init__(self, item, etag, fetched_at=None, compiled=None):
+        self.item = item
+        self.etag = etag
+        self.fetched_at = fetched_at
+        self.compiled = compiled
+
+
+class PeopleCache:
+    def __init__(self, container_factory, async_container_factory=None,
+                 ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        self.container_factory = container_factory
+        self.async_container_factory = async_container_factory
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    def get(self, person_id, revalidate=False):
+        return copy.deepcopy(self._entry(person_id, revalidate).item)
+
+    def etag(self, person_id, revalidate=False):
+        return self._entry(person_id, revalidate).etag
+
+    def get_many(self, person_ids, revalidate=False):
+        people = []
+        for person_id in dict.fromkeys(person_ids):
+            try:
+                people.append(self.get(person_id, revalidate=revalidate))
+            except Exception as e:
+                if 'not found' not in str(e).lower():
+                    raise
+        return people
+
+    def get_availability(self, person_id, revalidate=False):
+        return self._compiled(self._entry(person_id, revalidate))
+
+    def get_availability_many(self, person_ids, revalidate=False):
+        compiled = {}
+        for person_id in dict.fromkeys(person_ids):
+            try:
+                compiled[person_id] = self.get_availability(person_id, revalidate=revalidate)
+            except Exception as e:
+                if 'not found' not in str(e).lower():
+                    raise
+        return compiled
+
+    async def aget_availability_many(self, person_ids, revalidate=False):
+        person_ids = list(dict.fromkeys(person_ids))
+        entries = await asyncio.gather(
+            *(self._aentry(person_id, revalidate) for person_id in person_ids),
+            return_exceptions=True
+        )
+        compiled = {}
+        for person_id, entry in zip(person_ids, entries):
+            if isinstance(entry, Exception):
+                if 'not found' not in str(entry).lower():
+                    raise entry
+                continue
+            compiled[person_id] = self._compiled(entry)
+        return compiled
+
+    def _entry(self, person_id, revalidate):
+        entry = self._lookup(person_id, revalidate)
+        if entry is not None and entry.fetched_at is not None:
+            return entry
+
+        container = self.container_factory()
+        if entry is not None:
+            try:
+                current_etag = container.read_etag(item=person_id, partition_key=person_id)
+            except Exception:
+                self.invalidate(person_id)
+                raise
+            if self._revalidated(person_id, entry, current_etag):
+                return entry
+
+        item, etag = container.read_item_with_etag(item=person_id, partition_key=person_id)
+        return self._fetched(person_id, item, etag)
+
+    async def _aentry(self, person_id, revalidate):
+        entry = self._lookup(person_id, revalidate)
+        if entry is not None and entry.fetched_at is not None:
+            return entry
+
+        container = self.async_container_factory()
+        if entry is not None:
+            try:
+                current_etag = await container.read_etag(item=person_id, partition_key=person_id)
+            except Exception:
+                self.invalidate(person_id)
+                raise
+            if self._revalidated(person_id, entry, current_etag):
+                return entry
+
+        item, etag = await container.read_item_with_etag(item=person_id, partition_key=person_id)
+        return self._fetched(person_id, item, etag)
+
+    def _lookup(self, person_id, revalidate):
+        with self._lock:
+            entry = self._entries.get(person_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(person_id)
+            if not revalidate and time.monotonic() - entry.fetched_at < self.ttl_seconds:
+                self.hits += 1
+                return entry
+            return _CacheEntry(entry.item, entry.etag, fetched_at=None, compiled=entry.compiled)
+
+    def _revalidated(self, person_id, stale_entry, current_etag):
+        if current_etag is None or current_etag != stale_entry.etag:
+            with self._lock:
+                self.misses += 1
+            return False
+        with self._lock:
+            self.revalidations += 1
+            stale_entry.fetched_at = time.monotonic()
+            self._store(person_id, stale_entry)
+        return True
+
+    def _fetched(self, person_id, item, etag):
+        entry = _CacheEntry(item, etag, fetched_at=time.monotonic())
+        with self._lock:
+            self._store(person_id, entry)
+        return entry
+
+    def _compiled(self, entry):
+        if entry.compiled is None:
+            entry.compiled = compile_availability(
+                entry.item.get('availability', []), version=entry.item.get('availabilityVersion', 0)
+            )
+        return entry.compiled
+
+    def warm(self, person_ids):
+        found = self.container_factory().read_many_with_etags(person_ids)
+        for (person_id, _), (item, etag) in found.items():
+            self._compiled(self._fetched(person_id, item, etag))
+        return len(found)
+
+    def invalidate(self, person_id):
+        with self._lock:
+            self._entries.pop(person_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.revalidations + self.misses
+            return {
+                'size': len(self._entries),
+                'maxEntries': self.max_entries,
+                'ttlSeconds': self.ttl_seconds,
+                'hits': self.hits,
+                'revalidations': self.revalidations,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hitRatio': (self.hits + self.revalidations) / lookups if lookups else 0.0
+            }
+
+    def _store(self, person_id, entry):
+        self._entries[person_id] = entry
+        self._entries.move_to_end(person_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+def get_people_cache():
+    global _people_cache
+    with _people_cache_lock:
+        if _people_cache is None:
+            _people_cache = PeopleCache(
+                get_people_container,
+                async_container_factory=get_async_people_container,
+                ttl_seconds=float(os.environ.get('PEOPLE_CACHE_TTL', DEFAULT_TTL_SECONDS)),
+                max_entries=int(os.environ.get('PEOPLE_CACHE_SIZE', DEFAULT_MAX_ENTRIES))
+            )
+    return _people_cache
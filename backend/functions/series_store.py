@@ -0,0 +1,238 @@
+import asyncio
+import hashlib
+import os
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from dateutil.rrule import rrulestr
+
+from functions.async_storage import get_async_series_index_container
+from functions.booking_store import CLAIM_RETRIES
+from functions.storage_client import (
+    BOOKINGS_TABLE, ConflictError, get_booking_series_container, get_series_index_container
+)
+from functions.table_versions import bump_table_version
+from functions.utils import parse_datetime, to_epoch
+
+SERIES_ID_PREFIX = 'series-'
+OCCURRENCE_SEPARATOR = '@'
+OCCURRENCE_FORMAT = '%Y%m%dT%H%M%S'
+SERIES_HORIZON_DAYS = 366
+MAX_SERIES_OCCURRENCES = 1000
+ALLOWED_FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY')
+
+FREQUENCY_PATTERN = re.compile(r'FREQ=(\w+)', re.IGNORECASE)
+
+
+def new_series_id():
+    return f"{SERIES_ID_PREFIX}{os.urandom(16).hex()}"
+
+
+def is_series_id(booking_id):
+    return booking_id.startswith(SERIES_ID_PREFIX)
+
+
+def occurrence_id(series_id, occurrence_start):
+    return f"{series_id}{OCCURRENCE_SEPARATOR}{occurrence_start.strftime(OCCURRENCE_FORMAT)}"
+
+
+def split_occurrence_id(booking_id):
+    series_id, _, occurrence = booking_id.partition(OCCURRENCE_SEPARATOR)
+    if not occurrence:
+        return series_id, None
+    return series_id, datetime.strptime(occurrence, OCCURRENCE_FORMAT).isoformat()
+
+
+@lru_cache(maxsize=1024)
+def _parse_rule(recurrence, start_time):
+    return rrulestr(recurrence, dtstart=parse_datetime(start_time), ignoretz=True)
+
+
+def validate_recurrence(recurrence):
+    if not isinstance(recurrence, str) or 'DTSTART' in recurrence.upper():
+        raise ValueError("recurrence must be an RRULE without DTSTART; the series starts at startTime")
+    frequency = FREQUENCY_PATTERN.search(recurrence)
+    if not frequency or frequency.group(1).upper() not in ALLOWED_FREQUENCIES:
+        raise ValueError(f"recurrence FREQ must be one of {', '.join(ALLOWED_FREQUENCIES)}")
+
+
+def build_series(data, start_time, end_time):
+    validate_recurrence(data['recurrence'])
+    series = {
+        'id': new_series_id(),
+        'personIds': list(dict.fromkeys(data['personIds'])),
+        'startTime': start_time.isoformat(),
+        'endTime': end_time.isoformat(),
+        'recurrence': data['recurrence'],
+        'exdates': sorted({parse_datetime(value).isoformat() for value in data.get('exdates', [])}),
+        'overrides': {},
+        'title': data.get('title', ''),
+        'description': data.get('description', ''),
+        'version': 1
+    }
+    try:
+        _parse_rule(series['recurrence'], series['startTime'])
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid recurrence: {str(e)}")
+    return series
+
+
+def occurrences(series, window_start, window_end, exclude=None):
+    start_time = parse_datetime(series['startTime'])
+    duration = parse_datetime(series['endTime']) - start_time
+    excluded = set(series.get('exdates', []))
+    overrides = series.get('overrides', {})
+    if exclude is not None:
+        excluded.add(exclude)
+
+    found = []
+    rule = _parse_rule(series['recurrence'], series['startTime'])
+    for occurrence_start in rule.between(window_start - duration, window_end, inc=True):
+        key = occurrence_start.isoformat()
+        occurrence_end = occurrence_start + duration
+        if key in excluded or key in overrides or occurrence_end <= window_start or occurrence_start >= window_end:
+            continue
+        found.append((key, occurrence_start, occurrence_end))
+    for key, (override_start, override_end) in overrides.items():
+        override_start = parse_datetime(override_start)
+        override_end = parse_datetime(override_end)
+        if key not in excluded and override_start < window_end and window_start < override_end:
+            found.append((key, override_start, override_end))
+    found.sort(key=lambda occurrence: occurrence[1])
+    return found
+
+
+def is_occurrence(series, key):
+    if key in series.get('exdates', []):
+        return False
+    if key in series.get('overrides', {}):
+        return True
+    occurrence_start = parse_datetime(key)
+    rule = _parse_rule(series['recurrence'], series['startTime'])
+    return occurrence_start in rule.between(occurrence_start, occurrence_start, inc=True)
+
+
+def horizon_occurrences(series):
+    start_time = parse_datetime(series['startTime'])
+    found = occurrences(series, start_time, start_time + timedelta(days=SERIES_HORIZON_DAYS))
+    if len(found) > MAX_SERIES_OCCURRENCES:
+        raise ValueError(f"A series may have at most {MAX_SERIES_OCCURRENCES} occurrences within {SERIES_HORIZON_DAYS} days")
+    return found
+
+
+def series_busy(series_list, window_start, window_end, exclude=None):
+    busy = []
+    for series in series_list:
+        skip = exclude[1] if exclude is not None and exclude[0] == series['id'] else None
+        for _, occurrence_start, occurrence_end in occurrences(series, window_start, window_end, skip):
+            busy.append((to_epoch(occurrence_start), to_epoch(occurrence_end, round_up=True)))
+    return busy
+
+
+def series_tag(series_list):
+    if not series_list:
+        return ''
+    versions = ','.join(sorted(f"{series['id']}:{series.get('version', 0)}" for series in series_list))
+    return hashlib.sha1(versions.encode('utf-8')).hexdigest()[:16]
+
+
+def occurrence_item(series, key, occurrence_start, occurrence_end):
+    return {
+        'id': occurrence_id(series['id'], parse_datetime(key)),
+        'seriesId': series['id'],
+        'personIds': series['personIds'],
+        'startTime': occurrence_start.isoformat(),
+        'endTime': occurrence_end.isoformat(),
+        'title': series.get('title', ''),
+        'description': series.get('description', ''),
+        'recurrence': series['recurrence']
+    }
+
+
+def _index_rows(series):
+    return [({**series, 'personId': person_id}, (person_id, series['id'])) for person_id in series['personIds']]
+
+
+def create_series(series):
+    get_booking_series_container().create_item(body=series, overwrite=False)
+    rows = _index_rows(series)
+    try:
+        get_series_index_container().upsert_many([row for row, _ in rows], keys=[key for _, key in rows])
+    finally:
+        bump_table_version(BOOKINGS_TABLE)
+    return series
+
+
+def read_series(series_id):
+    return get_booking_series_container().read_item(item=series_id, partition_key=series_id)
+
+
+def iter_series(page_size=None):
+    return get_booking_series_container().iter_items(page_size=page_size)
+
+
+def delete_series(series_id):
+    container = get_booking_series_container()
+    series = container.read_item(item=series_id, partition_key=series_id)
+    try:
+        get_series_index_container().delete_many([(person_id, series_id) for person_id in series['personIds']])
+        container.delete_item(item=series_id, partition_key=series_id)
+    finally:
+        bump_table_version(BOOKINGS_TABLE)
+    return series
+
+
+def update_series(series_id, change):
+    container = get_booking_series_container()
+    for _ in range(CLAIM_RETRIES):
+        series, etag = container.read_item_with_etag(item=series_id, partition_key=series_id)
+        change(series)
+        series['version'] = series.get('version', 0) + 1
+        try:
+            container.transact([('update', series_id, series_id, series, etag)])
+        except ConflictError:
+            continue
+        rows = _index_rows(series)
+        try:
+            get_series_index_container().upsert_many([row for row, _ in rows], keys=[key for _, key in rows])
+        finally:
+            bump_table_version(BOOKINGS_TABLE)
+        return series
+    raise ConflictError(f"Series {series_id} changed concurrently, please retry")
+
+
+def _strip_index_fields(row):
+    row.pop('personId', None)
+    return row
+
+
+def find_series_for_people(person_ids):
+    container = get_series_index_container()
+    return {
+        person_id: [
+            _strip_index_fields(row) for row in container.query_all(where=[('PartitionKey', 'eq', person_id)])
+        ]
+        for person_id in dict.fromkeys(person_ids)
+    }
+
+
+async def afind_series_for_people(person_ids):
+    container = get_async_series_index_container()
+    person_ids = list(dict.fromkeys(person_ids))
+    row_lists = await asyncio.gather(*(
+        container.query_items(where=[('PartitionKey', 'eq', person_id)]) for person_id in person_ids
+    ))
+    return {
+        person_id: [_strip_index_fields(row) for row in rows]
+        for person_id, rows in zip(person_ids, row_lists)
+    }
+
+
+def unique_series(series_by_person, person_ids=None):
+    found = {}
+    for person_id, series_list in series_by_person.items():
+        if person_ids is None or person_id in person_ids:
+            for series in series_list:
+                found.setdefault(series['id'], series)
+    return list(found.values())
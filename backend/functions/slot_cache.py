@@ -0,0 +1,194 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from functions.change_log import add_change_listener, is_truncated, latest_sequence, read_changes
+from functions.storage_client import PEOPLE_TABLE
+
+DEFAULT_TTL_SECONDS = 60
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_SYNC_SECONDS = 1
+
+_slot_cache = None
+_slot_cache_lock = threading.Lock()
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class Singleflight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, compute):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = compute()
+            return call.result, False
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+def changed_people(change):
+    if change['table'] == PEOPLE_TABLE:
+        return [change['id']]
+    item = change.get('item')
+    if item is None or not isinstance(item.get('personIds'), list):
+        return None
+    return item['personIds']
+
+
+class SlotResultCache:
+    def __init__(self, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES,
+                 sync_seconds=DEFAULT_SYNC_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.sync_seconds = sync_seconds
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self._flight = Singleflight()
+        self._cursor = None
+        self._synced_at = None
+        self._syncing = False
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def get_or_compute(self, kind, params, person_ids, compute):
+        self._sync()
+        person_ids = tuple(sorted(set(person_ids)))
+        with self._lock:
+            key = (kind, params, person_ids, self._epoch, tuple(self._versions.get(person_id, 0) for person_id in person_ids))
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+        def load():
+            result = compute()
+            if result is not None:
+                with self._lock:
+                    self._store(key, (time.monotonic(), result))
+            return result
+
+        result, shared = self._flight.do(key, load)
+        with self._lock:
+            if shared:
+                self.coalesced += 1
+            else:
+                self.misses += 1
+        return result
+
+    def invalidate_people(self, person_ids):
+        with self._lock:
+            for person_id in person_ids:
+                self._versions[person_id] = self._versions.get(person_id, 0) + 1
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self.invalidations += 1
+
+    def observe(self, changes):
+        person_ids = set()
+        for change in changes:
+            changed = changed_people(change)
+            if changed is None:
+                self.clear()
+                return
+            person_ids.update(changed)
+        if person_ids:
+            self.invalidate_people(person_ids)
+
+    def _sync(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._syncing or (self._synced_at is not None and now - self._synced_at < self.sync_seconds):
+                return
+            self._syncing = True
+        try:
+            if self._cursor is None:
+                self._cursor = latest_sequence()
+                return
+            while True:
+                found = read_changes(self._cursor)
+                if is_truncated(self._cursor, found):
+                    self.clear()
+                elif found:
+                    self.observe(found)
+                if not found:
+                    return
+                self._cursor = found[-1]['seq']
+        except Exception as e:
+            logging.warning(f"Could not read changes for the slot cache, clearing it: {str(e)}")
+            self.clear()
+        finally:
+            with self._lock:
+                self._syncing = False
+                self._synced_at = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'size': len(self._entries),
+                'maxEntries': self.max_entries,
+                'ttlSeconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'invalidations': self.invalidations,
+                'evictions': self.evictions,
+                'hitRatio': self.hits / lookups if lookups else 0.0,
+                'coalesceRatio': self.coalesced / lookups if lookups else 0.0
+            }
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+def get_slot_cache():
+    global _slot_cache
+    with _slot_cache_lock:
+        if _slot_cache is None:
+            _slot_cache = SlotResultCache(
+                ttl_seconds=float(os.environ.get('SLOT_CACHE_TTL', DEFAULT_TTL_SECONDS)),
+                max_entries=int(os.environ.get('SLOT_CACHE_SIZE', DEFAULT_MAX_ENTRIES)),
+                sync_seconds=float(os.environ.get('SLOT_CACHE_SYNC_SECONDS', DEFAULT_SYNC_SECONDS))
+            )
+            add_change_listener(_slot_cache.observe)
+    return _slot_cache
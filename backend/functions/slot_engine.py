@@ -0,0 +1,121 @@
+from bisect import bisect_right
+
+from functions.metrics import timed
+
+
+def normalize_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if start >= end:
+            continue
+        if merged and start < merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def merge_busy_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def intersect_intervals(first, second):
+    result = []
+    i = j = 0
+    while i < len(first) and j < len(second):
+        start = max(first[i][0], second[j][0])
+        end = min(first[i][1], second[j][1])
+        if start < end:
+            result.append((start, end))
+        if first[i][1] <= second[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def intersect_anchored_intervals(first, second):
+    result = []
+    i = j = 0
+    while i < len(first) and j < len(second):
+        start = max(first[i][0], second[j][0])
+        end = min(first[i][1], second[j][1])
+        if start < end:
+            result.append((start, end, max(first[i][2], second[j][2])))
+        if first[i][1] <= second[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+@timed('slots')
+def common_free_intervals(intervals_per_person):
+    common = None
+    for intervals in intervals_per_person:
+        intervals = normalize_intervals(intervals)
+        common = intervals if common is None else intersect_intervals(common, intervals)
+        if not common:
+            return []
+    return common or []
+
+
+@timed('slots')
+def candidate_slots(free_intervals, busy_intervals, duration, step, limit=None):
+    busy = merge_busy_intervals(busy_intervals)
+    busy_starts = [start for start, _ in busy]
+    busy_ends = [end for _, end in busy]
+
+    slots = []
+    for range_start, range_end in free_intervals:
+        current = range_start
+        while current + duration <= range_end:
+            slot_end = current + duration
+            index = bisect_right(busy_ends, current)
+            if index < len(busy) and busy_starts[index] < slot_end:
+                current += -((current - busy_ends[index]) // step) * step
+                continue
+
+            slots.append((current, slot_end))
+            if limit is not None and len(slots) >= limit:
+                return slots
+            current += step
+    return slots
+
+
+@timed('slots')
+def common_anchored_intervals(intervals_per_person):
+    common = None
+    for intervals in intervals_per_person:
+        common = intervals if common is None else intersect_anchored_intervals(common, intervals)
+        if not common:
+            return []
+    return common or []
+
+
+@timed('slots')
+def anchored_slots(free_intervals, duration, step, limit=None):
+    slots = []
+    for range_start, range_end, anchor in free_intervals:
+        current = anchor - ((anchor - range_start) // step) * step
+        while current + duration <= range_end:
+            slots.append((current, current + duration))
+            if limit is not None and len(slots) >= limit:
+                return slots
+            current += step
+    return slots
+
+
+def find_common_slots(intervals_per_person, busy_intervals, duration, step, limit=None):
+    free_intervals = common_free_intervals(intervals_per_person)
+    if not free_intervals:
+        return []
+    return candidate_slots(free_intervals, busy_intervals, duration, step, limit)
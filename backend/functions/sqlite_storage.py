@@ -0,0 +1,140 @@
+import base64
+import json
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from functions.table_engine import EngineTableClient, EngineTableService, new_etag
+
+# Non-key fields that queries filter on, per table: prune_changes selects expired rows by `at`.
+INDEXED_FIELDS = {'changes': ('at',)}
+DROPPED_INDEX_FIELDS = ('personId', 'startTime')
+SQL_OPERATORS = {'eq': '=', 'ne': '!=', 'gt': '>', 'ge': '>=', 'lt': '<', 'le': '<='}
+FIELD_PATTERN = re.compile(r'^\w+$')
+BINARY_KEY = '$binary'
+
+
+def _encode_value(value):
+    if isinstance(value, (bytes, bytearray)):
+        return {BINARY_KEY: base64.b64encode(value).decode('ascii')}
+    return str(value)
+
+
+def _decode_object(value):
+    if len(value) == 1 and BINARY_KEY in value:
+        return base64.b64decode(value[BINARY_KEY])
+    return value
+
+
+def _loads(properties):
+    return json.loads(properties, object_hook=_decode_object)
+
+
+def _field_expression(field):
+    if field in ('PartitionKey', 'RowKey'):
+        return field
+    if not FIELD_PATTERN.match(field):
+        raise ValueError(f"Unsupported filter field: {field}")
+    return f"json_extract(properties, '$.{field}')"
+
+
+def _where_clause(any_of, start_key):
+    clauses = []
+    parameters = []
+    if any_of:
+        groups = []
+        for conditions in any_of:
+            comparisons = []
+            for field, op, value in conditions:
+                comparisons.append(f"{_field_expression(field)} {SQL_OPERATORS[op]} ?")
+                parameters.append(value)
+            groups.append('(' + ' AND '.join(comparisons) + ')')
+        clauses.append('(' + ' OR '.join(groups) + ')')
+    if start_key is not None:
+        clauses.append('(PartitionKey, RowKey) >= (?, ?)')
+        parameters.extend(start_key)
+    return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), parameters
+
+
+class SqliteTableClient(EngineTableClient):
+    def __init__(self, table_service, table_name):
+        super().__init__(table_name)
+        self.table_service = table_service
+        self.sql_table = f'"t_{table_name}"'
+
+    @contextmanager
+    def _transaction(self):
+        connection = self.table_service.connection()
+        if connection.in_transaction:
+            yield
+            return
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            connection.rollback()
+            raise
+        connection.commit()
+
+    def _lookup(self, key):
+        row = self.table_service.connection().execute(
+            f'SELECT properties, etag FROM {self.sql_table} WHERE PartitionKey = ? AND RowKey = ?', key
+        ).fetchone()
+        return None if row is None else (_loads(row[0]), row[1])
+
+    def _write(self, key, properties):
+        connection = self.table_service.connection()
+        if properties is None:
+            connection.execute(f'DELETE FROM {self.sql_table} WHERE PartitionKey = ? AND RowKey = ?', key)
+            return None
+        etag = new_etag()
+        connection.execute(
+            f'INSERT OR REPLACE INTO {self.sql_table} (PartitionKey, RowKey, properties, etag) VALUES (?, ?, ?, ?)',
+            (*key, json.dumps(properties, default=_encode_value), etag)
+        )
+        return etag
+
+    def _scan(self, any_of, start_key, limit):
+        where, parameters = _where_clause(any_of, start_key)
+        cursor = self.table_service.connection().execute(
+            f'SELECT PartitionKey, RowKey, properties, etag FROM {self.sql_table}{where} '
+            f'ORDER BY PartitionKey, RowKey LIMIT ?',
+            (*parameters, limit)
+        )
+        return [((partition_key, row_key), _loads(properties), etag) for partition_key, row_key, properties, etag in cursor]
+
+
+class SqliteTableService(EngineTableService):
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self._local = threading.local()
+
+    def connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, isolation_level=None, timeout=30)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _create_table(self, table_name):
+        table_client = SqliteTableClient(self, table_name)
+        connection = self.connection()
+        connection.execute(
+            f'CREATE TABLE IF NOT EXISTS {table_client.sql_table} ('
+            'PartitionKey TEXT NOT NULL, RowKey TEXT NOT NULL, properties TEXT NOT NULL, etag TEXT NOT NULL, '
+            'PRIMARY KEY (PartitionKey, RowKey)) WITHOUT ROWID'
+        )
+        for field in DROPPED_INDEX_FIELDS:
+            connection.execute(f'DROP INDEX IF EXISTS "t_{table_name}_{field}"')
+        for field in INDEXED_FIELDS.get(table_name, ()):
+            connection.execute(
+                f'CREATE INDEX IF NOT EXISTS "t_{table_name}_{field}" '
+                f'ON {table_client.sql_table} (PartitionKey, {_field_expression(field)})'
+            )
+        return table_client
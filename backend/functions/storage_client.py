@@ -1,58 +1,172 @@
 import os
 import json
+import time
+import base64
 import logging
-from azure.data.tables import TableServiceClient, TableClient
+import requests
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from azure.data.tables import TableServiceClient, TableClient, UpdateMode, TableTransactionError
+from azure.core import MatchConditions
 from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+from azure.core.pipeline.transport import RequestsTransport
 
-_people_table = None
-_bookings_table = None
+from functions.entity_codec import (
+    AVAILABILITY, ID_LIST, JSON, SCHEMA_VERSION, SCHEMA_VERSION_FIELD, decode_item, encode_entity, schema_columns
+)
+from functions.memory_storage import MemoryTableService
+from functions.metrics import current_request_metrics, record_rows, storage_span
+from functions.sqlite_storage import SqliteTableService
+
+_tables = {}
 _table_service = None
+_table_service_pid = None
+
+PEOPLE_TABLE = "people"
+BOOKINGS_TABLE = "bookings"
+BOOKING_INDEX_TABLE = "bookingindex"
+BOOKING_CLAIMS_TABLE = "bookingclaims"
+FREEBUSY_TABLE = "freebusy"
+BOOKING_SERIES_TABLE = "bookingseries"
+SERIES_INDEX_TABLE = "seriesindex"
+TABLE_VERSIONS_TABLE = "tableversions"
+CHANGES_TABLE = "changes"
+ANALYTICS_TABLE = "analytics"
+
+TABLES = (
+    PEOPLE_TABLE, BOOKINGS_TABLE, BOOKING_INDEX_TABLE, BOOKING_CLAIMS_TABLE,
+    FREEBUSY_TABLE, BOOKING_SERIES_TABLE, SERIES_INDEX_TABLE, TABLE_VERSIONS_TABLE, CHANGES_TABLE,
+    ANALYTICS_TABLE
+)
+
+SERIES_SCHEMA = {'personIds': ID_LIST, 'exdates': JSON, 'overrides': JSON}
+TABLE_SCHEMAS = {
+    PEOPLE_TABLE: {'availability': AVAILABILITY},
+    BOOKINGS_TABLE: {'personIds': ID_LIST},
+    BOOKING_INDEX_TABLE: {},
+    BOOKING_CLAIMS_TABLE: {'bookings': JSON},
+    FREEBUSY_TABLE: {'free': JSON},
+    BOOKING_SERIES_TABLE: SERIES_SCHEMA,
+    SERIES_INDEX_TABLE: SERIES_SCHEMA,
+    TABLE_VERSIONS_TABLE: {},
+    CHANGES_TABLE: {'item': JSON},
+    ANALYTICS_TABLE: {'hourly': JSON}
+}
+
+STORAGE_POOL_SIZE = int(os.environ.get('STORAGE_POOL_SIZE', 32))
+
+def _azure_table_service():
+    connection_string = os.environ.get('AzureWebJobsStorage')
+    if not connection_string:
+        raise ValueError("AzureWebJobsStorage environment variable is not set")
+    
+    logging.info("Connecting to Azure Table Storage...")
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=STORAGE_POOL_SIZE, pool_maxsize=STORAGE_POOL_SIZE)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    table_service = TableServiceClient.from_connection_string(
+        conn_str=connection_string,
+        transport=RequestsTransport(session=session, session_owner=False)
+    )
+    logging.info("Successfully connected to Azure Table Storage")
+    return table_service
+
+def _sqlite_table_service():
+    connection_string = os.environ.get('AzureWebJobsStorage', '')
+    path = os.environ.get('SQLITE_PATH') or (connection_string[len('sqlite:'):].lstrip('/') if connection_string.startswith('sqlite:') else 'appointments.db')
+    logging.info(f"Using SQLite storage at '{path}'")
+    return SqliteTableService(path)
+
+def _memory_table_service():
+    logging.info("Using in-memory storage")
+    return MemoryTableService()
+
+STORAGE_BACKENDS = {
+    'azure': _azure_table_service,
+    'sqlite': _sqlite_table_service,
+    'memory': _memory_table_service
+}
+
+def get_storage_backend():
+    backend = os.environ.get('STORAGE_BACKEND')
+    if backend:
+        return backend.lower()
+    connection_string = os.environ.get('AzureWebJobsStorage', '')
+    if connection_string.startswith('memory:'):
+        return 'memory'
+    if connection_string.startswith('sqlite:'):
+        return 'sqlite'
+    return 'azure'
 
 def get_table_service():
-    global _table_service
-    if _table_service is None:
-        connection_string = os.environ.get('AzureWebJobsStorage')
-        if not connection_string:
-            raise ValueError("AzureWebJobsStorage environment variable is not set")
-        
-        logging.info("Connecting to Azure Table Storage...")
-        _table_service = TableServiceClient.from_connection_string(conn_str=connection_string)
-        logging.info("Successfully connected to Azure Table Storage")
+    global _table_service, _table_service_pid
+    if _table_service is None or _table_service_pid != os.getpid():
+        backend = get_storage_backend()
+        if backend not in STORAGE_BACKENDS:
+            raise ValueError(f"Unknown storage backend '{backend}', expected one of: {', '.join(STORAGE_BACKENDS)}")
+        _tables.clear()
+        _table_service = STORAGE_BACKENDS[backend]()
+        _table_service_pid = os.getpid()
     return _table_service
 
-def get_people_table():
-    global _people_table
-    if _people_table is None:
-        logging.info("Initializing 'people' table...")
-        table_service = get_table_service()
-        table_name = "people"
-        
+def create_tables():
+    table_service = get_table_service()
+    for table_name in TABLES:
         try:
-            table_client = table_service.create_table_if_not_exists(table_name=table_name)
-            _people_table = table_client
+            _tables[table_name] = table_service.create_table_if_not_exists(table_name=table_name)
             logging.info(f"Table '{table_name}' ready")
         except Exception as e:
-            logging.error(f"Error creating/retrieving table '{table_name}': {str(e)}")
+            logging.error(f"Error creating table '{table_name}': {str(e)}")
             raise
-    
-    return _people_table
+    return len(TABLES)
+
+def warm_tables():
+    for table_name in TABLES:
+        _get_table(table_name)
+    return len(TABLES)
+
+def _get_table(table_name):
+    table_service = get_table_service()
+    table_client = _tables.get(table_name)
+    if table_client is None:
+        table_client = _tables[table_name] = table_service.get_table_client(table_name=table_name)
+    return table_client
+
+def get_people_table():
+    return _get_table(PEOPLE_TABLE)
 
 def get_bookings_table():
-    global _bookings_table
-    if _bookings_table is None:
-        logging.info("Initializing 'bookings' table...")
-        table_service = get_table_service()
-        table_name = "bookings"
-        
-        try:
-            table_client = table_service.create_table_if_not_exists(table_name=table_name)
-            _bookings_table = table_client
-            logging.info(f"Table '{table_name}' ready")
-        except Exception as e:
-            logging.error(f"Error creating/retrieving table '{table_name}': {str(e)}")
-            raise
-    
-    return _bookings_table
+    return _get_table(BOOKINGS_TABLE)
+
+def get_booking_index_table():
+    return _get_table(BOOKING_INDEX_TABLE)
+
+def get_booking_claims_table():
+    return _get_table(BOOKING_CLAIMS_TABLE)
+
+def get_freebusy_table():
+    return _get_table(FREEBUSY_TABLE)
+
+def get_booking_series_table():
+    return _get_table(BOOKING_SERIES_TABLE)
+
+def get_series_index_table():
+    return _get_table(SERIES_INDEX_TABLE)
+
+def get_table_versions_table():
+    return _get_table(TABLE_VERSIONS_TABLE)
+
+def get_changes_table():
+    return _get_table(CHANGES_TABLE)
+
+def get_analytics_table():
+    return _get_table(ANALYTICS_TABLE)
+
+
+class ConflictError(Exception):
+    pass
 
 
 def _serialize_value(value):
@@ -72,7 +186,10 @@ def _deserialize_value(value):
     return value
 
 
-def _serialize_entity(entity):
+def _serialize_entity(entity, table_name=None):
+    schema = TABLE_SCHEMAS.get(table_name)
+    if schema is not None:
+        return encode_entity(entity, schema, table_name)
     serialized = {}
     for key, value in entity.items():
         if key not in ('PartitionKey', 'RowKey', 'etag'):
@@ -92,40 +209,262 @@ def _deserialize_entity(entity):
     return deserialized
 
 
+FILTER_OPERATORS = ('eq', 'ne', 'gt', 'ge', 'lt', 'le')
+MAX_FILTER_COMPARISONS = 15
+MAX_BATCH_SIZE = 100
+
+
+def _build_clauses(conditions, parameters):
+    clauses = []
+    for field, operator, value in conditions:
+        if operator not in FILTER_OPERATORS:
+            raise ValueError(f"Unsupported filter operator: {operator}")
+        name = f"p{len(parameters)}"
+        clauses.append(f"{field} {operator} @{name}")
+        parameters[name] = value
+    return ' and '.join(clauses)
+
+
+def build_filter(conditions=None, any_of=None):
+    parameters = {}
+    if any_of is not None:
+        groups = [_build_clauses(group, parameters) for group in any_of]
+        return ' or '.join(groups), parameters
+    return _build_clauses(conditions, parameters), parameters
+
+
+def key_pair(key):
+    if isinstance(key, (tuple, list)):
+        return key[0], key[1]
+    return key, key
+
+
+def entity_key(entity):
+    return entity.get('PartitionKey'), entity.get('RowKey')
+
+
+def read_many_filters(keys):
+    comparisons = 1 if all(partition_key == row_key for partition_key, row_key in keys) else 2
+    chunk_size = MAX_FILTER_COMPARISONS // comparisons
+    for start in range(0, len(keys), chunk_size):
+        any_of = []
+        for partition_key, row_key in keys[start:start + chunk_size]:
+            group = [('PartitionKey', 'eq', partition_key)]
+            if comparisons == 2:
+                group.append(('RowKey', 'eq', row_key))
+            any_of.append(group)
+        yield any_of
+
+
+def encode_continuation_token(token):
+    if not token:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(token).encode('utf-8')).decode('ascii')
+
+
+def decode_continuation_token(token):
+    if not token:
+        return None
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid continuation token")
+    if not isinstance(decoded, dict):
+        raise ValueError("Invalid continuation token")
+    return decoded
+
+
+def _select_fields(select, table_name=None):
+    if not select:
+        return None
+    return list(dict.fromkeys(['PartitionKey', 'RowKey', 'id', *schema_columns(TABLE_SCHEMAS.get(table_name, {}), select)]))
+
+
+def transaction_operations(operations, table_name=None):
+    batch = []
+    for kind, partition_key, row_key, body, etag in operations:
+        entity = _serialize_entity({'PartitionKey': partition_key, 'RowKey': row_key, **(body or {})}, table_name)
+        kwargs = {}
+        if kind in ('update', 'upsert'):
+            kwargs['mode'] = UpdateMode.REPLACE
+        if etag and kind in ('update', 'delete'):
+            kwargs['etag'] = etag
+            kwargs['match_condition'] = MatchConditions.IfNotModified
+        batch.append((kind, entity, kwargs))
+    return batch
+
+
+def is_conflict(error):
+    return isinstance(error, ResourceExistsError) or getattr(error, 'status_code', None) in (404, 409, 412)
+
+
+def entity_etag(entity):
+    metadata = getattr(entity, 'metadata', None) or {}
+    return metadata.get('etag') or entity.get('etag')
+
+
+def entity_to_item(entity, table_name=None):
+    metrics = current_request_metrics()
+    if metrics is None:
+        return _entity_to_item(entity, table_name)
+    started = time.perf_counter()
+    item = _entity_to_item(entity, table_name)
+    size = sum(len(value) for value in entity.values() if isinstance(value, (str, bytes)))
+    record_rows(metrics, 1, size, time.perf_counter() - started)
+    return item
+
+
+def _entity_to_item(entity, table_name=None):
+    schema = TABLE_SCHEMAS.get(table_name)
+    item = _deserialize_entity(dict(entity)) if schema is None else dict(entity)
+    item.pop('etag', None)
+    partition_key = item.pop('PartitionKey', None)
+    row_key = item.pop('RowKey', None)
+    if schema is not None:
+        decode_item(item, schema)
+    if 'id' not in item:
+        item['id'] = partition_key or row_key
+    return item
+
+
 class TableContainerWrapper:
     def __init__(self, table_client):
         self.table_client = table_client
+        self.table_name = getattr(table_client, 'table_name', None)
     
-    def query_items(self, query=None, enable_cross_partition_query=None):
+    def query_items(self, query=None, enable_cross_partition_query=None, where=None, any_of=None):
         try:
-            entities = self.table_client.list_entities()
-            items = []
-            for entity in entities:
-                item = dict(entity)
-                item = _deserialize_entity(item)
-                item.pop('etag', None)
-                item.pop('PartitionKey', None)
-                item.pop('RowKey', None)
-                if 'id' not in item:
-                    item['id'] = entity.get('PartitionKey') or entity.get('RowKey')
-                items.append(item)
-            return items
+            return self.query_all(where, any_of)
         except Exception as e:
             logging.error(f"Error querying table: {str(e)}")
             return []
     
-    def create_item(self, body):
+    def query_all(self, where=None, any_of=None):
+        with storage_span(self.table_name, 'query'):
+            entities = list(self._query_entities(where, any_of))
+        return [entity_to_item(entity, self.table_name) for entity in entities]
+    
+    def query_page(self, where=None, limit=None, continuation_token=None, select=None):
+        try:
+            pages = self._query_entities(where, select=select, page_size=limit).by_page(
+                continuation_token=decode_continuation_token(continuation_token)
+            )
+            with storage_span(self.table_name, 'query_page'):
+                entities = list(next(pages, []))
+            items = [entity_to_item(entity, self.table_name) for entity in entities]
+            return items, encode_continuation_token(pages.continuation_token)
+        except ValueError:
+            raise
+        except Exception as e:
+            logging.error(f"Error querying table page: {str(e)}")
+            raise
+    
+    def iter_items(self, where=None, select=None, page_size=None):
+        pages = self._query_entities(where, select=select, page_size=page_size).by_page()
+        while True:
+            with storage_span(self.table_name, 'query_page'):
+                page = next(pages, None)
+                entities = list(page or [])
+            if page is None:
+                return
+            yield from [entity_to_item(entity, self.table_name) for entity in entities]
+    
+    def _query_entities(self, where=None, any_of=None, select=None, page_size=None):
+        kwargs = {}
+        if select:
+            kwargs['select'] = _select_fields(select, self.table_name)
+        if page_size:
+            kwargs['results_per_page'] = page_size
+        if where or any_of:
+            query_filter, parameters = build_filter(where, any_of)
+            return self.table_client.query_entities(query_filter=query_filter, parameters=parameters, **kwargs)
+        return self.table_client.list_entities(**kwargs)
+    
+    def read_many(self, keys):
+        keys = list(dict.fromkeys(key_pair(key) for key in keys))
+        found = self.read_many_with_etags(keys)
+        return [found[key][0] for key in keys if key in found]
+    
+    def read_many_with_etags(self, keys):
+        keys = list(dict.fromkeys(key_pair(key) for key in keys))
+        found = {}
+        for any_of in read_many_filters(keys):
+            try:
+                with storage_span(self.table_name, 'read_many'):
+                    entities = list(self._query_entities(any_of=any_of))
+                for entity in entities:
+                    found[entity_key(entity)] = (entity_to_item(entity, self.table_name), entity_etag(entity))
+            except Exception as e:
+                logging.error(f"Error reading items: {str(e)}")
+                raise
+        return found
+    
+    def transact(self, operations):
+        try:
+            with storage_span(self.table_name, 'transaction'):
+                return self.table_client.submit_transaction(transaction_operations(operations, self.table_name))
+        except TableTransactionError as e:
+            if is_conflict(e):
+                raise ConflictError(str(e))
+            logging.error(f"Error submitting transaction: {str(e)}")
+            raise
+    
+    def upsert_many(self, bodies, keys=None):
+        keys = keys or [body.get('id', 'default') for body in bodies]
+        partitions = {}
+        for body, key in zip(bodies, keys):
+            partition_key, row_key = key_pair(key)
+            entity = _serialize_entity({'PartitionKey': partition_key, 'RowKey': row_key, **body}, self.table_name)
+            partitions.setdefault(partition_key, {})[row_key] = ('upsert', entity, {'mode': UpdateMode.REPLACE})
+        self._submit_batches(partitions)
+        return len(bodies)
+    
+    def delete_many(self, keys):
+        partitions = {}
+        for partition_key, row_key in map(key_pair, keys):
+            operation = ('delete', {'PartitionKey': partition_key, 'RowKey': row_key})
+            partitions.setdefault(partition_key, {})[row_key] = operation
+        self._submit_batches(partitions)
+    
+    def _submit_batches(self, partitions):
+        batches = []
+        for operations in partitions.values():
+            operations = list(operations.values())
+            for start in range(0, len(operations), MAX_BATCH_SIZE):
+                batches.append(operations[start:start + MAX_BATCH_SIZE])
+        
+        with ThreadPoolExecutor(max_workers=min(STORAGE_POOL_SIZE, len(batches) or 1)) as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, self._submit_batch, batch)
+                for batch in batches
+            ]
+            for future in futures:
+                future.result()
+    
+    def _submit_batch(self, operations):
+        try:
+            with storage_span(self.table_name, 'batch'):
+                self.table_client.submit_transaction(operations)
+        except Exception as e:
+            logging.error(f"Error submitting batch: {str(e)}")
+            raise
+    
+    def create_item(self, body, partition_key=None, row_key=None, overwrite=True):
         entity = {
-            'PartitionKey': body.get('id', 'default'),
-            'RowKey': body.get('id', 'default'),
+            'PartitionKey': partition_key or body.get('id', 'default'),
+            'RowKey': row_key or body.get('id', 'default'),
             **body
         }
-        entity = _serialize_entity(entity)
+        entity = _serialize_entity(entity, self.table_name)
         try:
-            self.table_client.create_entity(entity=entity)
+            with storage_span(self.table_name, 'create'):
+                self.table_client.create_entity(entity=entity)
             return body
         except ResourceExistsError:
-            self.table_client.update_entity(entity=entity)
+            if not overwrite:
+                raise ConflictError(f"Item {entity['PartitionKey']}/{entity['RowKey']} already exists")
+            with storage_span(self.table_name, 'update'):
+                self.table_client.update_entity(entity=entity)
             return body
         except Exception as e:
             logging.error(f"Error creating item: {str(e)}")
@@ -133,30 +472,47 @@ class TableContainerWrapper:
     
     def read_item(self, item, partition_key):
         try:
-            entity = self.table_client.get_entity(partition_key=partition_key, row_key=item)
-            result = dict(entity)
-            result = _deserialize_entity(result)
-            result.pop('etag', None)
-            result.pop('PartitionKey', None)
-            result.pop('RowKey', None)
-            if 'id' not in result:
-                result['id'] = partition_key
-            return result
+            with storage_span(self.table_name, 'read'):
+                entity = self.table_client.get_entity(partition_key=partition_key, row_key=item)
+            return entity_to_item(entity, self.table_name)
+        except ResourceNotFoundError:
+            raise Exception("Item not found")
+        except Exception as e:
+            logging.error(f"Error reading item: {str(e)}")
+            raise
+    
+    def read_item_with_etag(self, item, partition_key):
+        try:
+            with storage_span(self.table_name, 'read'):
+                entity = self.table_client.get_entity(partition_key=partition_key, row_key=item)
+            return entity_to_item(entity, self.table_name), entity_etag(entity)
         except ResourceNotFoundError:
             raise Exception("Item not found")
         except Exception as e:
             logging.error(f"Error reading item: {str(e)}")
             raise
     
+    def read_etag(self, item, partition_key):
+        try:
+            with storage_span(self.table_name, 'read_etag'):
+                entity = self.table_client.get_entity(partition_key=partition_key, row_key=item, select=['RowKey'])
+            return entity_etag(entity)
+        except ResourceNotFoundError:
+            raise Exception("Item not found")
+        except Exception as e:
+            logging.error(f"Error reading item etag: {str(e)}")
+            raise
+    
     def replace_item(self, item, body):
         entity = {
             'PartitionKey': body.get('id', item),
             'RowKey': body.get('id', item),
             **body
         }
-        entity = _serialize_entity(entity)
+        entity = _serialize_entity(entity, self.table_name)
         try:
-            self.table_client.update_entity(entity=entity)
+            with storage_span(self.table_name, 'update'):
+                self.table_client.update_entity(entity=entity)
             return body
         except Exception as e:
             logging.error(f"Error replacing item: {str(e)}")
@@ -164,12 +520,58 @@ class TableContainerWrapper:
     
     def delete_item(self, item, partition_key):
         try:
-            self.table_client.delete_entity(partition_key=partition_key, row_key=item)
+            with storage_span(self.table_name, 'delete'):
+                self.table_client.delete_entity(partition_key=partition_key, row_key=item)
         except ResourceNotFoundError:
             raise Exception("Item not found")
         except Exception as e:
             logging.error(f"Error deleting item: {str(e)}")
             raise
+    
+    def migrate_schema(self):
+        schema = TABLE_SCHEMAS.get(self.table_name)
+        if schema is None:
+            return 0, 0
+        migrated = skipped = 0
+        batch = []
+        for entity in self._query_entities():
+            if entity.get(SCHEMA_VERSION_FIELD) == SCHEMA_VERSION:
+                continue
+            if batch and (len(batch) >= MAX_BATCH_SIZE or batch[0][1]['PartitionKey'] != entity['PartitionKey']):
+                count = self._migrate_batch(batch)
+                migrated, skipped = migrated + count, skipped + len(batch) - count
+                batch = []
+            body = decode_item({
+                key: value for key, value in entity.items() if key not in ('PartitionKey', 'RowKey', 'etag')
+            }, schema)
+            encoded = _serialize_entity({'PartitionKey': entity['PartitionKey'], 'RowKey': entity['RowKey'], **body}, self.table_name)
+            batch.append(('update', encoded, {
+                'mode': UpdateMode.REPLACE,
+                'etag': entity_etag(entity),
+                'match_condition': MatchConditions.IfNotModified
+            }))
+        if batch:
+            count = self._migrate_batch(batch)
+            migrated, skipped = migrated + count, skipped + len(batch) - count
+        return migrated, skipped
+    
+    def _migrate_batch(self, operations):
+        try:
+            with storage_span(self.table_name, 'batch'):
+                self.table_client.submit_transaction(operations)
+            return len(operations)
+        except TableTransactionError as e:
+            if not is_conflict(e):
+                raise
+            logging.warning(f"Skipped {len(operations)} rows of '{self.table_name}' changed during migration: {str(e)}")
+            return 0
+
+
+def migrate_entity_schema(table_names=TABLES):
+    return {
+        table_name: TableContainerWrapper(_get_table(table_name)).migrate_schema()
+        for table_name in table_names
+    }
 
 
 def get_people_container():
@@ -180,3 +582,34 @@ def get_bookings_container():
     table = get_bookings_table()
     return TableContainerWrapper(table)
 
+def get_booking_index_container():
+    table = get_booking_index_table()
+    return TableContainerWrapper(table)
+
+def get_booking_claims_container():
+    table = get_booking_claims_table()
+    return TableContainerWrapper(table)
+
+def get_freebusy_container():
+    table = get_freebusy_table()
+    return TableContainerWrapper(table)
+
+def get_booking_series_container():
+    table = get_booking_series_table()
+    return TableContainerWrapper(table)
+
+def get_series_index_container():
+    table = get_series_index_table()
+    return TableContainerWrapper(table)
+
+def get_table_versions_container():
+    table = get_table_versions_table()
+    return TableContainerWrapper(table)
+
+def get_changes_container():
+    table = get_changes_table()
+    return TableContainerWrapper(table)
+
+def get_analytics_container():
+    table = get_analytics_table()
+    return TableContainerWrapper(table)
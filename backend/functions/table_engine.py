@@ -0,0 +1,301 @@
+import operator
+import uuid
+
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceExistsError, ResourceModifiedError, ResourceNotFoundError
+from azure.data.tables import TableTransactionError, UpdateMode
+
+KEY_FIELDS = ('PartitionKey', 'RowKey')
+DEFAULT_PAGE_SIZE = 1000
+MAX_TRANSACTION_SIZE = 100
+
+COMPARATORS = {
+    'eq': operator.eq,
+    'ne': operator.ne,
+    'gt': operator.gt,
+    'ge': operator.ge,
+    'lt': operator.lt,
+    'le': operator.le
+}
+
+
+def parse_filter(query_filter, parameters):
+    any_of = []
+    for group in query_filter.split(' or '):
+        conditions = []
+        for clause in group.split(' and '):
+            field, op, name = clause.split(' ')
+            if op not in COMPARATORS or not name.startswith('@'):
+                raise ValueError(f"Unsupported filter clause: {clause}")
+            conditions.append((field, op, parameters[name[1:]]))
+        any_of.append(conditions)
+    return any_of
+
+
+def _compare(actual, op, expected):
+    if actual is None:
+        return False
+    try:
+        return COMPARATORS[op](actual, expected)
+    except TypeError:
+        return False
+
+
+def matches(entity, any_of):
+    if not any_of:
+        return True
+    return any(
+        all(_compare(entity.get(field), op, value) for field, op, value in conditions)
+        for conditions in any_of
+    )
+
+
+def partition_ranges(any_of):
+    if not any_of:
+        return [(None, None)]
+    ranges = []
+    for conditions in any_of:
+        low = high = None
+        for field, op, value in conditions:
+            if field != 'PartitionKey':
+                continue
+            if op in ('eq', 'ge', 'gt'):
+                low = value if low is None else max(low, value)
+            if op in ('eq', 'le', 'lt'):
+                high = value if high is None else min(high, value)
+        ranges.append((low, high))
+
+    merged = []
+    for low, high in sorted(ranges, key=lambda bounds: (bounds[0] is not None, bounds[0] or '')):
+        if merged and (merged[-1][1] is None or (low is not None and low <= merged[-1][1])):
+            previous_low, previous_high = merged[-1]
+            merged[-1] = (previous_low, None if high is None or previous_high is None else max(previous_high, high))
+        else:
+            merged.append((low, high))
+    return merged
+
+
+def new_etag():
+    return f'W/"{uuid.uuid4().hex}"'
+
+
+def entity_key(entity):
+    return entity['PartitionKey'], entity['RowKey']
+
+
+def to_entity(key, properties, etag, select=None):
+    entity = {'PartitionKey': key[0], 'RowKey': key[1], **properties}
+    if select:
+        entity = {field: entity[field] for field in select if field in entity}
+    entity['etag'] = etag
+    return entity
+
+
+def properties_of(entity):
+    return {field: value for field, value in entity.items() if field not in KEY_FIELDS and field != 'etag'}
+
+
+def transaction_error(status_code, message):
+    error = TableTransactionError(message=message)
+    error.status_code = status_code
+    return error
+
+
+class EntityPages:
+    def __init__(self, fetch, page_size=None):
+        self.fetch = fetch
+        self.page_size = page_size or DEFAULT_PAGE_SIZE
+
+    def __iter__(self):
+        for page in self.by_page():
+            yield from page
+
+    def by_page(self, continuation_token=None):
+        return _PageIterator(self.fetch, self.page_size, continuation_token)
+
+
+class _PageIterator:
+    def __init__(self, fetch, page_size, continuation_token):
+        self.fetch = fetch
+        self.page_size = page_size
+        self.continuation_token = continuation_token
+        self._done = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._done:
+            raise StopIteration
+        entities, self.continuation_token = self.fetch(self.continuation_token, self.page_size)
+        if self.continuation_token is None:
+            self._done = True
+        return iter(entities)
+
+
+class EngineTableClient:
+    def __init__(self, table_name):
+        self.table_name = table_name
+
+    def _transaction(self):
+        raise NotImplementedError
+
+    def _lookup(self, key):
+        raise NotImplementedError
+
+    def _write(self, key, properties):
+        raise NotImplementedError
+
+    def _scan(self, any_of, start_key, limit):
+        raise NotImplementedError
+
+    def create_entity(self, entity, **kwargs):
+        key = entity_key(entity)
+        with self._transaction():
+            if self._lookup(key) is not None:
+                raise ResourceExistsError(f"Entity {key[0]}/{key[1]} already exists")
+            return {'etag': self._write(key, properties_of(entity))}
+
+    def update_entity(self, entity, mode=UpdateMode.MERGE, **kwargs):
+        key = entity_key(entity)
+        with self._transaction():
+            current = self._lookup(key)
+            if current is None:
+                raise ResourceNotFoundError(f"Entity {key[0]}/{key[1]} not found")
+            self._check_etag(current, kwargs, ResourceModifiedError)
+            return {'etag': self._write(key, self._merged(current, entity, mode))}
+
+    def upsert_entity(self, entity, mode=UpdateMode.MERGE, **kwargs):
+        key = entity_key(entity)
+        with self._transaction():
+            return {'etag': self._write(key, self._merged(self._lookup(key), entity, mode))}
+
+    def get_entity(self, partition_key, row_key, select=None, **kwargs):
+        current = self._lookup((partition_key, row_key))
+        if current is None:
+            raise ResourceNotFoundError(f"Entity {partition_key}/{row_key} not found")
+        properties, etag = current
+        return to_entity((partition_key, row_key), properties, etag, select)
+
+    def delete_entity(self, partition_key, row_key, **kwargs):
+        key = (partition_key, row_key)
+        with self._transaction():
+            current = self._lookup(key)
+            if current is None:
+                return
+            self._check_etag(current, kwargs, ResourceModifiedError)
+            self._write(key, None)
+
+    def list_entities(self, select=None, results_per_page=None, **kwargs):
+        return EntityPages(self._fetcher(None, select), results_per_page)
+
+    def query_entities(self, query_filter, parameters=None, select=None, results_per_page=None, **kwargs):
+        any_of = parse_filter(query_filter, parameters or {})
+        return EntityPages(self._fetcher(any_of, select), results_per_page)
+
+    def submit_transaction(self, operations, **kwargs):
+        operations = list(operations)
+        if len({operation[1]['PartitionKey'] for operation in operations}) > 1:
+            raise transaction_error(400, "All operations in a transaction must share a PartitionKey")
+        if len(operations) > MAX_TRANSACTION_SIZE:
+            raise transaction_error(400, f"A transaction is limited to {MAX_TRANSACTION_SIZE} operations")
+
+        with self._transaction():
+            staged = {}
+            for operation in operations:
+                kind, entity = operation[0], operation[1]
+                options = operation[2] if len(operation) > 2 else {}
+                key = entity_key(entity)
+                if key in staged:
+                    raise transaction_error(400, f"Entity {key[0]}/{key[1]} appears more than once in the transaction")
+                current = self._lookup(key)
+                if kind == 'create':
+                    if current is not None:
+                        raise transaction_error(409, f"Entity {key[0]}/{key[1]} already exists")
+                    staged[key] = properties_of(entity)
+                elif kind == 'upsert':
+                    staged[key] = self._merged(current, entity, options.get('mode', UpdateMode.MERGE))
+                elif kind in ('update', 'delete'):
+                    if current is None:
+                        raise transaction_error(404, f"Entity {key[0]}/{key[1]} not found")
+                    self._check_etag(current, options, lambda message: transaction_error(412, message))
+                    staged[key] = self._merged(current, entity, options.get('mode', UpdateMode.MERGE)) if kind == 'update' else None
+                else:
+                    raise transaction_error(400, f"Unsupported transaction operation: {kind}")
+
+            return [{'etag': self._write(key, properties)} for key, properties in staged.items()]
+
+    def _fetcher(self, any_of, select):
+        def fetch(continuation_token, page_size):
+            start_key = None
+            if continuation_token:
+                start_key = (continuation_token['PartitionKey'], continuation_token['RowKey'])
+            rows = self._scan(any_of, start_key, page_size + 1)
+            next_token = None
+            if len(rows) > page_size:
+                next_key = rows[page_size][0]
+                next_token = {'PartitionKey': next_key[0], 'RowKey': next_key[1]}
+                rows = rows[:page_size]
+            return [to_entity(key, properties, etag, select) for key, properties, etag in rows], next_token
+        return fetch
+
+    def _merged(self, current, entity, mode):
+        properties = properties_of(entity)
+        if current is None or mode == UpdateMode.REPLACE:
+            return properties
+        return {**current[0], **properties}
+
+    def _check_etag(self, current, options, error):
+        if options.get('match_condition') == MatchConditions.IfNotModified and options.get('etag') != current[1]:
+            raise error("The entity has been modified since it was read")
+
+
+class EngineTableService:
+    def __init__(self):
+        self._tables = {}
+
+    def _create_table(self, table_name):
+        raise NotImplementedError
+
+    def create_table_if_not_exists(self, table_name):
+        table_client = self._tables.get(table_name)
+        if table_client is None:
+            table_client = self._tables.setdefault(table_name, self._create_table(table_name))
+        return table_client
+
+    def get_table_client(self, table_name):
+        return self.create_table_if_not_exists(table_name)
+
+
+class _AsyncEntities:
+    def __init__(self, entities):
+        self.entities = entities
+
+    async def __aiter__(self):
+        for entity in self.entities:
+            yield entity
+
+
+class AsyncTableClientAdapter:
+    def __init__(self, table_client):
+        self.table_client = table_client
+
+    async def get_entity(self, *args, **kwargs):
+        return self.table_client.get_entity(*args, **kwargs)
+
+    def list_entities(self, **kwargs):
+        return _AsyncEntities(self.table_client.list_entities(**kwargs))
+
+    def query_entities(self, *args, **kwargs):
+        return _AsyncEntities(self.table_client.query_entities(*args, **kwargs))
+
+
+class AsyncTableServiceAdapter:
+    def __init__(self, table_service):
+        self.table_service = table_service
+
+    def get_table_client(self, table_name):
+        return AsyncTableClientAdapter(self.table_service.get_table_client(table_name))
+
+    async def close(self):
+        pass
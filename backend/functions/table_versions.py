@@ -0,0 +1,25 @@
+import logging
+from datetime import datetime, timezone
+
+from functions.storage_client import get_table_versions_container
+
+
+def bump_table_version(*table_names):
+    updated_at = datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+    try:
+        get_table_versions_container().upsert_many([{'id': table_name, 'updatedAt': updated_at} for table_name in table_names])
+    except Exception as e:
+        logging.error(f"Could not bump versions of {', '.join(table_names)}, cached responses may be stale: {str(e)}")
+
+
+def read_table_version(table_name):
+    container = get_table_versions_container()
+    for _ in range(2):
+        try:
+            item, etag = container.read_item_with_etag(item=table_name, partition_key=table_name)
+            return etag, datetime.fromisoformat(item['updatedAt']).replace(tzinfo=timezone.utc)
+        except Exception as e:
+            if 'not found' not in str(e).lower():
+                raise
+        bump_table_version(table_name)
+    return None, None
@@ -1,14 +1,36 @@
-from datetime import datetime, timedelta, time
+import math
+from datetime import datetime, time, timedelta, timezone
 from dateutil import parser
 
+from functions.availability import CompiledAvailability, compile_availability, day_start, minute_to_datetime
+from functions.metrics import timed
+
+EPOCH = datetime(1970, 1, 1)
+
+@timed('parse')
 def parse_datetime(dt_str):
     if isinstance(dt_str, str):
-        return parser.parse(dt_str)
-    return dt_str
+        try:
+            dt_str = datetime.fromisoformat(dt_str)
+        except ValueError:
+            dt_str = parser.parse(dt_str)
+    return to_utc(dt_str)
+
+def to_utc(dt):
+    if isinstance(dt, datetime) and dt.tzinfo is not None:
+        return dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+def to_epoch(dt, round_up=False):
+    seconds = (parse_datetime(dt) - EPOCH) / timedelta(seconds=1)
+    return math.ceil(seconds) if round_up else math.floor(seconds)
 
 def time_to_minutes(t):
     if isinstance(t, str):
-        t = parser.parse(t).time()
+        try:
+            t = time.fromisoformat(t)
+        except ValueError:
+            t = parser.parse(t).time()
     return t.hour * 60 + t.minute
 
 def minutes_to_time(minutes):
@@ -17,9 +39,7 @@ def minutes_to_time(minutes):
     return time(hours, mins)
 
 def get_day_of_week(dt):
-    if isinstance(dt, str):
-        dt = parser.parse(dt)
-    return dt.weekday()
+    return parse_datetime(dt).weekday()
 
 def day_name_to_number(day_name):
     days = {
@@ -40,59 +60,17 @@ def slots_overlap(slot1_start, slot1_end, slot2_start, slot2_end):
     return slot1_start < slot2_end and slot2_start < slot1_end
 
 def get_time_slots_for_day(availability_schedule, day_of_week, date):
-    slots = []
-    
-    day_availability = None
-    for avail in availability_schedule:
-        if avail.get('day') == day_of_week:
-            day_availability = avail
-            break
+    if not isinstance(availability_schedule, CompiledAvailability):
+        availability_schedule = compile_availability(availability_schedule)
     
-    if not day_availability:
-        return []
-    
-    time_ranges = day_availability.get('timeSlots', [])
-    
-    for time_range in time_ranges:
-        start_time_str = time_range.get('start')
-        end_time_str = time_range.get('end')
-        
-        if not start_time_str or not end_time_str:
-            continue
-        
-        if isinstance(start_time_str, str):
-            try:
-                if ':' in start_time_str and len(start_time_str) <= 5:
-                    parts = start_time_str.split(':')
-                    start_time = time(int(parts[0]), int(parts[1]))
-                else:
-                    start_time = parser.parse(start_time_str).time()
-            except:
-                continue
-        else:
-            start_time = start_time_str
-        
-        if isinstance(end_time_str, str):
-            try:
-                if ':' in end_time_str and len(end_time_str) <= 5:
-                    parts = end_time_str.split(':')
-                    end_time = time(int(parts[0]), int(parts[1]))
-                else:
-                    end_time = parser.parse(end_time_str).time()
-            except:
-                continue
-        else:
-            end_time = end_time_str
-        
-        start_datetime = datetime.combine(date.date() if isinstance(date, datetime) else date, start_time)
-        end_datetime = datetime.combine(date.date() if isinstance(date, datetime) else date, end_time)
-        
-        slots.append({
-            'start': start_datetime,
-            'end': end_datetime
-        })
-    
-    return slots
+    origin = day_start(date)
+    return [
+        {
+            'start': minute_to_datetime(origin, start_minute),
+            'end': minute_to_datetime(origin, end_minute)
+        }
+        for start_minute, end_minute in availability_schedule.intervals(day_of_week)
+    ]
 
 def default_availability():
     return [
@@ -0,0 +1,24 @@
+import logging
+import os
+import time
+
+from functions.async_storage import run_async, warm_async_tables
+from functions.metrics import STARTUP_SECONDS
+from functions.people_cache import get_people_cache
+from functions.storage_client import get_people_container, warm_tables
+
+WARM_PEOPLE_LIMIT = int(os.environ.get('WARM_PEOPLE_CACHE', 500))
+
+
+def warm_worker(people_limit=WARM_PEOPLE_LIMIT):
+    started = time.perf_counter()
+    tables = warm_tables()
+    run_async(warm_async_tables())
+    people = 0
+    if people_limit:
+        found, _ = get_people_container().query_page(limit=people_limit, select=['id'])
+        people = get_people_cache().warm([item['id'] for item in found])
+    elapsed = time.perf_counter() - started
+    STARTUP_SECONDS.set(elapsed, phase='warmup')
+    logging.info(f"Worker {os.getpid()} warmed {tables} tables and {people} people in {elapsed * 1000:.1f} ms")
+    return elapsed
@@ -0,0 +1,83 @@
+import multiprocessing
+import os
+import tempfile
+import time
+
+_config_loaded = time.perf_counter()
+
+
+def _env_flag(name, default):
+    return os.environ.get(name, default).lower() in ('1', 'true', 'yes', 'on')
+
+
+def _default_workers():
+    if (os.environ.get('STORAGE_BACKEND') or '').lower() == 'memory':
+        return 1
+    cpus = multiprocessing.cpu_count()
+    if worker_class == 'gevent':
+        return cpus
+    return cpus * 2 + 1
+
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', 8000)}")
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get('WEB_CONCURRENCY') or _default_workers())
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 0))
+preload_app = _env_flag('GUNICORN_PRELOAD', '1')
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+
+CREATE_TABLES_ON_START = _env_flag('STORAGE_CREATE_TABLES', '1')
+STREAMING_WORKER_CLASSES = ('gthread', 'gevent')
+
+# Only gthread/gevent workers keep heartbeating while a request runs, so SSE streams
+# (and long bulk imports or exports) are killed after `timeout` on sync workers.
+os.environ.setdefault('CHANGES_STREAM_ENABLED', '1' if worker_class in STREAMING_WORKER_CLASSES else '0')
+
+if workers > 1 and not os.environ.get('METRICS_MULTIPROC_DIR'):
+    os.environ['METRICS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='appointment-metrics-')
+
+
+def on_starting(server):
+    from functions.metrics import METRICS_MULTIPROC_DIR, clear_metrics_snapshots
+
+    if METRICS_MULTIPROC_DIR:
+        clear_metrics_snapshots()
+    if not CREATE_TABLES_ON_START:
+        return
+    from functions.storage_client import create_tables
+
+    started = time.perf_counter()
+    count = create_tables()
+    server.log.info(f"Created {count} tables in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+def when_ready(server):
+    from functions.metrics import STARTUP_SECONDS, write_metrics_snapshot
+
+    elapsed = time.perf_counter() - _config_loaded
+    STARTUP_SECONDS.set(elapsed, phase='master')
+    write_metrics_snapshot()
+    server.log.info(f"Master ready in {elapsed * 1000:.1f} ms ({workers} {worker_class} workers, preload={preload_app})")
+
+
+def post_fork(server, worker):
+    from functions.metrics import reset_metrics
+    from functions.warmup import warm_worker
+
+    reset_metrics()
+    try:
+        warm_worker()
+    except Exception as e:
+        server.log.warning(f"Worker {worker.pid} warm-up failed, continuing cold: {str(e)}")
+
+
+def worker_exit(server, worker):
+    from functions.metrics import write_metrics_snapshot
+
+    write_metrics_snapshot(include_gauges=False)
@@ -0,0 +1,46 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('STORAGE_BACKEND', 'memory')
+
+from functions import async_storage, change_log, people_cache, slot_cache, storage_client
+
+LOCAL_ENGINES = ('memory', 'sqlite')
+AZURE_CONNECTION_STRING = os.environ.get('AzureWebJobsStorage', '')
+ENGINES = LOCAL_ENGINES + (('azure',) if AZURE_CONNECTION_STRING and not AZURE_CONNECTION_STRING.startswith(('memory:', 'sqlite:')) else ())
+
+
+def reset_storage():
+    storage_client._table_service = None
+    storage_client._tables.clear()
+    async_storage._async_table_service = None
+    async_storage._async_tables.clear()
+    people_cache._people_cache = None
+    slot_cache._slot_cache = None
+    change_log._listeners.clear()
+    change_log._last_sequence = 0
+    change_log.CHANGE_TAIL = change_log.ChangeTail(change_log.CHANGES_POLL_SECONDS)
+
+
+def use_engine(name, tmp_path, monkeypatch):
+    monkeypatch.setenv('STORAGE_BACKEND', name)
+    monkeypatch.setenv('SQLITE_PATH', str(tmp_path / 'appointments.db'))
+    reset_storage()
+
+
+@pytest.fixture(params=LOCAL_ENGINES)
+def engine(request, tmp_path, monkeypatch):
+    use_engine(request.param, tmp_path, monkeypatch)
+    storage_client.create_tables()
+    yield request.param
+    reset_storage()
+
+
+@pytest.fixture(params=ENGINES)
+def any_engine(request, tmp_path, monkeypatch):
+    use_engine(request.param, tmp_path, monkeypatch)
+    yield request.param
+    reset_storage()
@@ -0,0 +1,58 @@
+from datetime import date, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def client(engine):
+    from app import app
+    client = app.test_client()
+    assert client.post('/api/people/bulk', json=[{'id': 'ann', 'name': 'Ann'}, {'id': 'bob', 'name': 'Bob'}]).status_code == 201
+    return client
+
+
+def next_monday():
+    today = date.today()
+    return today + timedelta(days=7 - today.weekday())
+
+
+def book(client, person_id, hour):
+    day = next_monday().isoformat()
+    assert client.post('/api/bookings', json={
+        'personIds': [person_id], 'startTime': f'{day}T{hour:02d}:00:00', 'endTime': f'{day}T{hour + 1:02d}:00:00'
+    }).status_code == 201
+
+
+def computed_weeks(client, person_id):
+    week = next_monday().isoformat()
+    response = client.get(f'/api/analytics/utilization?personIds={person_id}&from={week}&to={week}')
+    assert response.status_code == 200
+    return response.get_json()['computedWeeks']
+
+
+def test_open_weeks_are_invalidated_per_person(client):
+    week = next_monday().isoformat()
+    assert computed_weeks(client, 'ann') == [week]
+    assert computed_weeks(client, 'ann') == []
+
+    book(client, 'bob', 9)
+    client.put('/api/people/ann', json={'name': 'Ann Smith', 'email': 'ann@example.com'})
+    assert computed_weeks(client, 'ann') == []
+
+    book(client, 'ann', 9)
+    assert computed_weeks(client, 'ann') == [week]
+    assert computed_weeks(client, 'ann') == []
+
+    client.put('/api/people/ann/availability', json={'availability': [{'day': 0, 'timeSlots': [{'start': '10:00', 'end': '12:00'}]}]})
+    assert computed_weeks(client, 'ann') == [week]
+    assert computed_weeks(client, 'bob') == [week]
+    assert computed_weeks(client, 'bob') == []
+
+
+def test_series_changes_invalidate_the_person(client):
+    week = next_monday().isoformat()
+    computed_weeks(client, 'ann')
+    assert client.post('/api/bookings', json={
+        'personIds': ['ann'], 'startTime': f'{week}T12:00:00', 'endTime': f'{week}T13:00:00', 'recurrence': 'FREQ=WEEKLY;COUNT=2'
+    }).status_code == 201
+    assert computed_weeks(client, 'ann') == [week]
@@ -0,0 +1,134 @@
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from functions.booking_store import INTERNAL_FIELDS
+
+
+@pytest.fixture
+def client(engine):
+    from app import app
+    client = app.test_client()
+    assert client.post('/api/people/bulk', json=[{'id': 'ann', 'name': 'Ann'}, {'id': 'bob', 'name': 'Bob'}]).status_code == 201
+    return client
+
+
+def next_monday():
+    today = date.today()
+    return today + timedelta(days=7 - today.weekday())
+
+
+def at(hour, day=None):
+    return f'{(day or next_monday()).isoformat()}T{hour:02d}:00:00'
+
+
+def assert_public(booking):
+    assert booking['startTime'] and not set(INTERNAL_FIELDS) & set(booking)
+
+
+def test_booking_responses_hide_epoch_columns(client):
+    created = client.post('/api/bookings', json={'personIds': ['ann'], 'startTime': at(9), 'endTime': at(10)}).get_json()
+    bulk = client.post('/api/bookings/bulk', json=[{'personIds': ['ann'], 'startTime': at(11), 'endTime': at(12)}]).get_json()
+    batch = client.post('/api/schedule/batch', json={'meetings': [
+        {'personIds': ['ann', 'bob'], 'from': next_monday().isoformat(), 'to': next_monday().isoformat()}
+    ]}).get_json()
+
+    assert_public(created)
+    assert_public(bulk['created'][0])
+    assert_public(batch['scheduled'][0]['booking'])
+    for query in ('', '?personIds=ann', '?limit=10'):
+        body = client.get(f'/api/bookings{query}').get_json()
+        for booking in body['items'] if 'items' in body else body:
+            assert_public(booking)
+    for line in client.get('/api/bookings?format=ndjson').get_data(as_text=True).splitlines():
+        assert_public(json.loads(line))
+    for entry in client.get('/api/changes?since=0').get_json()['changes']:
+        if entry['table'] == 'bookings':
+            assert_public(entry['item'])
+
+
+def test_series_index_errors_reject_bookings(client, monkeypatch):
+    from functions.async_storage import AsyncTableContainerWrapper
+    from functions.storage_client import SERIES_INDEX_TABLE, TableContainerWrapper
+
+    def failing(query_entities):
+        def query(self, *args, **kwargs):
+            if self.table_name == SERIES_INDEX_TABLE:
+                raise RuntimeError('series index unavailable')
+            return query_entities(self, *args, **kwargs)
+        return query
+
+    monkeypatch.setattr(TableContainerWrapper, '_query_entities', failing(TableContainerWrapper._query_entities))
+    monkeypatch.setattr(AsyncTableContainerWrapper, '_query_entities', failing(AsyncTableContainerWrapper._query_entities))
+
+    assert client.post('/api/bookings', json={'personIds': ['ann'], 'startTime': at(9), 'endTime': at(10)}).status_code == 500
+    assert client.post('/api/bookings/bulk', json=[{'personIds': ['ann'], 'startTime': at(9), 'endTime': at(10)}]).status_code == 500
+    monkeypatch.undo()
+    assert client.get('/api/bookings').get_json() == []
+
+
+@pytest.mark.parametrize('endpoint', ['bulk', 'batch'])
+def test_concurrent_series_rejects_bulk_and_batch_bookings(client, monkeypatch, endpoint):
+    import app as app_module
+    from functions.series_store import build_series, create_series
+    from functions.utils import parse_datetime
+
+    create_bookings = app_module.create_bookings
+
+    def create_then_race(bookings, claims):
+        create_bookings(bookings, claims)
+        create_series(build_series({'personIds': ['ann'], 'recurrence': 'FREQ=WEEKLY;COUNT=2'}, parse_datetime(at(0)), parse_datetime(at(23))))
+
+    monkeypatch.setattr(app_module, 'create_bookings', create_then_race)
+    if endpoint == 'bulk':
+        body = client.post('/api/bookings/bulk', json=[
+            {'personIds': ['ann'], 'startTime': at(9), 'endTime': at(10)},
+            {'personIds': ['bob'], 'startTime': at(9), 'endTime': at(10)}
+        ]).get_json()
+        assert body['errors'] == [{'index': 0, 'error': 'Conflict with existing booking'}]
+        assert [booking['personIds'] for booking in body['created']] == [['bob']]
+    else:
+        day = next_monday().isoformat()
+        body = client.post('/api/schedule/batch', json={'meetings': [
+            {'personIds': ['ann'], 'from': day, 'to': day}, {'personIds': ['bob'], 'from': day, 'to': day}
+        ]}).get_json()
+        assert body['unscheduled'] == [{'index': 0, 'error': 'Conflict with existing booking'}]
+        assert [item['booking']['personIds'] for item in body['scheduled']] == [['bob']]
+    assert [booking['personIds'] for booking in client.get('/api/bookings?personIds=ann,bob').get_json()
+            if not booking.get('seriesId')] == [['bob']]
+
+
+@pytest.mark.parametrize('fields', [{'priority': 'high'}, {'priority': 1.5}, {'durationMinutes': '60'}, {'step': 0}])
+def test_schedule_batch_rejects_invalid_meeting_numbers(client, fields):
+    day = next_monday().isoformat()
+    response = client.post('/api/schedule/batch', json={'meetings': [
+        {'personIds': ['ann'], 'from': day, 'to': day, 'priority': 1},
+        {'personIds': ['bob'], 'from': day, 'to': day, **fields}
+    ]})
+    assert response.status_code == 400
+    assert response.get_json()['error'].endswith('(meeting 1)')
+
+
+def test_schedule_batch_accepts_negative_priorities(client):
+    day = next_monday().isoformat()
+    response = client.post('/api/schedule/batch', json={'meetings': [
+        {'personIds': ['ann'], 'from': day, 'to': day, 'priority': -1}
+    ]})
+    assert response.status_code == 201
+
+
+@pytest.mark.parametrize('start, end', [(10, 9), (9, 9)])
+def test_reversed_or_empty_bookings_are_rejected(client, start, end):
+    single = client.post('/api/bookings', json={'personIds': ['ann'], 'startTime': at(start), 'endTime': at(end)})
+    recurring = client.post('/api/bookings', json={
+        'personIds': ['ann'], 'startTime': at(start), 'endTime': at(end), 'recurrence': 'FREQ=WEEKLY;COUNT=2'
+    })
+    bulk = client.post('/api/bookings/bulk', json=[
+        {'personIds': ['bob'], 'startTime': at(11), 'endTime': at(12)},
+        {'personIds': ['ann'], 'startTime': at(start), 'endTime': at(end)}
+    ])
+
+    assert single.status_code == recurring.status_code == bulk.status_code == 400
+    assert bulk.get_json()['error'] == 'endTime must be after startTime (item 1)'
+    assert client.get('/api/bookings').get_json() == []
@@ -0,0 +1,122 @@
+import itertools
+import random
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from functions.booking_store import (
+    booking_claim_keys, claim_entry_epochs, create_booking, delete_booking, list_bookings, new_booking_id, read_claims
+)
+from functions.storage_client import ConflictError, create_tables
+from functions.utils import slots_overlap
+
+THREADS = 16
+ATTEMPTS_PER_THREAD = 25
+NAMES = ['ann', 'bob', 'cid', 'dan']
+ORIGIN = datetime(2026, 10, 19, 8)
+
+
+@pytest.fixture
+def people(any_engine):
+    create_tables()
+    # Azure tables outlive the test run, so every run books its own people and cleans up after itself.
+    suffix = uuid.uuid4().hex[:8]
+    people = [f'{name}-{suffix}' for name in NAMES]
+    yield people
+    for booking in bookings_of(people):
+        delete_booking(booking['id'])
+
+
+def bookings_of(people):
+    return [booking for booking in list_bookings() if set(booking['personIds']) & set(people)]
+
+
+def random_booking(rng, people):
+    start = ORIGIN + timedelta(days=rng.randrange(2), minutes=15 * rng.randrange(32))
+    end = start + timedelta(minutes=rng.choice([15, 30, 60, 90]))
+    return {
+        'id': new_booking_id(start),
+        'personIds': rng.sample(people, rng.randint(1, 2)),
+        'startTime': start.isoformat(),
+        'endTime': end.isoformat()
+    }
+
+
+def race(worker, threads):
+    barrier = threading.Barrier(threads)
+    errors = []
+
+    def run(index):
+        barrier.wait()
+        try:
+            worker(index)
+        except Exception as e:
+            errors.append(e)
+
+    pool = [threading.Thread(target=run, args=(index,)) for index in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    assert errors == []
+
+
+def assert_no_double_bookings(bookings):
+    for first, second in itertools.combinations(bookings, 2):
+        if set(first['personIds']) & set(second['personIds']):
+            assert not slots_overlap(
+                first['startEpoch'], first['endEpoch'], second['startEpoch'], second['endEpoch']
+            ), f"{first['id']} overlaps {second['id']}"
+
+
+def test_concurrent_reservations_never_double_book(people):
+    created = []
+    conflicts = []
+
+    def worker(index):
+        rng = random.Random(index)
+        for _ in range(ATTEMPTS_PER_THREAD):
+            booking = random_booking(rng, people)
+            try:
+                created.append(create_booking(booking))
+            except ConflictError:
+                conflicts.append(booking)
+
+    race(worker, THREADS)
+
+    stored = bookings_of(people)
+    assert created and conflicts
+    assert sorted(booking['id'] for booking in stored) == sorted(booking['id'] for booking in created)
+    assert_no_double_bookings(stored)
+
+    claims = read_claims(list(dict.fromkeys(key for booking in stored for key in booking_claim_keys(booking))))
+    for key, (item, _) in claims.items():
+        entries = item['bookings']
+        expected = [booking['id'] for booking in stored if key in booking_claim_keys(booking)]
+        assert sorted(entry[0] for entry in entries) == sorted(expected)
+        for first, second in itertools.combinations(entries, 2):
+            assert not slots_overlap(*claim_entry_epochs(first), *claim_entry_epochs(second))
+
+
+def test_identical_requests_reserve_exactly_once(people):
+    start = ORIGIN + timedelta(hours=2)
+    results = []
+
+    def worker(index):
+        booking = {
+            'id': new_booking_id(start),
+            'personIds': [people[0], people[1 + index % 3]],
+            'startTime': start.isoformat(),
+            'endTime': (start + timedelta(minutes=30)).isoformat()
+        }
+        try:
+            results.append(create_booking(booking))
+        except ConflictError:
+            pass
+
+    race(worker, THREADS)
+
+    assert len(results) == 1
+    assert [booking['id'] for booking in bookings_of(people)] == [results[0]['id']]
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from functions.calendar_export import iter_ics
+
+STAMP = datetime(2026, 10, 17, 12, 30)
+
+
+def ics_lines(bookings=(), series_list=()):
+    return ''.join(iter_ics(bookings, series_list, 'Ann', STAMP)).split('\r\n')
+
+
+def test_booking_times_are_floating_local_times():
+    lines = ics_lines(bookings=[{
+        'id': 'b1', 'title': 'Planning', 'startTime': '2026-10-19T09:00:00', 'endTime': '2026-10-19T10:30:00'
+    }])
+
+    assert 'DTSTART:20261019T090000' in lines
+    assert 'DTEND:20261019T103000' in lines
+    assert 'DTSTAMP:20261017T123000Z' in lines
+
+
+def test_series_exceptions_use_the_same_floating_times():
+    lines = ics_lines(series_list=[{
+        'id': 's1', 'title': 'Standup', 'recurrence': 'FREQ=DAILY;COUNT=5',
+        'startTime': '2026-10-19T09:00:00', 'endTime': '2026-10-19T09:15:00',
+        'exdates': ['2026-10-20T09:00:00'],
+        'overrides': {'2026-10-21T09:00:00': ['2026-10-21T11:00:00', '2026-10-21T11:15:00']}
+    }])
+
+    assert 'DTSTART:20261019T090000' in lines
+    assert 'RRULE:FREQ=DAILY;COUNT=5' in lines
+    assert 'EXDATE:20261020T090000' in lines
+    assert 'RECURRENCE-ID:20261021T090000' in lines
+    assert 'DTSTART:20261021T110000' in lines
+
+
+def test_calendar_endpoint_exports_booked_wall_clock_time(engine):
+    from app import app
+    client = app.test_client()
+    client.post('/api/people', json={'id': 'ann', 'name': 'Ann'})
+    assert client.post('/api/bookings', json={
+        'personIds': ['ann'], 'startTime': '2026-10-19T09:00:00', 'endTime': '2026-10-19T10:00:00'
+    }).status_code == 201
+
+    body = client.get('/api/people/ann/calendar.ics?from=2026-10-19&to=2026-10-19').get_data(as_text=True)
+
+    assert 'DTSTART:20261019T090000\r\n' in body
+    assert 'DTEND:20261019T100000\r\n' in body
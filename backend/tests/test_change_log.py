@@ -0,0 +1,67 @@
+import random
+import threading
+
+from functions import change_log
+from functions.change_log import _read_head, append_changes, change, prune_changes, read_changes
+from functions.storage_client import get_changes_container
+
+WORKERS = 4
+APPENDS_PER_WORKER = 30
+
+
+def entry(worker, index):
+    return [change('bookings', 'upsert', f'{worker}-{index}', {'id': f'{worker}-{index}'})]
+
+
+def test_stale_worker_appends_above_pruned_head(engine):
+    stale = append_changes(entry('a', 0))
+    for index in range(5):
+        append_changes(entry('b', index))
+    head = _read_head(get_changes_container())
+    assert prune_changes(retention_days=0) == head - 1
+
+    change_log._last_sequence = stale
+    sequence = append_changes(entry('a', 1))
+
+    assert sequence == head + 1
+    assert [item['id'] for item in read_changes(head)] == ['a-1']
+
+
+def test_workers_with_own_sequence_never_write_below_head(engine):
+    container = get_changes_container()
+    worker_lock = threading.Lock()
+    stop = threading.Event()
+    written = []
+    errors = []
+
+    def writer(worker):
+        last = 0
+        rng = random.Random(worker)
+        for index in range(APPENDS_PER_WORKER):
+            with worker_lock:
+                change_log._last_sequence = last
+                head = _read_head(container)
+                sequence = append_changes(entry(worker, index))
+                last = change_log._last_sequence
+            if sequence is None or sequence <= head:
+                errors.append((worker, index, head, sequence))
+            written.append(sequence)
+            if rng.random() < 0.3:
+                stop.wait(0.001)
+
+    def pruner():
+        while not stop.is_set():
+            prune_changes(retention_days=0)
+
+    threads = [threading.Thread(target=writer, args=(worker,)) for worker in range(WORKERS)]
+    cleanup = threading.Thread(target=pruner)
+    cleanup.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stop.set()
+    cleanup.join()
+
+    assert not errors
+    assert sorted(written) == list(range(1, WORKERS * APPENDS_PER_WORKER + 1))
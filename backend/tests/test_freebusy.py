@@ -0,0 +1,72 @@
+import random
+from datetime import date
+
+import numpy as np
+
+from functions.availability import compile_availability
+from functions.freebusy import availability_matrix, free_matrix, group_slots, quorum_slots
+
+RESOLUTION = 5
+FIRST_DAY = date(2026, 10, 19)
+DAYS = 5
+
+
+def clock(minute):
+    return f'{minute // 60:02d}:{minute % 60:02d}'
+
+
+def random_availability(rng):
+    return compile_availability([
+        {'day': day, 'timeSlots': [{'start': clock(start), 'end': clock(start + rng.randrange(120, 540, 5))}]}
+        for day in range(7) for start in [rng.randrange(6 * 60, 11 * 60, 5)]
+    ])
+
+
+def random_busy(rng):
+    busy = []
+    for _ in range(rng.randint(0, 8)):
+        start = rng.randrange(DAYS * 24 * 60)
+        busy.append((start, start + rng.randint(5, 120)))
+    return busy
+
+
+def matrices(seed, people=4):
+    rng = random.Random(seed)
+    person_ids = [f'p{index}' for index in range(people)]
+    availabilities = {person_id: random_availability(rng) for person_id in person_ids}
+    available = availability_matrix(person_ids, availabilities, FIRST_DAY, DAYS, RESOLUTION)
+    free = free_matrix(available, person_ids, {person_id: random_busy(rng) for person_id in person_ids}, RESOLUTION)
+    return available, free
+
+
+def test_full_quorum_offers_the_same_starts_as_group_slots():
+    for seed in range(200):
+        available, free = matrices(seed)
+        expected = sorted((day, start) for day, start, _ in group_slots(available, free, 6, 3))
+
+        found = quorum_slots(available, free, available.shape[0], 6, 3, limit=None)
+
+        assert sorted((day, start) for day, start, _, _ in found) == expected
+
+
+def test_quorum_starts_are_anchored_at_availability_start():
+    availabilities = {
+        'ann': compile_availability([{'day': 0, 'timeSlots': [{'start': '08:05', 'end': '10:00'}]}]),
+        'bob': compile_availability([{'day': 0, 'timeSlots': [{'start': '08:05', 'end': '10:00'}]}])
+    }
+    available = availability_matrix(['ann', 'bob'], availabilities, FIRST_DAY, 1, RESOLUTION)
+
+    found = quorum_slots(available, available, 1, 6, 3, limit=None)
+
+    assert sorted(start * RESOLUTION for _, start, _, _ in found) == [485 + 15 * index for index in range(6)]
+    assert all(free_rows == [0, 1] for _, _, _, free_rows in found)
+
+
+def test_partial_quorum_counts_free_people():
+    for seed in range(50):
+        available, free = matrices(seed, people=5)
+
+        for day, start, end, free_rows in quorum_slots(available, free, 3, 6, 3, limit=None):
+            assert len(free_rows) >= 3
+            assert free[free_rows, day, start:end].all()
+            assert np.count_nonzero(available[:, day, start]) >= 3
@@ -0,0 +1,34 @@
+import os
+import runpy
+
+import pytest
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'gunicorn.conf.py')
+
+
+def load_config(monkeypatch, **env):
+    environ = {key: value for key, value in os.environ.items() if not key.startswith(('GUNICORN_', 'CHANGES_STREAM'))}
+    environ.update(WEB_CONCURRENCY='1', **env)
+    monkeypatch.setattr(os, 'environ', environ)
+    return runpy.run_path(CONFIG_PATH), environ
+
+
+def test_timeout_defaults_to_thirty_seconds(monkeypatch):
+    config, _ = load_config(monkeypatch)
+    assert config['timeout'] == 30
+    assert load_config(monkeypatch, GUNICORN_TIMEOUT='600')[0]['timeout'] == 600
+
+
+@pytest.mark.parametrize('worker_class, enabled', [('gthread', '1'), ('gevent', '1'), ('sync', '0')])
+def test_change_stream_needs_a_streaming_worker(monkeypatch, worker_class, enabled):
+    _, environ = load_config(monkeypatch, GUNICORN_WORKER_CLASS=worker_class)
+    assert environ['CHANGES_STREAM_ENABLED'] == enabled
+    _, environ = load_config(monkeypatch, GUNICORN_WORKER_CLASS=worker_class, CHANGES_STREAM_ENABLED='1')
+    assert environ['CHANGES_STREAM_ENABLED'] == '1'
+
+
+def test_disabled_change_stream_returns_503(engine, monkeypatch):
+    import app as app_module
+    monkeypatch.setattr(app_module, 'CHANGES_STREAM_ENABLED', False)
+    response = app_module.app.test_client().get('/api/changes/stream?since=0')
+    assert response.status_code == 503
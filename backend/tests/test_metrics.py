@@ -0,0 +1,52 @@
+import json
+import time
+
+from functions import metrics, storage_client
+from functions.storage_client import get_people_container
+
+
+def test_render_merges_worker_snapshots(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, 'METRICS_MULTIPROC_DIR', str(tmp_path))
+    histogram = metrics.Histogram('test_seconds', 'Test histogram.', (0.1, 1.0))
+    histogram.observe(0.05, route='/x')
+    worker = {'histograms': {'test_seconds': histogram.snapshot()}, 'gauges': {}}
+    for pid in ('101', '102'):
+        (tmp_path / f'{pid}.json').write_text(json.dumps(worker))
+
+    rendered = histogram.render([snapshot['histograms']['test_seconds'] for snapshot in metrics.read_metrics_snapshots().values()])
+
+    assert 'test_seconds_bucket{route="/x",le="0.1"} 2' in rendered
+    assert 'test_seconds_count{route="/x"} 2' in rendered
+
+
+def test_gauges_are_labelled_by_worker(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, 'METRICS_MULTIPROC_DIR', str(tmp_path))
+    metrics.reset_metrics()
+    metrics.STARTUP_SECONDS.set(0.25, phase='warmup')
+    metrics.write_metrics_snapshot()
+    (tmp_path / '1.json').write_text(json.dumps({'histograms': {}, 'gauges': {'process_startup_seconds': [[[['phase', 'master']], 0.5]]}}))
+
+    rendered = metrics.render_metrics()
+
+    assert 'process_startup_seconds{phase="master",worker="1"} 0.5' in rendered
+    assert 'process_startup_seconds{phase="warmup",worker=' in rendered
+    metrics.reset_metrics()
+
+
+def test_storage_span_excludes_decoding(engine, monkeypatch):
+    get_people_container().upsert_many([{'id': f'p{index}', 'name': 'Ann'} for index in range(5)])
+    decode = storage_client._entity_to_item
+
+    def slow_decode(entity, table_name=None):
+        time.sleep(0.01)
+        return decode(entity, table_name)
+
+    monkeypatch.setattr(storage_client, '_entity_to_item', slow_decode)
+    request_metrics, token = metrics.start_request_metrics()
+    try:
+        assert len(get_people_container().query_items()) == 5
+    finally:
+        metrics.finish_request_metrics(token)
+
+    assert request_metrics.phases['deserialize'] >= 0.05
+    assert request_metrics.phases['storage'] < 0.05
@@ -0,0 +1,33 @@
+import threading
+import time
+
+from functions import people_cache
+from functions.people_cache import PeopleCache, get_people_cache
+
+THREADS = 8
+
+
+def test_concurrent_first_calls_share_one_cache(engine, monkeypatch):
+    init = PeopleCache.__init__
+
+    def slow_init(self, *args, **kwargs):
+        time.sleep(0.01)
+        init(self, *args, **kwargs)
+
+    monkeypatch.setattr(PeopleCache, '__init__', slow_init)
+    people_cache._people_cache = None
+    barrier = threading.Barrier(THREADS)
+    found = []
+
+    def run():
+        barrier.wait()
+        found.append(get_people_cache())
+
+    threads = [threading.Thread(target=run) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(found) == THREADS
+    assert len({id(cache) for cache in found}) == 1
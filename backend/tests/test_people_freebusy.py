@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+
+import pytest
+
+from functions.freebusy_store import is_stale
+from functions.people_cache import get_people_cache
+from functions.series_store import find_series_for_people
+from functions.storage_client import get_freebusy_container
+
+
+@pytest.fixture
+def client(engine):
+    from app import app
+    return app.test_client()
+
+
+def next_monday():
+    today = date.today()
+    return today + timedelta(days=7 - today.weekday())
+
+
+def ann(start, end):
+    return {'id': 'ann', 'name': 'Ann', 'availability': [{'day': 0, 'timeSlots': [{'start': start, 'end': end}]}]}
+
+
+def find_slots(client):
+    response = client.post('/api/slots/find', json={'personIds': ['ann'], 'date': next_monday().isoformat(), 'durationMinutes': 60})
+    assert response.status_code == 200
+    return [slot['startTime'][11:16] for slot in response.get_json()]
+
+
+def assert_rows_current(person_id):
+    day = next_monday().isoformat()
+    row = get_freebusy_container().read_item(item=person_id, partition_key=day)
+    compiled = get_people_cache().get_availability_many([person_id], revalidate=True)[person_id]
+    assert not is_stale(row, compiled, find_series_for_people([person_id]).get(person_id, []), check_claim=False)
+
+
+@pytest.mark.parametrize('reimport', [
+    lambda client, person: client.post('/api/people/bulk', json=[person]),
+    lambda client, person: client.post('/api/people', json=person)
+])
+def test_reimporting_availability_refreshes_free_busy(client, reimport):
+    assert client.post('/api/people/bulk', json=[ann('08:00', '16:00')]).status_code == 201
+    assert len(find_slots(client)) == 29
+
+    assert reimport(client, ann('12:00', '13:00')).status_code == 201
+
+    assert find_slots(client) == ['12:00']
+    assert get_people_cache().get('ann', revalidate=True)['availabilityVersion'] == 2
+    assert_rows_current('ann')
+    response = client.post('/api/bookings', json={
+        'personIds': ['ann'], 'startTime': f'{next_monday().isoformat()}T12:00:00', 'endTime': f'{next_monday().isoformat()}T13:00:00'
+    })
+    assert response.status_code == 201
+
+
+def test_deleting_a_person_drops_free_busy_rows(client):
+    client.post('/api/people/bulk', json=[ann('08:00', '16:00')])
+    find_slots(client)
+
+    assert client.delete('/api/people/ann').status_code == 200
+
+    assert get_freebusy_container().query_items(where=[('RowKey', 'eq', 'ann')]) == []
@@ -0,0 +1,151 @@
+import random
+from datetime import datetime, time, timedelta
+
+import pytest
+
+from functions.availability import compile_availability, day_start, minute_to_datetime
+from functions.freebusy_store import free_intervals
+from functions.slot_engine import anchored_slots, common_anchored_intervals, find_common_slots
+from functions.utils import slots_overlap, to_epoch
+
+STEP = 15
+DAY = datetime(2026, 10, 19)
+
+
+def legacy_time_slots(schedule, day_of_week, target_date):
+    slots = []
+    for day_availability in schedule:
+        if day_availability.get('day') == day_of_week:
+            for time_range in day_availability.get('timeSlots', []):
+                start_hours, start_minutes = map(int, time_range['start'].split(':'))
+                end_hours, end_minutes = map(int, time_range['end'].split(':'))
+                slots.append({
+                    'start': datetime.combine(target_date.date(), time(start_hours, start_minutes)),
+                    'end': datetime.combine(target_date.date(), time(end_hours, end_minutes))
+                })
+            break
+    return slots
+
+
+def legacy_find_slots(schedules, bookings, target_date, duration_minutes):
+    all_person_slots = []
+    for schedule in schedules:
+        person_slots = legacy_time_slots(schedule, target_date.weekday(), target_date)
+        if not person_slots:
+            return []
+        all_person_slots.append(person_slots)
+
+    common_time_ranges = []
+    for slot in all_person_slots[0]:
+        current_ranges = [(slot['start'], slot['end'])]
+        for other_person_slots in all_person_slots[1:]:
+            new_ranges = []
+            for range_start, range_end in current_ranges:
+                for other_slot in other_person_slots:
+                    if slots_overlap(range_start, range_end, other_slot['start'], other_slot['end']):
+                        intersection_start = max(range_start, other_slot['start'])
+                        intersection_end = min(range_end, other_slot['end'])
+                        if intersection_start < intersection_end:
+                            new_ranges.append((intersection_start, intersection_end))
+            if not new_ranges:
+                current_ranges = []
+                break
+            current_ranges = new_ranges
+        common_time_ranges.extend(current_ranges)
+
+    common_slots = []
+    for range_start, range_end in common_time_ranges:
+        current = range_start
+        while current + timedelta(minutes=duration_minutes) <= range_end:
+            slot_end = current + timedelta(minutes=duration_minutes)
+            if not any(slots_overlap(current, slot_end, booking_start, booking_end) for booking_start, booking_end in bookings):
+                common_slots.append((current.isoformat(), slot_end.isoformat()))
+            current += timedelta(minutes=STEP)
+    return common_slots
+
+
+def clock(minute):
+    return f'{minute // 60:02d}:{minute % 60:02d}'
+
+
+def random_schedule(rng):
+    schedule = []
+    for day_of_week in range(7):
+        if rng.random() < 0.03:
+            continue
+        time_slots = []
+        start = rng.randrange(6 * 60, 10 * 60, 5)
+        for _ in range(rng.randint(1, 3)):
+            end = min(start + rng.randrange(60, 8 * 60, 5), 23 * 60)
+            time_slots.append({'start': clock(start), 'end': clock(end)})
+            start = end + rng.randrange(5, 120, 5)
+            if start >= 23 * 60:
+                break
+        schedule.append({'day': day_of_week, 'timeSlots': time_slots})
+    return schedule
+
+
+def random_bookings(rng, target_date, count):
+    origin = day_start(target_date)
+    bookings = []
+    for _ in range(count):
+        start = rng.randrange(-120, 24 * 60)
+        end = start + rng.randint(1, 180)
+        bookings.append((minute_to_datetime(origin, start), minute_to_datetime(origin, end)))
+    return bookings
+
+
+def to_isoformat(origin, slots):
+    return [
+        (minute_to_datetime(origin, slot_start).isoformat(), minute_to_datetime(origin, slot_end).isoformat())
+        for slot_start, slot_end in slots
+    ]
+
+
+def random_case(seed):
+    rng = random.Random(seed)
+    target_date = DAY + timedelta(days=rng.randrange(7))
+    schedules = [random_schedule(rng) for _ in range(rng.choice((1, 2, 3, 5, 8, 12)))]
+    bookings = random_bookings(rng, target_date, rng.randint(0, 15))
+    duration = rng.choice([15, 30, 45, 60, 90, 120])
+    return target_date, schedules, bookings, duration
+
+
+@pytest.mark.parametrize('seed', range(500))
+def test_find_common_slots_matches_nested_loop(seed):
+    target_date, schedules, bookings, duration = random_case(seed)
+    origin = day_start(target_date)
+    intervals_per_person = [compile_availability(schedule).intervals(target_date.weekday()) for schedule in schedules]
+    busy = [
+        ((booking_start - origin) // timedelta(minutes=1), (booking_end - origin) // timedelta(minutes=1))
+        for booking_start, booking_end in bookings
+    ]
+
+    found = to_isoformat(origin, find_common_slots(intervals_per_person, busy, duration, STEP))
+
+    assert found == legacy_find_slots(schedules, bookings, target_date, duration)
+
+
+@pytest.mark.parametrize('seed', range(500))
+def test_anchored_free_intervals_match_nested_loop(seed):
+    target_date, schedules, bookings, duration = random_case(seed)
+    origin = day_start(target_date)
+    claim = {'bookings': [
+        ['booking', booking_start.isoformat(), booking_end.isoformat(), to_epoch(booking_start), to_epoch(booking_end)]
+        for booking_start, booking_end in bookings
+    ]}
+    free_per_person = [free_intervals(compile_availability(schedule), target_date.date(), claim) for schedule in schedules]
+
+    found = to_isoformat(origin, anchored_slots(common_anchored_intervals(free_per_person), duration, STEP))
+
+    assert found == legacy_find_slots(schedules, bookings, target_date, duration)
+
+
+def test_person_without_availability_has_no_slots():
+    schedules = [random_schedule(random.Random(1)), [{'day': 6, 'timeSlots': [{'start': '08:00', 'end': '16:00'}]}]]
+    target_date = DAY
+
+    intervals_per_person = [compile_availability(schedule).intervals(target_date.weekday()) for schedule in schedules]
+
+    assert find_common_slots(intervals_per_person, [], 30, STEP) == []
+    assert legacy_find_slots(schedules, [], target_date, 30) == []
@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def client(engine):
+    from app import app
+    client = app.test_client()
+    assert client.post('/api/people/bulk', json=[{'id': 'ann', 'name': 'Ann'}, {'id': 'bob', 'name': 'Bob'}]).status_code == 201
+    return client
+
+
+def next_monday():
+    today = date.today()
+    return today + timedelta(days=7 - today.weekday())
+
+
+def search(client, endpoint, **fields):
+    day = next_monday().isoformat()
+    return client.post(f'/api/slots/{endpoint}', json={'personIds': ['ann', 'bob'], 'from': day, 'to': day, **fields})
+
+
+@pytest.mark.parametrize('endpoint', ['search', 'quorum'])
+@pytest.mark.parametrize('fields', [
+    {'durationMinutes': -5}, {'durationMinutes': 0}, {'durationMinutes': '30'}, {'durationMinutes': 30.5},
+    {'step': '15'}, {'step': 0}, {'step': True}, {'limit': 0}, {'limit': 'all'}
+])
+def test_slot_search_rejects_invalid_numbers(client, endpoint, fields):
+    response = search(client, endpoint, **fields)
+    assert response.status_code == 400
+    assert 'positive integers' in response.get_json()['error']
+
+
+def test_quorum_rejects_invalid_min_attendees(client):
+    assert search(client, 'quorum', minAttendees='1').status_code == 400
+    assert search(client, 'quorum', minAttendees=3).status_code == 400
+
+
+@pytest.mark.parametrize('endpoint', ['search', 'quorum'])
+def test_slot_search_returns_positive_length_slots(client, endpoint):
+    response = search(client, endpoint, durationMinutes=30, step=15, limit=5)
+    assert response.status_code == 200
+    body = response.get_json()
+    slots = body['slots'] if isinstance(body, dict) else body
+    assert slots and all(slot['startTime'] < slot['endTime'] for slot in slots)
+
+
+def test_quorum_fails_when_the_booking_index_is_unreadable(client, monkeypatch):
+    from functions.async_storage import AsyncTableContainerWrapper
+    from functions.storage_client import BOOKING_INDEX_TABLE
+
+    query_entities = AsyncTableContainerWrapper._query_entities
+
+    async def failing(self, *args, **kwargs):
+        if self.table_name == BOOKING_INDEX_TABLE:
+            raise RuntimeError('booking index unavailable')
+        return await query_entities(self, *args, **kwargs)
+
+    monkeypatch.setattr(AsyncTableContainerWrapper, '_query_entities', failing)
+    assert search(client, 'quorum').status_code == 500
@@ -0,0 +1,43 @@
+from functions.change_log import CHANGES_PARTITION
+from functions.sqlite_storage import DROPPED_INDEX_FIELDS, SqliteTableService, _where_clause
+from functions.storage_client import BOOKINGS_TABLE, CHANGES_TABLE
+
+
+def table_indexes(service):
+    return {
+        name for name, in service.connection().execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")
+    }
+
+
+def test_only_filtered_fields_are_indexed(tmp_path):
+    service = SqliteTableService(str(tmp_path / 'store.db'))
+    service.create_table_if_not_exists(BOOKINGS_TABLE)
+    service.create_table_if_not_exists(CHANGES_TABLE)
+
+    assert table_indexes(service) == {f't_{CHANGES_TABLE}_at'}
+
+
+def test_prune_query_uses_the_index(tmp_path):
+    service = SqliteTableService(str(tmp_path / 'store.db'))
+    client = service.create_table_if_not_exists(CHANGES_TABLE)
+    where, parameters = _where_clause([[('PartitionKey', 'eq', CHANGES_PARTITION), ('at', 'lt', '2026-01-01')]], None)
+
+    plan = ' '.join(
+        str(row[-1]) for row in service.connection().execute(f'EXPLAIN QUERY PLAN SELECT RowKey FROM {client.sql_table}{where}', parameters)
+    )
+
+    assert f't_{CHANGES_TABLE}_at' in plan
+
+
+def test_unused_indexes_are_dropped_from_existing_files(tmp_path):
+    path = str(tmp_path / 'store.db')
+    service = SqliteTableService(path)
+    client = service.create_table_if_not_exists(BOOKINGS_TABLE)
+    for field in DROPPED_INDEX_FIELDS:
+        service.connection().execute(
+            f'CREATE INDEX "t_{BOOKINGS_TABLE}_{field}" ON {client.sql_table} (json_extract(properties, \'$.{field}\'))'
+        )
+
+    SqliteTableService(path).create_table_if_not_exists(BOOKINGS_TABLE)
+
+    assert table_indexes(service) == set()
@@ -0,0 +1,227 @@
+import uuid
+
+import pytest
+
+from functions.storage_client import (
+    ANALYTICS_TABLE, BOOKINGS_TABLE, MAX_BATCH_SIZE, ConflictError, TableContainerWrapper, get_table_service
+)
+
+
+@pytest.fixture
+def make_container(any_engine):
+    table_service = get_table_service()
+    created = []
+
+    def make(schema_table=None):
+        table_name = f"conformance{uuid.uuid4().hex[:12]}"
+        container = TableContainerWrapper(table_service.create_table_if_not_exists(table_name=table_name))
+        created.append(table_name)
+        if schema_table is not None:
+            container.table_name = schema_table
+        return container
+
+    yield make
+    if any_engine == 'azure':
+        for table_name in created:
+            table_service.delete_table(table_name)
+
+
+@pytest.fixture
+def container(make_container):
+    return make_container()
+
+
+def rows(container, partition_key, count):
+    container.upsert_many(
+        [{'id': f'{index:03d}', 'n': index, 'even': index % 2 == 0} for index in range(count)],
+        keys=[(partition_key, f'{index:03d}') for index in range(count)]
+    )
+
+
+def test_create_read_and_missing_items(container):
+    container.create_item(body={'id': 'a', 'name': 'Ann', 'tags': ['x', 'y'], 'meta': {'k': 1}})
+
+    assert container.read_item(item='a', partition_key='a') == {'id': 'a', 'name': 'Ann', 'tags': ['x', 'y'], 'meta': {'k': 1}}
+    with pytest.raises(Exception, match='Item not found'):
+        container.read_item(item='missing', partition_key='missing')
+    with pytest.raises(Exception, match='Item not found'):
+        container.read_etag(item='missing', partition_key='missing')
+
+
+def test_create_conflicts_unless_overwriting(container):
+    container.create_item(body={'id': 'a', 'name': 'Ann'})
+
+    with pytest.raises(ConflictError):
+        container.create_item(body={'id': 'a', 'name': 'Other'}, overwrite=False)
+    assert container.read_item(item='a', partition_key='a')['name'] == 'Ann'
+
+    container.create_item(body={'id': 'a', 'name': 'Anna'})
+    assert container.read_item(item='a', partition_key='a')['name'] == 'Anna'
+
+
+def test_etag_changes_on_every_write(container):
+    container.create_item(body={'id': 'a', 'name': 'Ann'})
+    item, etag = container.read_item_with_etag(item='a', partition_key='a')
+
+    assert container.read_etag(item='a', partition_key='a') == etag
+    container.replace_item(item='a', body={**item, 'name': 'Anna'})
+    assert container.read_etag(item='a', partition_key='a') != etag
+
+
+def test_delete_item_is_idempotent(container):
+    container.create_item(body={'id': 'a', 'name': 'Ann'})
+
+    container.delete_item(item='a', partition_key='a')
+    container.delete_item(item='a', partition_key='a')
+
+    with pytest.raises(Exception, match='Item not found'):
+        container.read_item(item='a', partition_key='a')
+
+
+def test_upsert_many_replaces_whole_entities(container):
+    container.upsert_many([{'id': 'a', 'name': 'Ann', 'email': 'ann@example.com'}])
+    container.upsert_many([{'id': 'a', 'name': 'Anna'}])
+
+    assert container.read_item(item='a', partition_key='a') == {'id': 'a', 'name': 'Anna'}
+
+
+def test_upsert_and_delete_many_span_partitions_and_batches(container):
+    count = MAX_BATCH_SIZE + 20
+    rows(container, 'p1', count)
+    rows(container, 'p2', 3)
+
+    assert len(container.query_items(where=[('PartitionKey', 'eq', 'p1')])) == count
+    container.delete_many([('p1', f'{index:03d}') for index in range(count)] + [('p2', '000')])
+    assert [(item['id'], item['n']) for item in container.query_items()] == [('001', 1), ('002', 2)]
+
+
+def test_transact_creates_atomically(container):
+    container.create_item(body={'id': 'b', 'n': 0}, partition_key='p', row_key='b')
+
+    with pytest.raises(ConflictError):
+        container.transact([
+            ('create', 'p', 'a', {'id': 'a', 'n': 1}, None),
+            ('create', 'p', 'b', {'id': 'b', 'n': 1}, None)
+        ])
+    assert [item['id'] for item in container.query_items()] == ['b']
+
+
+def test_transact_honours_etags(container):
+    container.transact([('create', 'p', 'a', {'id': 'a', 'n': 1}, None)])
+    _, etag = container.read_item_with_etag(item='a', partition_key='p')
+
+    container.transact([('update', 'p', 'a', {'id': 'a', 'n': 2}, etag)])
+    with pytest.raises(ConflictError):
+        container.transact([('update', 'p', 'a', {'id': 'a', 'n': 3}, etag)])
+    with pytest.raises(ConflictError):
+        container.transact([('delete', 'p', 'a', None, etag)])
+    assert container.read_item(item='a', partition_key='p')['n'] == 2
+
+    _, etag = container.read_item_with_etag(item='a', partition_key='p')
+    container.transact([('delete', 'p', 'a', None, etag)])
+    assert container.query_items() == []
+
+
+def test_transact_update_of_missing_row_conflicts(container):
+    with pytest.raises(ConflictError):
+        container.transact([('update', 'p', 'missing', {'id': 'missing'}, None)])
+
+
+def test_transact_upsert_replaces(container):
+    container.transact([('create', 'p', 'a', {'id': 'a', 'n': 1, 'extra': True}, None)])
+    container.transact([('upsert', 'p', 'a', {'id': 'a', 'n': 2}, None)])
+
+    assert container.read_item(item='a', partition_key='p') == {'id': 'a', 'n': 2}
+
+
+def test_transact_rejects_mixed_partitions(container):
+    with pytest.raises(Exception):
+        container.transact([
+            ('create', 'p1', 'a', {'id': 'a'}, None),
+            ('create', 'p2', 'b', {'id': 'b'}, None)
+        ])
+    assert container.query_items() == []
+
+
+def test_queries_filter_and_sort_by_key(container):
+    rows(container, 'p2', 5)
+    rows(container, 'p1', 5)
+
+    assert [(item['id'], item['n']) for item in container.query_items(where=[('PartitionKey', 'eq', 'p1')])] == [
+        (f'{index:03d}', index) for index in range(5)
+    ]
+    found = container.query_items(where=[('PartitionKey', 'eq', 'p2'), ('RowKey', 'ge', '001'), ('RowKey', 'lt', '004')])
+    assert [item['id'] for item in found] == ['001', '002', '003']
+    found = container.query_items(any_of=[
+        [('PartitionKey', 'eq', 'p1'), ('n', 'gt', 3)],
+        [('PartitionKey', 'eq', 'p2'), ('even', 'eq', True), ('n', 'ne', 0)]
+    ])
+    assert [(item['id'], item['n']) for item in found] == [('004', 4), ('002', 2), ('004', 4)]
+    assert container.query_items(where=[('missing', 'eq', 'x')]) == []
+
+
+def test_query_page_walks_continuation_tokens(container):
+    rows(container, 'p', 25)
+    where = [('PartitionKey', 'eq', 'p')]
+
+    seen = []
+    items, token = container.query_page(where=where, limit=10)
+    seen.extend(items)
+    pages = 1
+    while token:
+        assert isinstance(token, str)
+        items, token = container.query_page(where=where, limit=10, continuation_token=token)
+        seen.extend(items)
+        pages += 1
+
+    assert pages == 3
+    assert [item['n'] for item in seen] == list(range(25))
+
+
+def test_query_page_rejects_invalid_tokens(container):
+    with pytest.raises(ValueError):
+        container.query_page(limit=10, continuation_token='not a token')
+
+
+def test_iter_items_streams_every_page(container):
+    rows(container, 'p', 23)
+
+    assert [item['n'] for item in container.iter_items(where=[('PartitionKey', 'eq', 'p')], page_size=5)] == list(range(23))
+    assert len(list(container.iter_items(page_size=1000))) == 23
+
+
+def test_select_projects_fields(container):
+    rows(container, 'p', 3)
+
+    items = container.query_items(where=[('PartitionKey', 'eq', 'p')])
+    assert set(items[0]) == {'id', 'n', 'even'}
+    items, _ = container.query_page(where=[('PartitionKey', 'eq', 'p')], limit=10, select=['n'])
+    assert items == [{'id': f'{index:03d}', 'n': index} for index in range(3)]
+    assert list(container.iter_items(select=['even'], page_size=2))[1] == {'id': '001', 'even': False}
+
+
+def test_read_many_skips_missing_keys(container):
+    rows(container, 'p', 20)
+
+    found = container.read_many([('p', '019'), ('p', 'missing'), ('p', '003'), ('q', '003')] + [('p', f'{index:03d}') for index in range(20)])
+    assert [item['n'] for item in found] == [19, 3] + [index for index in range(20) if index not in (3, 19)]
+    with_etags = container.read_many_with_etags([('p', '001'), ('p', 'missing')])
+    assert list(with_etags) == [('p', '001')]
+    item, etag = with_etags[('p', '001')]
+    assert item['n'] == 1 and etag == container.read_etag(item='001', partition_key='p')
+
+
+def test_schema_columns_round_trip(make_container):
+    analytics = make_container(ANALYTICS_TABLE)
+    body = {'id': '2026-10-19', 'hourly': list(range(168)), 'free': bytes(range(256)) * 4, 'final': True, 'tag': 'x'}
+    analytics.upsert_many([body], keys=[('ann', body['id'])])
+    assert analytics.read_item(item=body['id'], partition_key='ann') == body
+
+    bookings = make_container(BOOKINGS_TABLE)
+    person_ids = [f'person-{index}' for index in range(40)]
+    bookings.create_item(body={'id': 'b1', 'personIds': person_ids[:3]})
+    bookings.create_item(body={'id': 'b2', 'personIds': person_ids})
+    assert bookings.read_item(item='b1', partition_key='b1')['personIds'] == person_ids[:3]
+    assert bookings.read_item(item='b2', partition_key='b2')['personIds'] == person_ids
+    items, _ = bookings.query_page(limit=10, select=['personIds'])
+    assert [item['personIds'] for item in items] == [person_ids[:3], person_ids]
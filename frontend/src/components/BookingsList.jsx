@@ -1,5 +1,5 @@
-import { useState, useEffect } from 'react';
-import { peopleAPI, bookingsAPI } from '../services/api';
+import { useState, useEffect, useRef } from 'react';
+import { peopleAPI, bookingsAPI, applyChange, watchChanges } from '../services/api';
 
 const BookingsList = () => {
   const [bookings, setBookings] = useState([]);
@@ -7,11 +7,22 @@ const BookingsList = () => {
   const [selectedPersonIds, setSelectedPersonIds] = useState([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
+  const selectedRef = useRef(selectedPersonIds);
+  selectedRef.current = selectedPersonIds;
 
-  useEffect(() => {
-    loadPeople();
-    loadBookings();
-  }, []);
+  useEffect(() => watchChanges(['people', 'bookings', 'bookingseries'], () => Promise.all([loadPeople(), loadBookings()]), (change) => {
+    if (change.table === 'people') {
+      setPeople((prev) => applyChange(prev, change));
+    } else if (change.table === 'bookingseries') {
+      loadBookings();
+    } else {
+      const selected = selectedRef.current;
+      if (change.op === 'upsert' && selected.length > 0 && !change.item.personIds.some((id) => selected.includes(id))) {
+        return;
+      }
+      setBookings((prev) => applyChange(prev, change).sort((a, b) => a.startTime.localeCompare(b.startTime)));
+    }
+  }), []);
 
   useEffect(() => {
     loadBookings();
@@ -31,9 +42,8 @@ const BookingsList = () => {
     try {
       setLoading(true);
       setError(null);
-      const response = await bookingsAPI.getAll(
-        selectedPersonIds.length > 0 ? selectedPersonIds : null
-      );
+      const selected = selectedRef.current;
+      const response = await bookingsAPI.getAll(selected.length > 0 ? selected : null);
       setBookings(response.data);
     } catch (err) {
       console.error('Error loading bookings:', err);
@@ -60,7 +70,7 @@ const BookingsList = () => {
 
     try {
       await bookingsAPI.delete(bookingId);
-      loadBookings();
+      setBookings((prev) => applyChange(prev, { op: 'delete', id: bookingId }));
     } catch (err) {
       console.error('Error deleting booking:', err);
       setError('Błąd podczas usuwania rezerwacji: ' + (err.response?.data?.error || err.message));
@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { peopleAPI } from '../services/api';
+import { peopleAPI, applyChange, watchChanges } from '../services/api';
 
 const PersonManager = () => {
   const [people, setPeople] = useState([]);
@@ -11,9 +11,9 @@ const PersonManager = () => {
     email: '',
   });
 
-  useEffect(() => {
-    loadPeople();
-  }, []);
+  useEffect(() => watchChanges(['people'], loadPeople, (change) => {
+    setPeople((prev) => applyChange(prev, change));
+  }), []);
 
   const loadPeople = async () => {
     console.log('PersonManager: Starting to load people...');
@@ -42,18 +42,19 @@ const PersonManager = () => {
     console.log(`PersonManager: ${editingId ? 'Updating' : 'Creating'} person:`, formData);
     try {
       setLoading(true);
+      let response;
       if (editingId) {
         console.log(`PersonManager: Updating person ID: ${editingId}`);
-        await peopleAPI.update(editingId, formData);
+        response = await peopleAPI.update(editingId, formData);
         console.log(`PersonManager: Person ${editingId} updated`);
       } else {
         console.log('PersonManager: Creating new person');
-        await peopleAPI.create(formData);
+        response = await peopleAPI.create(formData);
         console.log('PersonManager: New person created');
       }
+      setPeople((prev) => applyChange(prev, { op: 'upsert', id: response.data.id, item: response.data }));
       setFormData({ name: '', email: '' });
       setEditingId(null);
-      await loadPeople();
       setError(null);
     } catch (err) {
       console.error('PersonManager: Error saving:', err);
@@ -81,7 +82,7 @@ const PersonManager = () => {
       setLoading(true);
       await peopleAPI.delete(id);
       console.log(`PersonManager: Person ${id} deleted`);
-      await loadPeople();
+      setPeople((prev) => applyChange(prev, { op: 'delete', id }));
       setError(null);
     } catch (err) {
       console.error('PersonManager: Error deleting:', err);
@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { peopleAPI, slotsAPI } from '../services/api';
+import { peopleAPI, slotsAPI, applyChange, watchChanges } from '../services/api';
 
 const SlotFinder = ({ onSlotSelect }) => {
   const [people, setPeople] = useState([]);
@@ -11,9 +11,14 @@ const SlotFinder = ({ onSlotSelect }) => {
   const [error, setError] = useState(null);
 
   useEffect(() => {
-    loadPeople();
     const today = new Date().toISOString().split('T')[0];
     setDate(today);
+    return watchChanges(['people'], loadPeople, (change) => {
+      setPeople((prev) => applyChange(prev, change));
+      if (change.op === 'delete') {
+        setSelectedPersonIds((prev) => prev.filter((id) => id !== change.id));
+      }
+    });
   }, []);
 
   const loadPeople = async () => {
@@ -54,8 +54,25 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+const pageParams = ({ limit, continuationToken, select } = {}) => ({
+  limit,
+  continuationToken: continuationToken || undefined,
+  select: select ? select.join(',') : undefined,
+});
+
+export async function* iteratePages(fetchPage, options = {}) {
+  let continuationToken = options.continuationToken;
+  do {
+    const response = await fetchPage({ ...options, continuationToken });
+    yield* response.data.items;
+    continuationToken = response.data.continuationToken;
+  } while (continuationToken);
+}
+
 export const peopleAPI = {
   getAll: () => api.get('/people'),
+  getPage: (options = { limit: 100 }) => api.get('/people', { params: pageParams(options) }),
+  iterate: (options = { limit: 100 }) => iteratePages(peopleAPI.getPage, options),
   getById: (id) => api.get(`/people/${id}`),
   create: (data) => api.post('/people', data),
   update: (id, data) => api.put(`/people/${id}`, data),
@@ -74,6 +91,15 @@ export const slotsAPI = {
       date,
       durationMinutes,
     }),
+  search: (personIds, from, to, durationMinutes, { step, limit } = {}) =>
+    api.post('/slots/search', {
+      personIds,
+      from,
+      to,
+      durationMinutes,
+      step,
+      limit,
+    }),
 };
 
 export const bookingsAPI = {
@@ -81,10 +107,61 @@ export const bookingsAPI = {
     const params = personIds ? { personIds: personIds.join(',') } : {};
     return api.get('/bookings', { params });
   },
+  getPage: ({ from, to, ...options } = { limit: 100 }) =>
+    api.get('/bookings', { params: { from, to, ...pageParams(options) } }),
+  iterate: (options = { limit: 100 }) => iteratePages(bookingsAPI.getPage, options),
   getById: (id) => api.get(`/bookings/${id}`),
   create: (data) => api.post('/bookings', data),
   delete: (id) => api.delete(`/bookings/${id}`),
 };
 
+export const changesAPI = {
+  get: (since, limit) => api.get('/changes', { params: { since, limit } }),
+  cursor: async () => (await api.get('/changes')).data.lastSeq,
+  subscribe: (since, { onChange, onResync }) => {
+    const source = new EventSource(`${API_URL}/changes/stream?since=${since}`);
+    source.addEventListener('change', (event) => onChange(JSON.parse(event.data)));
+    source.addEventListener('resync', () => {
+      source.close();
+      onResync?.();
+    });
+    return source;
+  },
+};
+
+export const applyChange = (items, change) => {
+  if (change.op === 'delete') {
+    return items.filter((item) => item.id !== change.id);
+  }
+  const index = items.findIndex((item) => item.id === change.id);
+  return index === -1 ? [...items, change.item] : items.map((item) => (item.id === change.id ? change.item : item));
+};
+
+export const watchChanges = (tables, load, onChange) => {
+  let source = null;
+  let stopped = false;
+  const start = async () => {
+    let since = null;
+    try {
+      since = await changesAPI.cursor();
+    } catch (err) {
+      console.error('Error reading change cursor:', err);
+    }
+    await load();
+    if (stopped || since === null) {
+      return;
+    }
+    source = changesAPI.subscribe(since, {
+      onChange: (change) => tables.includes(change.table) && onChange(change),
+      onResync: start,
+    });
+  };
+  start();
+  return () => {
+    stopped = true;
+    source?.close();
+  };
+};
+
 export default api;
 